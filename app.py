@@ -8,287 +8,179 @@ JSON for downstream use (e.g. embeddings and RAG).
 """
 
 import json
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Tuple
-
-import matplotlib.pyplot as plt
-
-import gradio as gr
-import yaml
-
-# Additional imports for new features
-import os
-import re
-try:
-    import pdfplumber  # type: ignore
-except ImportError:
-    pdfplumber = None  # pdfplumber may not be installed in all environments
-try:
-    import docx  # type: ignore
-except ImportError:
-    docx = None  # python-docx may not be installed
-
-
-
-# Default taxonomy schema used if none is provided by the user
-DEFAULT_TAXONOMY = {
-    "domain": [
-        "product",
-        "customer-support",
-        "marketing",
-        "engineering",
-        "operations",
-    ],
-    "subdomain": {
-        "product": ["features", "pricing", "release-notes"],
-        "customer-support": ["troubleshooting", "faq", "how-to"],
-        "marketing": ["positioning", "competitive-analysis"],
-        "engineering": ["architecture", "runbooks", "postmortems"],
-        "operations": ["policies", "procedures"],
-    },
-    "audience": ["customer", "internal", "partner"],
-    "format": ["article", "faq", "how-to", "runbook", "policy"],
-    "status": ["draft", "reviewed", "published", "deprecated"],
-}
-
-# Required fields for front matter
-REQUIRED_FIELDS = [
-    "title",
-    "domain",
-    "subdomain",
-    "audience",
-    "format",
-    "status",
-    "last_updated",
-]
-
-
-def parse_front_matter(content: str) -> Tuple[dict, str]:
-    """Parse YAML front matter and return metadata and body."""
-    meta: dict = {}
-    body: str = content
-    if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            _, front_matter, remainder = parts[0], parts[1], parts[2]
-            try:
-                meta = yaml.safe_load(front_matter) or {}
-            except yaml.YAMLError:
-                meta = {}
-            body = remainder.strip()
-    return meta, body
-
-
-def extract_pdf(file_obj) -> str:
-    """Extract text from a PDF file-like object.
-
-    This function uses the pdfplumber library when available. If pdfplumber
-    isn't installed or an error occurs during extraction, it returns an
-    empty string. The caller should handle missing content gracefully.
-    """
-    if pdfplumber is None:
-        return ""
-    text = ""
-    try:
-        with pdfplumber.open(file_obj) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception:
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    import gradio as gr
+
+# All extraction, validation and export logic lives in the headless
+# knowledge_core package; this module only adds the Gradio UI on top. Gradio
+# and pandas are imported on first use, so importing this module stays cheap.
+# Run `python app.py --import-report` to see what a cold import costs.
+
+# Core names are re-exported here for callers that import them from app
+from knowledge_core.dedup import is_duplicate_issue
+from knowledge_core.export import EXPORT_FORMATS, discard_export, export_bundle  # noqa: F401
+from knowledge_core.extract import (  # noqa: F401
+    clean_text,
+    extract_docx,
+    extract_pdf,
+    iter_pdf_pages,
+    optional_module,
+    strip_html_tags,
+)
+from knowledge_core.frontmatter import load_front_matter, parse_front_matter  # noqa: F401
+from knowledge_core.inference import inference_issue_field, is_inference_issue
+from knowledge_core.jobs import get_job_queue
+from knowledge_core.metrics import Metrics
+from knowledge_core.search import FILTER_FIELDS, SearchIndex, format_hits
+from knowledge_core.pipeline import (  # noqa: F401
+    ROW_FIELDS,
+    build_row,
+    format_cache_stats,
+    get_cache,
+    get_dedup_index,
+    get_metadata_model,
+    get_search_index,
+    load_taxonomy,
+    process_files,
+)
+from knowledge_core.taxonomy import CompiledTaxonomy
+from knowledge_core.validation import (  # noqa: F401
+    BODY_ISSUES,
+    DEFAULT_COMPILED_TAXONOMY,
+    DEFAULT_TAXONOMY,
+    REQUIRED_FIELDS,
+    is_metadata_issue,
+    validate_article,
+    validate_many,
+    validate_metadata,
+)
+
+
+# Table columns that map straight onto metadata fields, in column order
+EDITABLE_FIELDS = ROW_FIELDS
+
+
+def _cell(value) -> str:
+    # Table cells come back as strings (or NaN/None when cleared); compare on text
+    if value is None or value != value:
         return ""
-    return text
+    return str(value)
 
 
-def extract_docx(file_obj) -> str:
-    """Extract text from a DOCX file-like object.
+def apply_table_edits(bundle: List[dict], rows: List[list], taxonomy: CompiledTaxonomy) -> List[Tuple[int, List[str]]]:
+    """Apply edited table rows to the bundle and re-validate only the rows that changed.
 
-    Uses python-docx to read paragraphs. If the library isn't installed
-    or an exception occurs, returns an empty string. The caller should
-    handle missing content gracefully.
+    A row is dirty when any editable cell differs from its article's metadata;
+    cleared cells keep the previous value. Dirty articles get their metadata
+    re-validated, while every other issue (PII, duplicates, failed extraction)
+    is carried over from the first pass because edits never touch the body or
+    the source file. Suggested values
+    stay flagged until their own cell is edited. Articles are updated in
+    place. Returns ``(index, previous issues)`` for every dirty row.
     """
-    if docx is None:
+    dirty: List[Tuple[int, List[str]]] = []
+    for idx, (row, article) in enumerate(zip(rows, bundle)):
+        meta = article.get("metadata", {})
+        changes = {}
+        for field, value in zip(EDITABLE_FIELDS, row):
+            if _cell(value) and _cell(value) != _cell(meta.get(field)):
+                changes[field] = value
+        if not changes:
+            continue
+        previous = article.get("issues", [])
+        meta.update(changes)
+        inferred = {field: confidence for field, confidence in (meta.get("inferred") or {}).items()
+                    if field not in changes}
+        if "inferred" in meta:
+            meta["inferred"] = inferred
+        kept = [issue for issue in previous if not is_metadata_issue(issue)
+                and (not is_inference_issue(issue) or inference_issue_field(issue) in inferred)]
+        article["metadata"] = meta
+        article["issues"] = validate_metadata(meta, taxonomy) + kept
+        dirty.append((idx, previous))
+    return dirty
+
+
+PREVIEW_PAGE_SIZE = 20
+PREVIEW_CONTENT_CHARS = 500
+# Seconds between table refreshes while an analysis job runs
+PROGRESS_INTERVAL = 0.5
+# Profiler dropdown labels and the profiler each one selects
+PROFILER_CHOICES = {"Off": None, "cProfile": "cprofile", "pyinstrument": "pyinstrument"}
+SEARCH_RESULTS = 20
+# Gradio's cached copies of downloads are swept hourly and dropped after a day, in seconds
+DOWNLOAD_CACHE = (3600, 86400)
+
+
+def table_row(article: dict) -> list:
+    """Return the validation table row for one bundle entry."""
+    return list(build_row(article["metadata"], article["issues"]).values())
+
+
+def format_metrics_report(metrics: Metrics | None) -> str:
+    """Summarize a run's metrics as text: wall time, files per type, slow files and the profile."""
+    if metrics is None:
         return ""
-    try:
-        document = docx.Document(file_obj)
-        return "\n".join(paragraph.text for paragraph in document.paragraphs)
-    except Exception:
-        return ""
-
-
-def strip_html_tags(text: str) -> str:
-    """Remove basic HTML tags from text using a simple regex.
-
-    This is a naive implementation and may not handle nested tags perfectly,
-    but it's sufficient for stripping tags when HTML files are uploaded.
+    summary = metrics.summary()
+    lines = [f"Wall time: {summary['wall_seconds']:.3f}s"]
+    for kind, totals in summary["files"].items():
+        lines.append(f"{kind}: {totals['count']} files, {totals['seconds']:.3f}s, {totals['bytes']} bytes")
+    if metrics.slow_files:
+        lines.append(f"\nSlow files (>= {metrics.slow_threshold:g}s):")
+        for entry in metrics.slow_files:
+            lines.append(f"  {entry['file']}: {entry['seconds']:.2f}s {entry.get('stages', {})}")
+    if metrics.profile:
+        lines.append("\n" + metrics.profile)
+    return "\n".join(lines)
+
+
+def search_corpus(index: SearchIndex | None, query: str, filters: dict, k: int = SEARCH_RESULTS) -> Tuple[list, str]:
+    """Run a search for the UI and return the result rows and a status line.
+
+    Blank filter values mean "any value".
     """
-    # Remove script/style tags and their content
-    text = re.sub(r"<script[^>]*>.*?</script>", "", text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"<style[^>]*>.*?</style>", "", text, flags=re.DOTALL | re.IGNORECASE)
-    # Remove all remaining tags
-    text = re.sub(r"<[^>]+>", "", text)
-    return text
-
-
-def clean_text(text: str) -> str:
-    """Remove emojis and non-ASCII characters from text.
-
-    This uses a regex to strip characters outside of the basic multilingual
-    plane. The resulting text should retain standard punctuation and
-    printable ASCII characters.
+    if index is None:
+        return [], "Search is disabled (`KNOWLEDGE_SEARCH_PATH` is empty)."
+    if not (query or "").strip():
+        return [], f"{len(index)} articles indexed."
+    started = time.perf_counter()
+    hits = index.search(query, k, {name: value for name, value in filters.items() if value})
+    elapsed = (time.perf_counter() - started) * 1000
+    return format_hits(hits), f"{len(hits)} results in {elapsed:.1f} ms across {len(index)} articles."
+
+
+def preview_page_count(bundle: List[dict], page_size: int = PREVIEW_PAGE_SIZE) -> int:
+    return max(1, -(-len(bundle) // page_size))
+
+
+def render_json_preview(
+    bundle: List[dict],
+    page: int = 1,
+    page_size: int = PREVIEW_PAGE_SIZE,
+    max_content_chars: int = PREVIEW_CONTENT_CHARS,
+) -> str:
+    """Render one page of the bundle as indented JSON for display.
+
+    Only ``page_size`` articles are serialized and each body is cut to
+    ``max_content_chars``, so the preview stays small however large the
+    batch is. The full bundle is produced by :func:`export_bundle`.
     """
-    # Remove characters that are not basic printable ASCII or common punctuation
-    return re.sub(r"[^\x00-\x7F]+", "", text)
-
-
-def validate_article(meta: dict, body: str, taxonomy: dict, stale_days: int = 365) -> List[str]:
-    """Validate a single article's metadata and body.
-
-    Returns a list of issue strings. An empty list means the article passed validation.
-    """
-    issues: List[str] = []
-    # Check required fields
-    for field in REQUIRED_FIELDS:
-        if not meta.get(field):
-            issues.append(f"Missing required field: {field}")
-    # Validate taxonomy values
-    domain = meta.get("domain")
-    if domain and domain not in taxonomy.get("domain", []):
-        issues.append(f"Invalid domain: {domain}")
-    subdomain = meta.get("subdomain")
-    if domain and subdomain:
-        allowed_subs = taxonomy.get("subdomain", {}).get(domain)
-        if allowed_subs and subdomain not in allowed_subs:
-            issues.append(f"Invalid subdomain '{subdomain}' for domain '{domain}'")
-    audience = meta.get("audience")
-    if audience and audience not in taxonomy.get("audience", []):
-        issues.append(f"Invalid audience: {audience}")
-    fmt = meta.get("format")
-    if fmt and fmt not in taxonomy.get("format", []):
-        issues.append(f"Invalid format: {fmt}")
-    status = meta.get("status")
-    if status and status not in taxonomy.get("status", []):
-        issues.append(f"Invalid status: {status}")
-    # Staleness check
-    last_updated = meta.get("last_updated")
-    if last_updated:
-        try:
-            date_val = datetime.fromisoformat(str(last_updated))
-            if datetime.utcnow() - date_val > timedelta(days=stale_days):
-                issues.append(
-                    f"Article is stale (> {stale_days} days since last_updated)"
-                )
-        except ValueError:
-            issues.append("Invalid last_updated date format (use YYYY-MM-DD)")
-  
-
-
- # PII heuristics in body
-    import re
-    # SSN detection
-    if re.search(r"\b\d{3}-\d{2}-\d{4}\b", body):
-                issues.append("Possible SSN-likelike pattern detected in body")
-    # Email detection
-    if re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", body):
-        issues.append("Email addresses detected in body (verify necessity)")
-    # Phone number detection (US formats)
-    if re.search(r"(?:\+?1[-.\s]?)?(?:\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}\b", body):
-        issues.append("Possible phone number detected in body")
-
-    return issues
-
-  
-    
-def process_files(files: List[bytes], taxonomy_file: bytes | None) -> Tuple[str, List[dict]]:
-    """Process uploaded files and return JSON string and table data.
-
-    This function now supports multiple file types including Markdown, text,
-    HTML, PDF and DOCX. It removes emojis/non-ASCII characters from the
-    extracted text, infers missing metadata when possible, and uses the
-    default taxonomy unless a custom taxonomy file is provided. Missing
-    required metadata fields are marked as "Unknown" and a corresponding
-    issue is recorded for transparency.
-    """
-    # Load taxonomy from user or use default
-    taxonomy = DEFAULT_TAXONOMY
-    if taxonomy_file is not None:
-        try:
-            loaded = json.loads(taxonomy_file.decode("utf-8"))
-            if isinstance(loaded, dict) and "taxonomy" in loaded:
-                taxonomy = loaded["taxonomy"]
-            else:
-                taxonomy = loaded
-        except Exception:
-            # If JSON parsing fails, ignore and keep default
-            pass
-    records: List[dict] = []
-    bundle: List[dict] = []
-    for uploaded_file in files:
-        # Determine file name and extension if possible
-        name = getattr(uploaded_file, "name", "uploaded")
-        ext = os.path.splitext(name)[1].lower()
-        # Read raw bytes
-        try:
-            content_bytes = uploaded_file.read()  # type: ignore[attr-defined]
-        except Exception:
-            content_bytes = uploaded_file  # assume it's bytes
-        text = ""
-        # Extract text based on extension
-        if ext in [".pdf"]:
-            text = extract_pdf(uploaded_file)
-        elif ext in [".docx"]:
-            text = extract_docx(uploaded_file)
-        else:
-            # For .md, .txt, .html and unknown types, decode as text
-            try:
-                text = content_bytes.decode("utf-8", errors="ignore")
-            except Exception:
-                text = ""
-            # Strip basic HTML tags if file is HTML
-            if ext in [".html", ".htm"]:
-                text = strip_html_tags(text)
-        # Clean emojis and non-ASCII characters
-        text = clean_text(text)
-        # Parse YAML front matter for metadata if present
-        meta, body = parse_front_matter(text)
-        # Infer missing title from file name if not provided
-        base_name = os.path.splitext(os.path.basename(name))[0]
-        if not meta.get("title") and base_name:
-            meta["title"] = base_name.replace("_", " ")
-        # Infer missing last_updated as today's date if not provided
-        if not meta.get("last_updated"):
-            meta["last_updated"] = datetime.utcnow().date().isoformat()
-        # Fill missing required fields with 'Unknown' and record issue
-        issues = validate_article(meta, body, taxonomy)
-        for field in REQUIRED_FIELDS:
-            if not meta.get(field):
-                meta[field] = "Unknown"
-                if f"Missing required field: {field}" not in issues:
-                    issues.append(f"Missing required field: {field}")
-        # Build row for DataFrame
-        row = {
-            "title": meta.get("title"),
-            "domain": meta.get("domain"),
-            "subdomain": meta.get("subdomain"),
-            "audience": meta.get("audience"),
-            "format": meta.get("format"),
-            "status": meta.get("status"),
-            "last_updated": meta.get("last_updated"),
-            "issues": "; ".join(issues) if issues else "None",
-        }
-        records.append(row)
-        # Append to bundle for JSON export
-        bundle.append({
-            "metadata": meta,
-            "content": body,
-            "issues": issues,
-        })
-    json_output = json.dumps(bundle, indent=2, default=str)
-    return json_output, records
-
-
-def build_interface() -> gr.Blocks:
+    page = min(max(1, int(page or 1)), preview_page_count(bundle, page_size))
+    start = (page - 1) * page_size
+    preview = []
+    for article in bundle[start:start + page_size]:
+        content = article.get("content") or ""
+        if len(content) > max_content_chars:
+            content = f"{content[:max_content_chars]}... [{len(content) - max_content_chars} more characters]"
+        preview.append({**article, "content": content})
+    return json.dumps(preview, indent=2, default=str)
+
+
+def build_interface() -> "gr.Blocks":
     """Construct the Gradio interface with a custom dark theme and enhanced visuals.
 
     The returned interface allows users to upload Markdown knowledge articles with
@@ -298,6 +190,8 @@ def build_interface() -> gr.Blocks:
     a problem statement, user story, and required metadata fields is displayed
     to set the stage for executives and technical stakeholders.
     """
+    import gradio as gr
+
     # Define a custom dark theme with amber accent using the Soft theme base.  
     # Note: 'gold' is not a valid shortcut for gradio themes, so 'amber' is used to achieve a similar warm tone.
     theme = gr.themes.Soft(primary_hue="amber").set(
@@ -310,7 +204,7 @@ def build_interface() -> gr.Blocks:
         block_border_width="1px",
     )
 
-    with gr.Blocks(theme=theme) as demo:
+    with gr.Blocks(theme=theme, delete_cache=DOWNLOAD_CACHE) as demo:
         # High‑level context for the dashboard
         gr.Markdown(
             """
@@ -341,12 +235,13 @@ def build_interface() -> gr.Blocks:
 
         gr.Markdown("## 📂 Upload Your Knowledge Assets")
         with gr.Row():
-            # Allow multiple file types and multiple uploads. Using `binary` returns bytes.
+            # Allow multiple file types and multiple uploads. Using `filepath` lets the
+            # extractors stream each document from disk instead of holding its bytes.
             file_input = gr.File(
                 label="Knowledge Documents (md, txt, html, pdf, docx)",
                 file_types=[".md", ".txt", ".html", ".htm", ".pdf", ".docx"],
                 file_count="multiple",
-                type="binary",
+                type="filepath",
             )
             # Taxonomy upload is optional; if not provided, a default taxonomy is used.
             taxonomy_input = gr.File(
@@ -355,14 +250,33 @@ def build_interface() -> gr.Blocks:
                 type="binary",
             )
 
-        run_btn = gr.Button("🔍 Run Analysis", variant="primary")
+        with gr.Row():
+            run_btn = gr.Button("🔍 Run Analysis", variant="primary")
+            cancel_btn = gr.Button("⏹ Cancel", variant="stop")
+        with gr.Row():
+            # Timings are opt-in; a profiler keeps the whole run in one process
+            collect_metrics = gr.Checkbox(label="Collect per-stage timings", value=False)
+            profiler_input = gr.Dropdown(choices=list(PROFILER_CHOICES), value="Off", label="Profiler")
+        job_status = gr.Markdown()
+        cache_status = gr.Markdown()
+        job_state = gr.State("")
 
         gr.Markdown("## 🧪 Validation Report")
         # Store the bundle (list of article dicts) and taxonomy used in hidden state
         bundle_state = gr.State([])
-        taxonomy_state = gr.State(DEFAULT_TAXONOMY)
+        taxonomy_state = gr.State(DEFAULT_COMPILED_TAXONOMY)
+        issue_counts_state = gr.State(Counter())
 
-        json_output = gr.Code(label="AI‑ready JSON", language="json")
+        # Only one page of the bundle is rendered; the full export is built on demand
+        json_output = gr.Code(label="AI‑ready JSON (preview)", language="json")
+        with gr.Row():
+            preview_page = gr.Number(label="Preview page", value=1, precision=0, minimum=1)
+            preview_info = gr.Markdown()
+        with gr.Row():
+            export_format = gr.Dropdown(choices=list(EXPORT_FORMATS), value="JSON", label="Export format")
+            export_btn = gr.Button("📦 Export Full Bundle", variant="secondary")
+            export_file = gr.File(label="Full Export", interactive=False)
+        export_path = gr.State("")
         # Make the validation table interactive so users can edit missing fields directly
         table = gr.Dataframe(
             headers=[
@@ -381,16 +295,65 @@ def build_interface() -> gr.Blocks:
         )
 
         gr.Markdown("## 📊 Issue Summary Chart")
-        plot_output = gr.Plot(label="Issue Summary")
+        # Native bar plot fed from the category counts; no figures are created or kept server-side
+        with gr.Row():
+            plot_output = gr.BarPlot(
+                x="category",
+                y="count",
+                title="Validation Issue Summary",
+                x_title="Issue Category",
+                y_title="Count",
+                x_label_angle=-45,
+                label="Issue Summary",
+            )
+            # Filled only when per-stage timings were collected for the run
+            timing_plot = gr.BarPlot(
+                x="stage",
+                y="seconds",
+                title="Per-stage Timing",
+                x_title="Stage",
+                y_title="Seconds",
+                x_label_angle=-45,
+                label="Stage Timing",
+            )
+        metrics_report = gr.Code(label="Timing report (slow files, profile)")
 
         # Button to apply edits from the interactive table back into the metadata. When clicked,
-        # it revalidates each record using the current taxonomy and updates the JSON, table,
+        # it revalidates the edited records using the current taxonomy and updates the JSON, table,
         # issue summary chart and hidden bundle state. This allows users to fill in missing
         # metadata fields without editing the source files.
         apply_btn = gr.Button("💾 Apply Edits to Metadata", variant="secondary")
 
+        # Every analysed article is added to the local search index, so earlier batches are searchable too
+        gr.Markdown("## 🔎 Search the Corpus")
+        search_index = get_search_index()
+        with gr.Row():
+            search_query = gr.Textbox(label="Query", placeholder="Search titles and bodies", scale=3)
+            search_btn = gr.Button("Search", variant="secondary", scale=1)
+        with gr.Row():
+            search_filters = [
+                gr.Dropdown(
+                    choices=[""] + (search_index.values(name) if search_index is not None else []),
+                    value="",
+                    label=name.capitalize(),
+                    allow_custom_value=True,
+                )
+                for name in FILTER_FIELDS
+            ]
+        search_status = gr.Markdown()
+        search_results = gr.Dataframe(
+            headers=["score", "title", *FILTER_FIELDS, "snippet"],
+            wrap=True,
+            label="Search Results",
+            interactive=False,
+        )
+
         def categorize_issue(issue: str) -> str:
             """Categorize an issue string into high‑level categories."""
+            if is_duplicate_issue(issue):
+                return "Duplicates"
+            if is_inference_issue(issue):
+                return "Suggested Values"
             lower = issue.lower()
             if "missing required field" in lower:
                 return "Missing Fields"
@@ -398,86 +361,118 @@ def build_interface() -> gr.Blocks:
                 return "Invalid Values"
             if "stale" in lower:
                 return "Stale Content"
-            if "ssn" in lower or "email" in lower:
+            if any(term in lower for term in ("ssn", "email", "phone", "credit card", "iban")):
                 return "PII"
             return "Other"
 
-        def on_click(files: list[bytes], taxonomy_file: bytes | None):
-            """Handle Run Analysis and return JSON, table rows, and a bar chart.
+        def issue_categories(issues: list[str]) -> Counter:
+            """Count one article's issues by category ("No Issues" when it has none)."""
+            if not issues:
+                return Counter({"No Issues": 1})
+            return Counter(categorize_issue(issue) for issue in issues)
+
+        def issue_chart(counter: Counter):
+            """Return the bar plot data (one row per issue category) for the given counts."""
+            import pandas as pd  # type: ignore
+
+            categories = [c for c in counter if counter[c] > 0]
+            return pd.DataFrame({"category": categories, "count": [counter[c] for c in categories]})
+
+        def timing_chart(metrics: Metrics | None):
+            """Return the bar plot data (one row per pipeline stage) for a run's metrics."""
+            import pandas as pd  # type: ignore
+
+            stages = metrics.stage_seconds() if metrics is not None else {}
+            return pd.DataFrame({"stage": list(stages), "seconds": list(stages.values())})
+
+        def preview_caption(bundle: list[dict], page: int) -> str:
+            """Describe which articles the JSON preview currently shows."""
+            if not bundle:
+                return ""
+            page = min(max(1, int(page or 1)), preview_page_count(bundle))
+            first = (page - 1) * PREVIEW_PAGE_SIZE + 1
+            last = min(len(bundle), page * PREVIEW_PAGE_SIZE)
+            pages = preview_page_count(bundle)
+            return (
+                f"Showing articles {first}–{last} of {len(bundle)} (page {page} of {pages}); "
+                f"bodies are truncated to {PREVIEW_CONTENT_CHARS} characters. "
+                "Use **Export Full Bundle** for everything."
+            )
+
+        def on_click(files: list[str], taxonomy_file: bytes | None, timings: bool = False, profiler: str = "Off"):
+            """Handle Run Analysis: validate the uploads as a background job and stream results.
 
-            If no files are uploaded, returns an empty JSON string, empty list, and
-            an empty matplotlib figure.
+            The batch is submitted to the job queue and the table fills in as
+            files finish, under a progress line with the job ID. The final yield
+            carries the JSON preview, bar chart and state for the whole bundle,
+            or for the files that finished if the job was cancelled. With
+            ``timings`` or a profiler selected it also carries the per-stage
+            timing chart and report. If no files are uploaded, all outputs are
+            cleared.
             """
             # No files uploaded: clear outputs
             if not files:
-                # Create empty figure for plot
-                fig = plt.figure()
-                plt.title("No Data")
-                plt.axis("off")
-                # Reset bundle and taxonomy state
-                return "[]", [], fig, [], DEFAULT_TAXONOMY
-            # Process files and get JSON/bundle
-            json_str, records = process_files(files, taxonomy_file)
-            # Build rows for table
-            rows = [
-                [
-                    rec.get("title"),
-                    rec.get("domain"),
-                    rec.get("subdomain"),
-                    rec.get("audience"),
-                    rec.get("format"),
-                    rec.get("status"),
-                    rec.get("last_updated"),
-                    rec.get("issues"),
-                ]
-                for rec in records
-            ]
-            # Retrieve the taxonomy used (either default or provided)
-            taxonomy_used = DEFAULT_TAXONOMY
-            if taxonomy_file is not None:
-                try:
-                    loaded = json.loads(taxonomy_file.decode("utf-8"))
-                    taxonomy_used = loaded.get("taxonomy", loaded)
-                except Exception:
-                    pass
-            # Aggregate issue categories
-            from collections import Counter
+                # Reset bundle, taxonomy, issue count, job state and timings
+                yield (
+                    "[]", [], issue_chart(Counter()), [], DEFAULT_COMPILED_TAXONOMY, "", 1, "", Counter(), "", "",
+                    timing_chart(None), "",
+                )
+                return
+            # Compile the taxonomy once and share it with processing and later edits
+            taxonomy_used = load_taxonomy(taxonomy_file)
+            cache = get_cache()
+            profiler_name = PROFILER_CHOICES.get(profiler)
+            metrics = Metrics(profiler=profiler_name) if timings or profiler_name else None
+            job = get_job_queue().submit(files, taxonomy_used, cache=cache, metrics=metrics, dedup=get_dedup_index(),
+                                         search_index=get_search_index(), inference=get_metadata_model())
+            try:
+                while not job.wait(PROGRESS_INTERVAL):
+                    # Only the table and progress line change until the job is over
+                    rows = [table_row(article) for article in job.bundle()]
+                    yield (gr.update(), rows) + (gr.update(),) * 7 + (job.id, job.describe()) + (gr.update(),) * 2
+            finally:
+                # The page was closed or the event cancelled: stop the job as well
+                if not job.finished:
+                    job.cancel()
+            bundle = job.bundle()
+            # Aggregate issue categories; kept in state so edits can adjust them incrementally
             counter = Counter()
-            for rec in records:
-                issues_str = rec.get("issues")
-                if not issues_str or issues_str == "None":
-                    counter["No Issues"] += 1
-                else:
-                    for issue in issues_str.split("; "):
-                        counter[categorize_issue(issue)] += 1
-            # Create bar chart
-            fig, ax = plt.subplots()
-            categories = list(counter.keys())
-            counts = [counter[c] for c in categories]
-            ax.bar(categories, counts)
-            ax.set_xlabel("Issue Category")
-            ax.set_ylabel("Count")
-            ax.set_title("Validation Issue Summary")
-            plt.xticks(rotation=45, ha="right")
-            plt.tight_layout()
-            # Build bundle for state: reconstruct bundle objects from JSON
-            bundle = json.loads(json_str)
-            return json_str, rows, fig, bundle, taxonomy_used
-
-        def on_apply(table_data, bundle: list[dict], taxonomy: dict):
+            for article in bundle:
+                counter.update(issue_categories(article["issues"]))
+            yield (
+                render_json_preview(bundle),
+                [table_row(article) for article in bundle],
+                issue_chart(counter),
+                bundle,
+                taxonomy_used,
+                format_cache_stats(cache),
+                1,
+                preview_caption(bundle, 1),
+                counter,
+                job.id,
+                job.describe(),
+                timing_chart(metrics),
+                format_metrics_report(metrics),
+            )
+
+        def on_cancel(job_id: str):
+            """Cancel the running analysis job; files already validated are kept."""
+            if not job_id or not get_job_queue().cancel(job_id):
+                return gr.update()
+            return f"Job `{job_id}`: cancelling..."
+
+        def on_apply(table_data, bundle: list[dict], taxonomy: CompiledTaxonomy, page: int, counter: Counter):
             """Apply edits from the interactive table back into the metadata.
 
-            Accepts the current table data (which may be a pandas DataFrame or list of lists),
-            updates each article's metadata based on the edited values, re-runs
-            validation using the provided taxonomy, and returns updated outputs and
-            state. If there is no data to apply, returns empty outputs.
+            Accepts the current table data (which may be a pandas DataFrame or list of lists)
+            and re-validates only the rows whose metadata changed, keeping the PII
+            findings from the first pass. Issue counts are adjusted for those rows
+            alone, and outputs that did not change are left untouched. If there is
+            no data to apply, returns empty outputs.
             """
             # Guard against missing state
             if not bundle or table_data is None:
-                fig = plt.figure()
-                plt.title("No Data")
-                plt.axis("off")
-                return "[]", [], fig, [], taxonomy
+                return "[]", [], issue_chart(Counter()), [], taxonomy, "", Counter()
             # Normalize the table data to a list of lists. Gradio may provide a
             # pandas DataFrame or a list. Attempt conversion gracefully.
             try:
@@ -491,86 +486,115 @@ def build_interface() -> gr.Blocks:
             except Exception:
                 # Fallback: assume table_data is already a list of lists
                 rows_list = table_data
-            new_bundle: list[dict] = []
-            new_records: list[list] = []
-            from collections import Counter
-            counter = Counter()
             # Ensure the number of rows matches number of articles
             num = min(len(rows_list), len(bundle))
-            for idx in range(num):
-                row = rows_list[idx]
-                art = bundle[idx]
-                meta = art.get("metadata", {})
-                # Update metadata fields from row (matching column order)
-                try:
-                    meta["title"] = row[0] or meta.get("title")
-                    meta["domain"] = row[1] or meta.get("domain")
-                    meta["subdomain"] = row[2] or meta.get("subdomain")
-                    meta["audience"] = row[3] or meta.get("audience")
-                    meta["format"] = row[4] or meta.get("format")
-                    meta["status"] = row[5] or meta.get("status")
-                    meta["last_updated"] = row[6] or meta.get("last_updated")
-                except Exception:
-                    pass
-                # Re-validate article with updated metadata
-                content = art.get("content", "")
-                issues = validate_article(meta, content, taxonomy)
-                art["metadata"] = meta
-                art["issues"] = issues
-                # Build record for table
-                issues_str = "; ".join(issues) if issues else "None"
-                new_records.append([
-                    meta.get("title"),
-                    meta.get("domain"),
-                    meta.get("subdomain"),
-                    meta.get("audience"),
-                    meta.get("format"),
-                    meta.get("status"),
-                    meta.get("last_updated"),
-                    issues_str,
-                ])
-                # Update issue category counts
-                if not issues:
-                    counter["No Issues"] += 1
-                else:
-                    for issue in issues:
-                        counter[categorize_issue(issue)] += 1
-                new_bundle.append(art)
-            # Build new JSON string
-            json_str = json.dumps(new_bundle, indent=2, default=str)
-            # Create bar chart
-            fig, ax = plt.subplots()
-            categories = list(counter.keys())
-            counts = [counter[c] for c in categories]
-            if categories:
-                ax.bar(categories, counts)
-                ax.set_xlabel("Issue Category")
-                ax.set_ylabel("Count")
-                ax.set_title("Validation Issue Summary")
-                plt.xticks(rotation=45, ha="right")
-                plt.tight_layout()
-            else:
-                plt.title("No Data")
-                plt.axis("off")
-            return json_str, new_records, fig, new_bundle, taxonomy
+            truncated = num < len(bundle)
+            if truncated:
+                for article in bundle[num:]:
+                    counter.subtract(issue_categories(article["issues"]))
+                bundle = bundle[:num]
+            dirty = apply_table_edits(bundle, rows_list[:num], taxonomy)
+            if not dirty and not truncated and num == len(rows_list):
+                # Nothing changed: skip re-rendering the table, preview and chart
+                return gr.update(), gr.update(), gr.update(), bundle, taxonomy, gr.update(), counter
+            new_records = [list(row) for row in rows_list[:num]]
+            for idx, previous in dirty:
+                meta = bundle[idx]["metadata"]
+                issues = bundle[idx]["issues"]
+                new_records[idx] = [meta.get(field) for field in EDITABLE_FIELDS] + [
+                    "; ".join(issues) if issues else "None"
+                ]
+                counter.subtract(issue_categories(previous))
+                counter.update(issue_categories(issues))
+            return (
+                render_json_preview(bundle, page),
+                new_records,
+                issue_chart(counter),
+                bundle,
+                taxonomy,
+                preview_caption(bundle, page),
+                counter,
+            )
+
+        def on_page(bundle: list[dict], page: int):
+            """Render the requested page of the JSON preview."""
+            return render_json_preview(bundle, page), preview_caption(bundle, page)
+
+        def on_search(query: str, *values: str):
+            """Search the indexed corpus, narrowed by any taxonomy filters that are set."""
+            return search_corpus(get_search_index(), query, dict(zip(FILTER_FIELDS, values)))
+
+        def on_export(bundle: list[dict], fmt: str, previous: str):
+            """Serialize the full bundle only when the user asks to download it."""
+            # Normally already gone; covers API clients that do not run the follow-up cleanup
+            discard_export(previous)
+            if not bundle:
+                return None, ""
+            path = export_bundle(bundle, fmt)
+            return path, path
 
         # When Run Analysis is clicked, execute on_click and update both visible outputs and hidden state
         run_btn.click(
             on_click,
-            inputs=[file_input, taxonomy_input],
-            outputs=[json_output, table, plot_output, bundle_state, taxonomy_state],
+            inputs=[file_input, taxonomy_input, collect_metrics, profiler_input],
+            outputs=[
+                json_output,
+                table,
+                plot_output,
+                bundle_state,
+                taxonomy_state,
+                cache_status,
+                preview_page,
+                preview_info,
+                issue_counts_state,
+                job_state,
+                job_status,
+                timing_plot,
+                metrics_report,
+            ],
+            # Jobs are throttled by the job queue's lane limits, so handlers need not queue here
+            concurrency_limit=None,
         )
+        cancel_btn.click(on_cancel, inputs=[job_state], outputs=[job_status])
+        preview_page.change(on_page, inputs=[bundle_state, preview_page], outputs=[json_output, preview_info])
+        search_btn.click(on_search, inputs=[search_query, *search_filters], outputs=[search_results, search_status])
+        search_query.submit(on_search, inputs=[search_query, *search_filters], outputs=[search_results, search_status])
+        # Gradio copies the export into its own cache for the download, so the temp file can go right after
+        export_btn.click(
+            on_export, inputs=[bundle_state, export_format, export_path], outputs=[export_file, export_path]
+        ).then(discard_export, inputs=[export_path], outputs=None)
 
         # When Apply Edits is clicked, use the interactive table data, bundle state and taxonomy state
         # to update metadata and re-run validation. Note: table.value will contain the edited rows.
         apply_btn.click(
             on_apply,
-            inputs=[table, bundle_state, taxonomy_state],
-            outputs=[json_output, table, plot_output, bundle_state, taxonomy_state],
+            inputs=[table, bundle_state, taxonomy_state, preview_page, issue_counts_state],
+            outputs=[json_output, table, plot_output, bundle_state, taxonomy_state, preview_info, issue_counts_state],
         )
     return demo
 
 
-if __name__ == "__main__":
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the knowledge ingestion and validation app.")
+    parser.add_argument(
+        "--import-report",
+        nargs="?",
+        const="app",
+        metavar="MODULE",
+        help="Print the slowest imports of a cold `import MODULE` (default: app) and exit",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Number of imports to list in the import report")
+    args = parser.parse_args()
+    if args.import_report:
+        from knowledge_core.importtime import format_import_report, measure_imports
+
+        print(format_import_report(measure_imports(args.import_report), args.import_report, top=args.top))
+        return
     interface = build_interface()
     interface.launch()
+
+
+if __name__ == "__main__":
+    main()
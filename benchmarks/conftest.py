@@ -0,0 +1,95 @@
+"""
+Shared fixtures for the benchmark suite.
+
+The corpus shape comes from environment variables so the same suite can run
+a quick CI pass or a large local measurement:
+
+* ``KNOWLEDGE_BENCH_ARTICLES`` (default 1000)
+* ``KNOWLEDGE_BENCH_BODY_BYTES`` (default 2000)
+* ``KNOWLEDGE_BENCH_PII_DENSITY`` (default 0.05)
+* ``KNOWLEDGE_BENCH_INVALID_RATE`` (default 0.2)
+* ``KNOWLEDGE_BENCH_FIXTURES`` (PDF/DOCX/HTML files per format, default 20)
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_articles, make_docx, make_html, make_pdf, write_corpus
+from knowledge_core.frontmatter import parse_front_matter
+from knowledge_core.validation import DEFAULT_TAXONOMY, validate_many
+
+
+def _env(name, default, cast=int):
+    return cast(os.environ.get(name, default))
+
+
+@pytest.fixture(scope="session")
+def spec():
+    return CorpusSpec(
+        count=_env("KNOWLEDGE_BENCH_ARTICLES", 1000),
+        body_bytes=_env("KNOWLEDGE_BENCH_BODY_BYTES", 2000),
+        pii_density=_env("KNOWLEDGE_BENCH_PII_DENSITY", 0.05, float),
+        invalid_rate=_env("KNOWLEDGE_BENCH_INVALID_RATE", 0.2, float),
+    )
+
+
+@pytest.fixture(scope="session")
+def articles(spec):
+    """The corpus as ``(relative path, text)`` pairs held in memory."""
+    return list(generate_articles(spec))
+
+
+@pytest.fixture(scope="session")
+def parsed(articles):
+    """``(name, metadata, body)`` documents ready for validation."""
+    return [(name,) + parse_front_matter(text) for name, text in articles]
+
+
+@pytest.fixture(scope="session")
+def bundle(parsed):
+    return list(validate_many(parsed))
+
+
+@pytest.fixture(scope="session")
+def corpus_dir(spec, tmp_path_factory):
+    root = tmp_path_factory.mktemp("corpus")
+    write_corpus(spec, str(root))
+    return str(root)
+
+
+@pytest.fixture(scope="session")
+def taxonomy_path(tmp_path_factory):
+    """The default taxonomy as a YAML file, for the ingestion script."""
+    import yaml
+
+    path = tmp_path_factory.mktemp("taxonomy") / "taxonomy.yaml"
+    path.write_text(yaml.safe_dump({"taxonomy": DEFAULT_TAXONOMY}))
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def document_fixtures(articles, tmp_path_factory):
+    """Paths of generated HTML, PDF and DOCX files, keyed by extension."""
+    root = tmp_path_factory.mktemp("documents")
+    count = _env("KNOWLEDGE_BENCH_FIXTURES", 20)
+    files = {".html": [], ".pdf": [], ".docx": []}
+    for idx, (_, text) in enumerate(articles[:count]):
+        generated = {".html": make_html(text).encode("utf-8"), ".pdf": make_pdf(text), ".docx": make_docx(text)}
+        for ext, data in generated.items():
+            if data is None:
+                continue
+            path = root / f"doc_{idx}{ext}"
+            path.write_bytes(data)
+            files[ext].append(str(path))
+    return files
+
+
+@pytest.fixture(scope="session")
+def ingestion():
+    """The ingestion script, loaded as a module."""
+    spec = importlib.util.spec_from_file_location("knowledge_ingestion", "scripts/knowledge_ingestion.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,220 @@
+"""
+corpus.py
+
+Deterministic synthetic corpus for the benchmark suite.
+
+Articles are assembled from the real seed articles in ``docs/packs/*/articles``
+and ``data/sample_knowledge``: their headings, paragraphs and list items are
+reshuffled into bodies of a target size, metadata is drawn from a taxonomy, and
+a configurable share of articles gets PII or broken front matter. The same
+seed always yields the same corpus, so timings stay comparable across runs.
+
+Write a corpus to disk with::
+
+    python -m benchmarks.corpus --count 100000 --out /tmp/corpus
+"""
+
+import argparse
+import glob
+import io
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from knowledge_core.frontmatter import parse_front_matter
+from knowledge_core.validation import DEFAULT_TAXONOMY
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_GLOBS = ("docs/packs/*/articles/*.md", "data/sample_knowledge/*.md")
+# Files per subdirectory when a corpus is written to disk
+FILES_PER_DIR = 1000
+
+PII_SAMPLES = (
+    "Contact jane.doe@example.com for access.",
+    "Call the on-call engineer at (555) 123-4567.",
+    "Employee SSN 123-45-6789 was found in the export.",
+    "Refund card 4111 1111 1111 1111 before Friday.",
+    "Wire the deposit to GB82 WEST 1234 5698 7654 32.",
+)
+INVALID_KINDS = ("missing_field", "bad_value", "bad_date", "bad_yaml", "no_front_matter")
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus.
+
+    ``pii_density`` is the chance that a body paragraph carries a PII sample
+    and ``invalid_rate`` the share of articles with broken front matter.
+    """
+
+    count: int = 1000
+    body_bytes: int = 2000
+    pii_density: float = 0.05
+    invalid_rate: float = 0.2
+    seed: int = 0
+    taxonomy: Optional[dict] = None
+
+
+def load_seed_blocks(root: str = REPO_ROOT) -> List[str]:
+    """Return the body blocks (paragraphs, headings, list items) of the seed articles."""
+    blocks: List[str] = []
+    for pattern in SEED_GLOBS:
+        for path in sorted(glob.glob(os.path.join(root, pattern))):
+            with open(path, "r", encoding="utf-8") as f:
+                _, body = parse_front_matter(f.read())
+            blocks.extend(block.strip() for block in body.split("\n\n") if block.strip())
+    if not blocks:
+        raise RuntimeError(f"No seed articles found under {root}")
+    return blocks
+
+
+def _metadata(rng: random.Random, taxonomy: dict, idx: int) -> Dict[str, object]:
+    domain = rng.choice(taxonomy["domain"])
+    subdomains = taxonomy.get("subdomain", {}).get(domain) or ["general"]
+    return {
+        "title": f"Synthetic article {idx}",
+        "domain": domain,
+        "subdomain": rng.choice(subdomains),
+        "audience": rng.choice(taxonomy["audience"]),
+        "format": rng.choice(taxonomy["format"]),
+        "status": rng.choice(taxonomy["status"]),
+        "author": rng.choice(["Support Team", "Pricing Team", "Ops"]),
+        "last_updated": f"20{rng.randint(15, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+    }
+
+
+def _front_matter(meta: Dict[str, object], invalid: Optional[str], rng: random.Random) -> str:
+    if invalid == "no_front_matter":
+        return ""
+    meta = dict(meta)
+    if invalid == "missing_field":
+        del meta[rng.choice(["domain", "audience", "status", "last_updated"])]
+    elif invalid == "bad_value":
+        meta["domain"] = "not-a-domain"
+    elif invalid == "bad_date":
+        meta["last_updated"] = "10/10/2025"
+    lines = [f'{key}: "{value}"' if key == "title" else f"{key}: {value}" for key, value in meta.items()]
+    if invalid == "bad_yaml":
+        lines.append("tags: [unclosed")
+    return "---\n" + "\n".join(lines) + "\n---\n\n"
+
+
+def _body(rng: random.Random, blocks: List[str], spec: CorpusSpec) -> str:
+    out = io.StringIO()
+    size = 0
+    while size < spec.body_bytes:
+        block = rng.choice(blocks)
+        if rng.random() < spec.pii_density:
+            block = f"{block} {rng.choice(PII_SAMPLES)}"
+        out.write(block)
+        out.write("\n\n")
+        size += len(block) + 2
+    return out.getvalue()
+
+
+def generate_articles(spec: CorpusSpec, blocks: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+    """Yield ``(relative path, Markdown text)`` for every article of the corpus.
+
+    Articles are produced lazily, so corpora of any size can be streamed to
+    disk or straight into a benchmark.
+    """
+    blocks = blocks or load_seed_blocks()
+    taxonomy = spec.taxonomy or DEFAULT_TAXONOMY
+    rng = random.Random(spec.seed)
+    for idx in range(spec.count):
+        invalid = rng.choice(INVALID_KINDS) if rng.random() < spec.invalid_rate else None
+        text = _front_matter(_metadata(rng, taxonomy, idx), invalid, rng) + _body(rng, blocks, spec)
+        yield f"{idx // FILES_PER_DIR:04d}/article_{idx:07d}.md", text
+
+
+def write_corpus(spec: CorpusSpec, out_dir: str) -> List[str]:
+    """Write the corpus below ``out_dir`` and return the file paths."""
+    paths = []
+    for rel_path, text in generate_articles(spec):
+        path = os.path.join(out_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+
+def make_html(text: str) -> str:
+    """Wrap Markdown text in an HTML page with scripts, styles and inline markup."""
+    paragraphs = "\n".join(f"<p class='body'><b>{block}</b></p>" for block in text.split("\n\n") if block)
+    return (
+        "<html><head><style>p { color: red; }</style>"
+        "<script>window.analytics = {track: function () {}};</script></head>"
+        f"<body><div id='main'>{paragraphs}</div></body></html>"
+    )
+
+
+def make_pdf(text: str, lines_per_page: int = 50) -> bytes:
+    """Build a minimal multi-page PDF with one text line per input line.
+
+    Written by hand so the benchmarks need no PDF authoring library; only
+    printable ASCII survives, which is all the seed articles contain.
+    """
+    lines = [line.encode("ascii", "ignore").replace(b"\\", b"").replace(b"(", b"").replace(b")", b"")
+             for line in text.splitlines()] or [b""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects: List[bytes] = [b"", b""]  # catalog and page tree, filled in below
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for page in pages:
+        stream = b"BT /F1 10 Tf 40 800 Td 12 TL " + b" ".join(b"(" + line[:110] + b") '" for line in page) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(kids)
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(text: str) -> Optional[bytes]:
+    """Build a DOCX with one paragraph per block, or None without python-docx."""
+    try:
+        import docx  # type: ignore
+    except ImportError:
+        return None
+    document = docx.Document()
+    for block in text.split("\n\n"):
+        if block:
+            document.add_paragraph(block)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic knowledge article corpus.")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--count", type=int, default=1000, help="Number of articles (1k to 1M)")
+    parser.add_argument("--body-bytes", type=int, default=2000, help="Approximate body size per article")
+    parser.add_argument("--pii-density", type=float, default=0.05, help="Chance a paragraph carries PII")
+    parser.add_argument("--invalid-rate", type=float, default=0.2, help="Share of articles with broken front matter")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    spec = CorpusSpec(args.count, args.body_bytes, args.pii_density, args.invalid_rate, args.seed)
+    paths = write_corpus(spec, args.out)
+    print(f"Wrote {len(paths)} articles to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
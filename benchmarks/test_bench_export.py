@@ -0,0 +1,25 @@
+"""Exporters: app bundle export and the ingestion script's output formats."""
+
+import pytest
+
+from knowledge_core.export import EXPORT_FORMATS, export_bundle
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_export_bundle(benchmark, bundle, fmt, tmp_path):
+    if fmt == "Parquet":
+        pytest.importorskip("pyarrow")
+    benchmark(export_bundle, bundle, fmt, str(tmp_path))
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".jsonl.gz", ".parquet"])
+def test_export_ingested_articles(benchmark, ingestion, corpus_dir, taxonomy_path, suffix, tmp_path):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    articles = ingestion.ingest_directory(corpus_dir, taxonomy_path, workers=1)
+    output = str(tmp_path / f"out{suffix}")
+    exporter = {
+        ".json": ingestion.export_to_json,
+        ".parquet": ingestion.export_to_columnar,
+    }.get(suffix, ingestion.export_to_jsonl)
+    benchmark(exporter, articles, output)
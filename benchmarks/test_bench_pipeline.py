@@ -0,0 +1,40 @@
+"""Batch paths: upload processing in the app and directory ingestion in the CLI."""
+
+import os
+
+import pytest
+
+from knowledge_core.pipeline import process_files
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_process_files_markdown(benchmark, corpus_dir, workers):
+    paths = sorted(
+        os.path.join(root, name) for root, _, files in os.walk(corpus_dir) for name in files
+    )
+    bundle, _ = benchmark.pedantic(process_files, args=(paths, None), kwargs={"workers": workers}, rounds=3)
+    assert len(bundle) == len(paths)
+
+
+@pytest.mark.parametrize("ext", [".html", ".pdf", ".docx"])
+def test_process_files_documents(benchmark, document_fixtures, ext):
+    paths = document_fixtures[ext]
+    if not paths:
+        pytest.skip(f"no {ext} fixtures (missing optional dependency)")
+    bundle, _ = benchmark.pedantic(process_files, args=(paths, None), kwargs={"workers": 1}, rounds=3)
+    assert all(article["content"] for article in bundle)
+
+
+def test_ingest_directory(benchmark, ingestion, corpus_dir, taxonomy_path):
+    benchmark.pedantic(ingestion.ingest_directory, args=(corpus_dir, taxonomy_path), kwargs={"workers": 1}, rounds=3)
+
+
+def test_ingest_directory_unchanged_rerun(benchmark, ingestion, corpus_dir, taxonomy_path, tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    ingestion.ingest_directory(corpus_dir, taxonomy_path, workers=1, manifest_path=manifest)
+    benchmark.pedantic(
+        ingestion.ingest_directory,
+        args=(corpus_dir, taxonomy_path),
+        kwargs={"workers": 1, "manifest_path": manifest},
+        rounds=3,
+    )
@@ -0,0 +1,30 @@
+"""Per-document hot paths: front matter, cleaning, HTML stripping and validation."""
+
+from knowledge_core.extract import clean_text, strip_html_tags
+from knowledge_core.frontmatter import parse_front_matter
+from knowledge_core.validation import DEFAULT_COMPILED_TAXONOMY, validate_article, validate_many
+
+from benchmarks.corpus import make_html
+
+
+def test_parse_front_matter(benchmark, articles):
+    texts = [text for _, text in articles]
+    benchmark(lambda: [parse_front_matter(text) for text in texts])
+
+
+def test_clean_text(benchmark, articles):
+    texts = [text for _, text in articles]
+    benchmark(lambda: [clean_text(text) for text in texts])
+
+
+def test_strip_html_tags(benchmark, articles):
+    pages = [make_html(text) for _, text in articles]
+    benchmark(lambda: [strip_html_tags(page) for page in pages])
+
+
+def test_validate_article(benchmark, parsed):
+    benchmark(lambda: [validate_article(meta, body, DEFAULT_COMPILED_TAXONOMY) for _, meta, body in parsed])
+
+
+def test_validate_many(benchmark, parsed):
+    benchmark(lambda: list(validate_many(parsed)))
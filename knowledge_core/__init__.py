@@ -0,0 +1,37 @@
+"""
+knowledge_core
+
+Headless building blocks for the knowledge ingestion and validation pipeline,
+shared by the Gradio app and the batch scripts. Nothing here imports the UI
+stack, so workers can validate documents without loading gradio.
+"""
+
+from knowledge_core.executor import (
+    BatchExecutor,
+    TaskResult,
+    TaskTimeoutError,
+    default_timeout,
+    default_workers,
+)
+from knowledge_core.export import export_bundle
+from knowledge_core.extract import extract_document, extract_text
+from knowledge_core.frontmatter import parse_front_matter, read_front_matter
+from knowledge_core.pipeline import process_files
+from knowledge_core.validation import validate_article, validate_document, validate_many
+
+__all__ = [
+    "BatchExecutor",
+    "TaskResult",
+    "TaskTimeoutError",
+    "default_timeout",
+    "default_workers",
+    "export_bundle",
+    "extract_document",
+    "extract_text",
+    "parse_front_matter",
+    "process_files",
+    "read_front_matter",
+    "validate_article",
+    "validate_document",
+    "validate_many",
+]
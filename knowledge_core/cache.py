@@ -0,0 +1,168 @@
+"""
+cache.py
+
+Persistent, content-addressed cache for extraction and validation results.
+
+Entries live in a single SQLite file and are keyed by a SHA-256 of the uploaded
+bytes plus everything else that influences the result (extractor version, file
+type, taxonomy fingerprint, ...). When the stored payloads grow beyond
+``max_bytes`` the least recently used entries are evicted. Re-uploading an
+unchanged file therefore skips PDF/DOCX/HTML extraction entirely, and skips
+validation as well when the taxonomy has not changed either.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Bump whenever extraction or cleaning output changes so stale entries are ignored
+EXTRACTOR_VERSION = "3"
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_source(source: str | bytes) -> str:
+    """Return the SHA-256 hex digest of a file path or raw bytes.
+
+    Paths are hashed in fixed-size chunks so large uploads are never held in
+    memory just to compute their key.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+    else:
+        digest.update(source)
+    return digest.hexdigest()
+
+
+def default_cache_path() -> str:
+    """Return the cache location from ``KNOWLEDGE_CACHE_PATH`` or the user cache dir.
+
+    An empty ``KNOWLEDGE_CACHE_PATH`` disables caching and yields ``""``.
+    """
+    env = os.environ.get("KNOWLEDGE_CACHE_PATH")
+    if env is not None:
+        return env
+    return os.path.join(os.path.expanduser("~"), ".cache", "knowledge-ai", "cache.sqlite")
+
+
+class ContentCache:
+    """Size-bounded LRU cache of extraction and validation results on disk.
+
+    Values are JSON-serialized; non-JSON types such as dates are stored as
+    strings. The cache is safe to share between threads of one process.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "extraction_hits": 0,
+            "extraction_misses": 0,
+            "validation_hits": 0,
+            "validation_misses": 0,
+            "evictions": 0,
+        }
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    # Key construction -----------------------------------------------------
+
+    @staticmethod
+    def extraction_key(content_hash: str, ext: str, options: str = "") -> str:
+        return f"extract:{EXTRACTOR_VERSION}:{ext}:{options}:{content_hash}"
+
+    @staticmethod
+    def validation_key(
+        content_hash: str, ext: str, name: str, taxonomy_hash: str, context: str = "", options: str = ""
+    ) -> str:
+        # ``options`` must match the extraction key's: they change the body that was validated
+        return f"validate:{EXTRACTOR_VERSION}:{ext}:{options}:{taxonomy_hash}:{context}:{name}:{content_hash}"
+
+    # Typed accessors ------------------------------------------------------
+
+    def get_extraction(self, key: str) -> Optional[Any]:
+        return self._get(key, "extraction")
+
+    def put_extraction(self, key: str, value: Any) -> None:
+        self._put(key, value)
+
+    def get_validation(self, key: str) -> Optional[Any]:
+        return self._get(key, "validation")
+
+    def put_validation(self, key: str, value: Any) -> None:
+        self._put(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters plus the current entry count and size."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            return {**self._counters, "entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Internals ------------------------------------------------------------
+
+    def _get(self, key: str, kind: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters[f"{kind}_misses"] += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._counters[f"{kind}_hits"] += 1
+        return json.loads(row[0])
+
+    def _put(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, default=str)
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        while total > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                self._counters["evictions"] += 1
@@ -0,0 +1,276 @@
+"""
+chunking.py
+
+Splitting article bodies into embedding-ready chunk records.
+
+A body is cut at Markdown headings first, then at paragraphs, and paragraphs
+longer than the token budget at sentences (and, failing that, at words).
+Pieces are packed greedily into chunks of at most ``max_tokens`` tokens, and
+consecutive chunks of one section share up to ``overlap`` tokens of trailing
+text. Chunks never span a heading, so an edit only moves the boundaries of
+its own section. Fenced code blocks are never split at blank lines.
+
+Every chunk gets an ID derived from its document ID and a hash of its heading
+path and text. Re-ingesting an edited article changes the IDs of the chunks
+that changed and keeps all others, so embedding jobs only need to embed IDs
+they have not seen. Records carry the document's metadata down to each chunk.
+
+:class:`Chunker` consumes a body incrementally, so streamed bodies are chunked
+without being joined, and :func:`iter_chunks` / :func:`bundle_chunks` are
+generators that can feed a :class:`~knowledge_core.records.RecordWriter`
+directly.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from knowledge_core.validation import article_id
+
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP = 64
+
+# Rough stand-in for a subword tokenizer: one token per word or punctuation mark
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_HEADING = re.compile(r" {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+_FENCE = re.compile(r" {0,3}(```|~~~)")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the number of tokens in ``text`` (words plus punctuation marks)."""
+    return len(_TOKEN.findall(text))
+
+
+def chunk_id(doc_id: str, content_hash: str) -> str:
+    """Return the stable ID of a chunk with ``content_hash`` in document ``doc_id``."""
+    return hashlib.sha256(f"{doc_id}\0{content_hash}".encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """One chunk of a body, with the headings of the section it belongs to."""
+
+    index: int
+    text: str
+    tokens: int
+    headings: Tuple[str, ...]
+    content_hash: str
+
+    def record(self, doc_id: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Return the chunk as an embedding-ready record of document ``doc_id``."""
+        return {
+            "id": chunk_id(doc_id, self.content_hash),
+            "doc_id": doc_id,
+            "chunk": self.index,
+            "text": self.text,
+            "tokens": self.tokens,
+            "headings": list(self.headings),
+            "content_hash": self.content_hash,
+            "metadata": dict(metadata or {}),
+        }
+
+
+class Chunker:
+    """Incremental chunker for a body that arrives in pieces.
+
+    Call :meth:`update` with each piece (or pass the pieces through
+    :meth:`feed`), then :meth:`close`. Finished chunks collect in ``chunks``;
+    :meth:`take` hands them out and clears the list. ``count`` maps text to a
+    token count; pass a real tokenizer's length function for exact budgets.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        overlap: int = DEFAULT_OVERLAP,
+        count: Callable[[str], int] = count_tokens,
+    ) -> None:
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be positive")
+        if not 0 <= overlap < max_tokens:
+            raise ValueError("overlap must be at least 0 and less than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.chunks: List[Chunk] = []
+        self._count = count
+        self._carry = ""
+        self._paragraph: List[str] = []
+        self._fence: Optional[str] = None
+        self._headings: List[Tuple[int, str]] = []
+        # Pieces of the chunk being built: text, token count and the separator placed before it
+        self._units: List[Tuple[str, int, str]] = []
+        self._tokens = 0
+        # False while the chunk only holds text carried over from the previous one
+        self._fresh = False
+        self._index = 0
+        self._seen: Dict[str, int] = {}
+
+    def update(self, text: str) -> None:
+        """Add the next piece of the body."""
+        lines = (self._carry + text).split("\n")
+        self._carry = lines.pop()
+        for line in lines:
+            self._line(line)
+
+    def feed(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield ``chunks`` unchanged while adding each one to the chunker."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        """Finish the body, flushing the last chunk."""
+        if self._carry:
+            self._line(self._carry)
+            self._carry = ""
+        self._end_paragraph()
+        self._emit()
+
+    def take(self) -> List[Chunk]:
+        """Return the chunks finished so far and forget them."""
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+    def _line(self, line: str) -> None:
+        line = line.rstrip("\r")
+        if self._fence is not None:
+            self._paragraph.append(line)
+            if line.lstrip().startswith(self._fence):
+                self._fence = None
+            return
+        fence = _FENCE.match(line)
+        if fence:
+            self._fence = fence.group(1)
+            self._paragraph.append(line)
+            return
+        heading = _HEADING.match(line)
+        if heading:
+            self._end_paragraph()
+            self._emit()
+            level = len(heading.group(1))
+            self._headings = [entry for entry in self._headings if entry[0] < level] + [(level, heading.group(2))]
+            self._add(line.strip())
+        elif line.strip():
+            self._paragraph.append(line)
+        else:
+            self._end_paragraph()
+
+    def _end_paragraph(self) -> None:
+        if self._paragraph:
+            text = "\n".join(self._paragraph).strip("\n")
+            self._paragraph = []
+            if text.strip():
+                self._add(text)
+
+    def _add(self, text: str, separator: str = "\n\n") -> None:
+        tokens = self._count(text)
+        if tokens > self.max_tokens:
+            pieces = self._split(text)
+            if len(pieces) > 1:
+                # Pieces of one paragraph are joined back with spaces
+                for position, piece in enumerate(pieces):
+                    self._add(piece, separator if position == 0 else " ")
+                return
+            # A single unbreakable piece (e.g. one huge token run) becomes an oversized chunk
+        if self._fresh and self._tokens + tokens > self.max_tokens:
+            self._emit(self._overlap(self.max_tokens - tokens))
+        self._units.append((text, tokens, separator))
+        self._tokens += tokens
+        self._fresh = True
+
+    def _split(self, text: str) -> List[str]:
+        sentences = [sentence for sentence in _SENTENCE_END.split(text) if sentence]
+        if len(sentences) > 1:
+            return sentences
+        pieces: List[str] = []
+        words: List[str] = []
+        tokens = 0
+        for word in text.split():
+            size = self._count(word)
+            if words and tokens + size > self.max_tokens:
+                pieces.append(" ".join(words))
+                words, tokens = [], 0
+            words.append(word)
+            tokens += size
+        if words:
+            pieces.append(" ".join(words))
+        return pieces
+
+    def _overlap(self, room: int) -> List[Tuple[str, int, str]]:
+        # Trailing units (or trailing sentences of the last unit) that fit in the overlap budget
+        budget = min(self.overlap, room)
+        carried: List[Tuple[str, int, str]] = []
+        for text, tokens, separator in reversed(self._units):
+            if tokens > budget:
+                sentences = _SENTENCE_END.split(text)
+                tail: List[str] = []
+                for sentence in reversed(sentences[1:] if len(sentences) > 1 else []):
+                    size = self._count(sentence)
+                    if size > budget:
+                        break
+                    tail.insert(0, sentence)
+                    budget -= size
+                if tail:
+                    text = " ".join(tail)
+                    carried.insert(0, (text, self._count(text), separator))
+                break
+            carried.insert(0, (text, tokens, separator))
+            budget -= tokens
+        return carried
+
+    def _emit(self, carried: Optional[List[Tuple[str, int, str]]] = None) -> None:
+        if self._fresh:
+            text = "".join(separator + unit for unit, _, separator in self._units)[len(self._units[0][2]):]
+            headings = tuple(title for _, title in self._headings)
+            digest = hashlib.sha256(("\n".join(headings) + "\0" + text).encode("utf-8")).hexdigest()
+            # Repeated chunks in one body still get distinct, stable hashes
+            repeats = self._seen.get(digest, 0)
+            self._seen[digest] = repeats + 1
+            if repeats:
+                digest = hashlib.sha256(f"{digest}:{repeats}".encode("utf-8")).hexdigest()
+            self.chunks.append(Chunk(self._index, text, self._tokens, headings, digest))
+            self._index += 1
+        self._units = list(carried or [])
+        self._tokens = sum(tokens for _, tokens, _ in self._units)
+        self._fresh = False
+
+
+def iter_chunks(
+    body: "str | Iterable[str]",
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap: int = DEFAULT_OVERLAP,
+    count: Callable[[str], int] = count_tokens,
+) -> Iterator[Chunk]:
+    """Yield the chunks of a body given whole or as an iterable of pieces."""
+    chunker = Chunker(max_tokens, overlap, count)
+    for text in [body] if isinstance(body, str) else body:
+        chunker.update(text)
+        yield from chunker.take()
+    chunker.close()
+    yield from chunker.take()
+
+
+def chunk_records(
+    doc_id: str,
+    body: "str | Iterable[str]",
+    metadata: Optional[Dict[str, Any]] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap: int = DEFAULT_OVERLAP,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the chunk records of one document, each carrying ``metadata``."""
+    for chunk in iter_chunks(body, max_tokens, overlap):
+        yield chunk.record(doc_id, metadata)
+
+
+def bundle_chunks(
+    bundle: Iterable[dict], max_tokens: int = DEFAULT_MAX_TOKENS, overlap: int = DEFAULT_OVERLAP
+) -> Iterator[Dict[str, Any]]:
+    """Yield the chunk records of app bundle entries, identified by their source files.
+
+    See :func:`knowledge_core.validation.article_id`; titles alone are not unique.
+    """
+    for article in bundle:
+        meta = article.get("metadata") or {}
+        yield from chunk_records(article_id(article), article.get("content") or "", meta, max_tokens, overlap)
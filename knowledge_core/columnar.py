@@ -0,0 +1,217 @@
+"""
+columnar.py
+
+Parquet and Arrow IPC export with fixed schemas.
+
+Two record shapes are supported: app bundle entries (``metadata``, ``content``,
+``issues``) and flat article records from the ingestion script. Metadata fields
+get typed columns, issue and PII lists are ``list<string>``, and bundle content
+lives in its own column so readers that only need metadata never decode it.
+Low-cardinality taxonomy fields are dictionary-encoded. Metadata keys outside the
+schema are kept as a JSON object in the ``extra`` column, so nothing is lost.
+
+pyarrow is an optional dependency; it is imported only when an export runs.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+# Bound by _require_pyarrow() on first use; pyarrow is slow to import
+pa = None
+pq = None
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+SCHEMA_VERSION = "2"
+
+# Taxonomy fields with few distinct values, stored as dictionary columns
+DICTIONARY_FIELDS = ("domain", "subdomain", "audience", "format", "status")
+# Text metadata columns shared by both schemas, in column order
+METADATA_FIELDS = ("title",) + DICTIONARY_FIELDS + ("author", "last_updated")
+
+DEFAULT_BATCH_ROWS = 1024
+
+
+def is_columnar(path: str) -> bool:
+    """Return True if ``path`` names a Parquet or Arrow IPC file."""
+    return path.endswith(PARQUET_SUFFIXES + ARROW_SUFFIXES)
+
+
+def _require_pyarrow() -> None:
+    global pa, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.parquet  # type: ignore
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for Parquet/Arrow export; install it with `pip install pyarrow`"
+        ) from exc
+    pa, pq = pyarrow, pyarrow.parquet
+
+
+def _metadata_fields() -> List["pa.Field"]:
+    text = pa.string()
+    category = pa.dictionary(pa.int32(), pa.string())
+    return [pa.field(name, category if name in DICTIONARY_FIELDS else text) for name in METADATA_FIELDS]
+
+
+def bundle_schema() -> "pa.Schema":
+    """Schema for app bundle entries: metadata columns, issues, extra metadata and content."""
+    _require_pyarrow()
+    fields = _metadata_fields() + [
+        pa.field("issues", pa.list_(pa.string())),
+        pa.field("extra", pa.string()),
+        pa.field("content", pa.large_string()),
+    ]
+    return pa.schema(fields, metadata={"knowledge.schema": f"bundle/{SCHEMA_VERSION}"})
+
+
+def article_schema() -> "pa.Schema":
+    """Schema for ingestion article records (no content column)."""
+    _require_pyarrow()
+    fields = _metadata_fields() + [
+        pa.field("path", pa.string()),
+        pa.field("pii", pa.list_(pa.string())),
+        pa.field("issues", pa.list_(pa.string())),
+        pa.field("extra", pa.string()),
+    ]
+    return pa.schema(fields, metadata={"knowledge.schema": f"article/{SCHEMA_VERSION}"})
+
+
+def _text(value: Any) -> Optional[str]:
+    # Dates and other scalars are stored as text; invalid dates are part of what validation reports
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _extra(mapping: Dict[str, Any], known: Iterable[str]) -> Optional[str]:
+    rest = {key: value for key, value in mapping.items() if key not in known}
+    return json.dumps(rest, default=str, sort_keys=True) if rest else None
+
+
+def bundle_row(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one bundle entry into a row of :func:`bundle_schema`."""
+    meta = article.get("metadata") or {}
+    row = {name: _text(meta.get(name)) for name in METADATA_FIELDS}
+    row["issues"] = [str(issue) for issue in article.get("issues") or []]
+    row["extra"] = _extra(meta, METADATA_FIELDS)
+    row["content"] = article.get("content") or ""
+    return row
+
+
+def article_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one ingestion article record into a row of :func:`article_schema`."""
+    row = {name: _text(record.get(name)) for name in METADATA_FIELDS}
+    row["path"] = _text(record.get("path"))
+    pii = record.get("pii")
+    row["pii"] = None if pii is None else [str(kind) for kind in pii]
+    issues = record.get("issues")
+    row["issues"] = None if issues is None else [str(issue) for issue in issues]
+    row["extra"] = _extra(record, METADATA_FIELDS + ("path", "pii", "issues"))
+    return row
+
+
+class ColumnarWriter:
+    """Write rows to a Parquet or Arrow IPC file in fixed-size record batches.
+
+    The format follows the file suffix. Rows are buffered ``batch_rows`` at a
+    time, so memory is bounded by the batch rather than the dataset. Each
+    dictionary column keeps one growing dictionary for the whole file, which
+    Arrow IPC files require (later batches only append deltas). Data is
+    written to a temporary file that replaces ``path`` only when the writer is
+    closed without error. Use as a context manager.
+    """
+
+    def __init__(self, path: str, schema: "pa.Schema", batch_rows: int = DEFAULT_BATCH_ROWS) -> None:
+        _require_pyarrow()
+        if not is_columnar(path):
+            raise ValueError(f"Unsupported columnar file type for {path}; use .parquet or .arrow")
+        self.path = path
+        self.schema = schema
+        self.batch_rows = batch_rows
+        self.count = 0
+        self._rows: List[Dict[str, Any]] = []
+        # Value -> index for every dictionary column, shared across batches
+        self._dictionaries: Dict[str, Dict[str, int]] = {
+            field.name: {} for field in schema if pa.types.is_dictionary(field.type)
+        }
+        self._tmp_path = f"{path}.tmp"
+        if path.endswith(PARQUET_SUFFIXES):
+            self._writer = pq.ParquetWriter(
+                self._tmp_path, schema, compression="zstd", use_dictionary=list(self._dictionaries)
+            )
+        else:
+            options = pa.ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self._tmp_path, schema, options=options)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._rows.append(row)
+        self.count += 1
+        if len(self._rows) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        arrays = []
+        for field in self.schema:
+            values = [row.get(field.name) for row in self._rows]
+            dictionary = self._dictionaries.get(field.name)
+            if dictionary is None:
+                arrays.append(pa.array(values, type=field.type))
+                continue
+            indices = [None if value is None else dictionary.setdefault(value, len(dictionary)) for value in values]
+            arrays.append(
+                pa.DictionaryArray.from_arrays(
+                    pa.array(indices, type=field.type.index_type),
+                    pa.array(list(dictionary), type=field.type.value_type),
+                )
+            )
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self._rows = []
+
+    def close(self, commit: bool = True) -> None:
+        if commit:
+            self._flush()
+        self._writer.close()
+        if commit:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+
+def write_bundle(bundle: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write app bundle entries to a Parquet or Arrow file; returns the row count."""
+    with ColumnarWriter(path, bundle_schema()) as writer:
+        for article in bundle:
+            writer.write(bundle_row(article))
+    return writer.count
+
+
+def write_articles(records: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write ingestion article records to a Parquet or Arrow file; returns the row count."""
+    with ColumnarWriter(path, article_schema()) as writer:
+        for record in records:
+            writer.write(article_row(record))
+    return writer.count
+
+
+def read_table(path: str, columns: Optional[List[str]] = None) -> "pa.Table":
+    """Read a Parquet or Arrow export, optionally loading only ``columns``."""
+    _require_pyarrow()
+    if path.endswith(PARQUET_SUFFIXES):
+        return pq.read_table(path, columns=columns)
+    # Memory-mapped, so unselected columns are never read from disk
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return table.select(columns) if columns else table
@@ -0,0 +1,452 @@
+"""
+dedup.py
+
+Duplicate and near-duplicate detection across uploads and ingestion runs.
+
+Every article body gets a :class:`Signature`: a SHA-256 of its normalized
+words (lowercased, punctuation and layout dropped), which catches exact copies
+such as the same text exported to PDF and DOCX, and a MinHash of its word
+shingles, which estimates the Jaccard similarity of two bodies. Signatures are
+built incrementally by a :class:`Signer`, so streamed bodies never need to be
+joined.
+
+:class:`DedupIndex` keeps signatures in a SQLite file together with LSH band
+keys: the MinHash is cut into bands and each band hashed, so a lookup costs
+one indexed query per band and only documents sharing a band are compared,
+however large the index grows. Documents are numbered in the order they are
+indexed and each one links to the matching documents indexed *before* it, so
+the first copy seen is the canonical one and links stay stable across runs.
+
+NumPy is imported when the first signature is computed.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Bound by _require_numpy() when the first signature is computed
+np = None
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_WORDS = 5
+# Links kept per document, best matches first
+MAX_LINKS = 10
+# Bump whenever signatures change so indexes built by older versions are rebuilt
+DEDUP_VERSION = "1"
+# Adds between commits; call DedupIndex.flush() once a batch is done
+COMMIT_EVERY = 256
+# Shingles hashed per NumPy block, to bound the (shingles x permutations) temporary
+_BLOCK = 4096
+_SEED = 20240501
+# Characters of a word that feed its hash; longer words are hashed by their prefix
+_WORD_CHARS = 24
+_TOKEN = re.compile(r"\w+")
+_EXACT_PREFIX = "Duplicate of "
+_NEAR_PREFIX = "Near-duplicate of "
+
+
+def _require_numpy() -> None:
+    global np
+    if np is None:
+        try:
+            import numpy  # type: ignore
+        except ImportError as exc:
+            raise ImportError("numpy is required for duplicate detection; install it with `pip install numpy`") from exc
+        np = numpy
+
+
+def default_dedup_path() -> str:
+    """Return the index location from ``KNOWLEDGE_DEDUP_PATH``, next to the content cache by default.
+
+    An empty ``KNOWLEDGE_DEDUP_PATH`` disables duplicate detection and yields ``""``.
+    """
+    env = os.environ.get("KNOWLEDGE_DEDUP_PATH")
+    if env is not None:
+        return env
+    return os.path.join(os.path.expanduser("~"), ".cache", "knowledge-ai", "dedup.sqlite")
+
+
+def default_threshold() -> float:
+    """Return the near-duplicate threshold from ``KNOWLEDGE_DEDUP_THRESHOLD`` (default 0.8)."""
+    try:
+        return float(os.environ.get("KNOWLEDGE_DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+    except ValueError:
+        return DEFAULT_THRESHOLD
+
+
+def lsh_bands(threshold: float, num_perm: int = DEFAULT_NUM_PERM) -> Tuple[int, int]:
+    """Return ``(bands, rows)`` for the LSH index.
+
+    Picks the most rows per band (the fewest false candidates) for which a pair
+    exactly at ``threshold`` still shares a band with 99% probability.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= 0.99:
+            best = (bands, rows)
+    return best
+
+
+@dataclass
+class Signature:
+    """Exact-content hash and MinHash of one article body."""
+
+    content_hash: str
+    minhash: "np.ndarray"
+
+    def similarity(self, other: "Signature") -> float:
+        """Estimate the Jaccard similarity of the two bodies' shingle sets."""
+        if self.content_hash == other.content_hash:
+            return 1.0
+        return float(np.count_nonzero(self.minhash == other.minhash)) / len(self.minhash)
+
+
+@dataclass(frozen=True)
+class Duplicate:
+    """A link from a document to an earlier, (near-)identical one."""
+
+    id: str
+    kind: str  # "exact" or "near"
+    similarity: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "kind": self.kind, "similarity": round(self.similarity, 4)}
+
+
+@lru_cache(maxsize=None)
+def _permutations(num_perm: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    # Multiply-shift hashing: odd 64-bit multipliers and offsets; the high 32 bits are kept
+    rng = np.random.default_rng(_SEED)
+    multipliers = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    return multipliers, rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+
+def _word_hashes(words: List[str]) -> "np.ndarray":
+    # Polynomial hash over the UTF-32 code points of each word, one column at a time
+    codes = np.array(words, dtype=f"U{_WORD_CHARS}")
+    codes = codes.view(np.uint32).reshape(len(words), -1).astype(np.uint64)
+    hashes = np.zeros(len(words), dtype=np.uint64)
+    for column in range(codes.shape[1]):
+        hashes = hashes * np.uint64(1099511628211) + codes[:, column]
+    return hashes
+
+
+class Signer:
+    """Builds the :class:`Signature` of a body fed as one or more text chunks.
+
+    Words split across chunk boundaries and shingles spanning chunks are
+    handled, so any chunking of the same text yields the same signature.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_words: int = DEFAULT_SHINGLE_WORDS) -> None:
+        _require_numpy()
+        self._mul, self._add = _permutations(num_perm)
+        self.shingle_words = shingle_words
+        self._mins = np.full(num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        self._digest = hashlib.sha256()
+        self._carry = ""
+        # Hashes of the last shingle_words - 1 words, to continue shingles into the next chunk
+        self._tail = np.zeros(0, dtype=np.uint64)
+        self._shingles = 0
+
+    def update(self, text: str, final: bool = False) -> None:
+        """Add the next chunk of the body; ``final`` marks the last one."""
+        text = self._carry + text
+        words = _TOKEN.findall(text.lower())
+        # A word touching the end of the chunk may continue in the next one
+        self._carry = words.pop() if words and not final and _TOKEN.match(text[-1:]) else ""
+        self._add_words(words)
+
+    def feed(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield ``chunks`` unchanged while adding them to the signature."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def signature(self) -> Optional[Signature]:
+        """Return the signature of everything fed so far, or None for a body without words."""
+        if self._carry:
+            self._add_words([self._carry])
+            self._carry = ""
+        if not self._shingles:
+            if not len(self._tail):
+                return None
+            # Shorter than one shingle: the whole body is the only shingle
+            self._add_shingles(self._combine(self._tail, len(self._tail)))
+        return Signature(self._digest.hexdigest(), self._mins.copy())
+
+    def _add_words(self, words: List[str]) -> None:
+        if not words:
+            return
+        self._digest.update((" ".join(words) + " ").encode("utf-8"))
+        hashes = np.concatenate([self._tail, _word_hashes(words)])
+        k = self.shingle_words
+        if len(hashes) >= k:
+            self._add_shingles(self._combine(hashes, k))
+            self._shingles += len(hashes) - k + 1
+        self._tail = hashes[-(k - 1):] if k > 1 else hashes[:0]
+
+    @staticmethod
+    def _combine(hashes: "np.ndarray", k: int) -> "np.ndarray":
+        # Polynomial hash of every window of k consecutive word hashes (wrapping uint64 arithmetic)
+        count = len(hashes) - k + 1
+        combined = np.zeros(count, dtype=np.uint64)
+        for offset in range(k):
+            combined = combined * np.uint64(1000003) + hashes[offset:offset + count]
+        return combined ^ (combined >> np.uint64(29))
+
+    def _add_shingles(self, shingles: "np.ndarray") -> None:
+        for start in range(0, len(shingles), _BLOCK):
+            block = shingles[start:start + _BLOCK, None]
+            hashed = ((block * self._mul + self._add) >> np.uint64(32)).astype(np.uint32)
+            np.minimum(self._mins, hashed.min(axis=0), out=self._mins)
+
+
+def sign(
+    text: str, num_perm: int = DEFAULT_NUM_PERM, shingle_words: int = DEFAULT_SHINGLE_WORDS
+) -> Optional[Signature]:
+    """Return the signature of a whole body (None if it has no words)."""
+    signer = Signer(num_perm, shingle_words)
+    signer.update(text, final=True)
+    return signer.signature()
+
+
+def duplicate_issue(duplicates: List[Duplicate]) -> Optional[str]:
+    """Return the issue reported for a document's best match, if any."""
+    if not duplicates:
+        return None
+    best = duplicates[0]
+    if best.kind == "exact":
+        return f"{_EXACT_PREFIX}{best.id}"
+    return f"{_NEAR_PREFIX}{best.id} ({best.similarity:.0%} similar)"
+
+
+def is_duplicate_issue(issue: str) -> bool:
+    """Return True for issues produced by :func:`duplicate_issue`."""
+    return issue.startswith((_EXACT_PREFIX, _NEAR_PREFIX))
+
+
+def link_duplicates(article: dict, duplicates: List[Duplicate]) -> dict:
+    """Return a bundle entry with its duplicate links and issue added.
+
+    Links go to ``metadata["duplicate_of"]`` as ``{"id", "kind",
+    "similarity"}`` dicts; ``article`` itself is not modified.
+    """
+    if not duplicates:
+        return article
+    metadata = {**article["metadata"], "duplicate_of": [duplicate.to_dict() for duplicate in duplicates]}
+    issues = [issue for issue in article["issues"] if not is_duplicate_issue(issue)] + [duplicate_issue(duplicates)]
+    return {**article, "metadata": metadata, "issues": issues}
+
+
+class DedupIndex:
+    """Persistent MinHash/LSH index of article signatures.
+
+    ``path`` is a SQLite file (``":memory:"`` for a throwaway index). Pairs
+    whose estimated similarity reaches ``threshold`` are reported as
+    near-duplicates; changing it only re-bands the stored signatures, while
+    changing ``num_perm`` or ``shingle_words`` empties the index. The index is
+    safe to share between threads of one process.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        threshold: Optional[float] = None,
+        num_perm: int = DEFAULT_NUM_PERM,
+        shingle_words: int = DEFAULT_SHINGLE_WORDS,
+    ) -> None:
+        self.path = path
+        self.threshold = default_threshold() if threshold is None else threshold
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.bands, self.rows = lsh_bands(self.threshold, num_perm)
+        self._lock = threading.Lock()
+        self._pending = 0
+        parent = os.path.dirname(path) if path != ":memory:" else ""
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL UNIQUE,"
+            " content_hash TEXT NOT NULL,"
+            " minhash BLOB NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS docs_content_hash ON docs (content_hash);"
+            "CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, seq INTEGER NOT NULL,"
+            " PRIMARY KEY (key, seq)) WITHOUT ROWID;"
+        )
+        self._check_settings()
+
+    def _check_settings(self) -> None:
+        settings = dict(self._conn.execute("SELECT name, value FROM settings"))
+        shape = f"{DEDUP_VERSION}:{self.num_perm}:{self.shingle_words}"
+        if settings.get("shape") != shape:
+            self._conn.executescript("DELETE FROM docs; DELETE FROM bands;")
+        elif settings.get("bands") != f"{self.bands}x{self.rows}":
+            # Same signatures, different threshold: recompute the band keys only
+            self._conn.execute("DELETE FROM bands")
+            for seq, minhash in self._conn.execute("SELECT seq, minhash FROM docs").fetchall():
+                self._insert_bands(seq, self._decode(minhash))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)",
+            [("shape", shape), ("bands", f"{self.bands}x{self.rows}")],
+        )
+        self._conn.commit()
+
+    # Signatures -----------------------------------------------------------
+
+    def signer(self) -> Signer:
+        """Return a :class:`Signer` matching this index's parameters."""
+        return Signer(self.num_perm, self.shingle_words)
+
+    def sign(self, text: str) -> Optional[Signature]:
+        return sign(text, self.num_perm, self.shingle_words)
+
+    # Queries and updates --------------------------------------------------
+
+    def add(self, doc_id: str, signature: Optional[Signature]) -> List[Duplicate]:
+        """Index ``signature`` under ``doc_id`` and return the earlier documents it duplicates.
+
+        A document already indexed under ``doc_id`` is replaced but keeps its
+        place in the order, so re-adding a batch never links an original to
+        one of its later copies. A None signature (an empty body) is not
+        indexed and has no duplicates.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT seq, content_hash, minhash FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            seq = row[0] if row is not None else None
+            if signature is not None:
+                minhash = signature.minhash.astype("<u4").tobytes()
+                if row is not None and (row[1], row[2]) == (signature.content_hash, minhash):
+                    # Unchanged: keep the stored entry
+                    return self._query(signature, before=seq)
+            self._remove(doc_id)
+            if signature is None:
+                return []
+            duplicates = self._query(signature, before=seq)
+            cursor = self._conn.execute(
+                "INSERT INTO docs (seq, id, content_hash, minhash) VALUES (?, ?, ?, ?)",
+                (seq, doc_id, signature.content_hash, minhash),
+            )
+            self._insert_bands(cursor.lastrowid, signature.minhash)
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._commit()
+        return duplicates
+
+    def add_text(self, doc_id: str, text: str) -> List[Duplicate]:
+        """Sign ``text`` and :meth:`add` it."""
+        return self.add(doc_id, self.sign(text))
+
+    def query(self, signature: Signature) -> List[Duplicate]:
+        """Return the indexed documents that ``signature`` duplicates, without indexing it."""
+        with self._lock:
+            return self._query(signature)
+
+    def links(self, doc_id: str) -> List[Duplicate]:
+        """Return the duplicates of an indexed document among those indexed before it."""
+        with self._lock:
+            row = self._conn.execute("SELECT seq, content_hash, minhash FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            if row is None:
+                return []
+            seq, content_hash, minhash = row
+            return self._query(Signature(content_hash, self._decode(minhash)), before=seq)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def flush(self) -> None:
+        """Commit pending additions."""
+        with self._lock:
+            self._commit()
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM docs WHERE id = ?", (doc_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": len(self), "threshold": self.threshold, "bands": self.bands, "rows": self.rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    # Internals ------------------------------------------------------------
+
+    def _decode(self, blob: bytes) -> "np.ndarray":
+        _require_numpy()
+        return np.frombuffer(blob, dtype="<u4").astype(np.uint32)
+
+    def _band_keys(self, minhash: "np.ndarray") -> List[int]:
+        data = minhash.astype("<u4").tobytes()
+        width = self.rows * 4
+        return [
+            int.from_bytes(
+                hashlib.blake2b(data[band * width:(band + 1) * width], digest_size=8, person=band.to_bytes(8, "little"))
+                .digest(),
+                "little",
+                signed=True,
+            )
+            for band in range(self.bands)
+        ]
+
+    def _insert_bands(self, seq: int, minhash: "np.ndarray") -> None:
+        self._conn.executemany("INSERT OR IGNORE INTO bands (key, seq) VALUES (?, ?)",
+                               [(key, seq) for key in self._band_keys(minhash)])
+
+    def _query(self, signature: Signature, before: Optional[int] = None) -> List[Duplicate]:
+        limit = before if before is not None else -1
+        found: Dict[int, Duplicate] = {}
+        for seq, doc_id in self._conn.execute(
+            "SELECT seq, id FROM docs WHERE content_hash = ? AND (? < 0 OR seq < ?)",
+            (signature.content_hash, limit, limit),
+        ):
+            found[seq] = Duplicate(doc_id, "exact", 1.0)
+        keys = self._band_keys(signature.minhash)
+        candidates = set()
+        for key in keys:
+            candidates.update(seq for (seq,) in self._conn.execute("SELECT seq FROM bands WHERE key = ?", (key,)))
+        candidates = [seq for seq in candidates if seq not in found and (before is None or seq < before)]
+        for start in range(0, len(candidates), 500):
+            chunk = candidates[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for seq, doc_id, content_hash, minhash in self._conn.execute(
+                f"SELECT seq, id, content_hash, minhash FROM docs WHERE seq IN ({marks})", chunk
+            ):
+                similarity = signature.similarity(Signature(content_hash, self._decode(minhash)))
+                if similarity >= self.threshold:
+                    found[seq] = Duplicate(doc_id, "near", similarity)
+        # Exact copies first, then by similarity, then the earliest document
+        ranked = sorted(found.items(), key=lambda item: (item[1].kind != "exact", -item[1].similarity, item[0]))
+        return [duplicate for _, duplicate in ranked[:MAX_LINKS]]
+
+    def _remove(self, doc_id: str) -> None:
+        row = self._conn.execute("SELECT seq, minhash FROM docs WHERE id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return
+        seq, minhash = row
+        self._conn.executemany("DELETE FROM bands WHERE key = ? AND seq = ?",
+                               [(key, seq) for key in self._band_keys(self._decode(minhash))])
+        self._conn.execute("DELETE FROM docs WHERE seq = ?", (seq,))
+        self._pending += 1
+
+    def _commit(self) -> None:
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
@@ -0,0 +1,389 @@
+"""
+docxtext.py
+
+Streaming DOCX-to-text extraction.
+
+A DOCX file is a zip archive of XML parts. :func:`read_docx` opens only the
+parts that carry text or metadata: the main document, its headers, footers,
+footnotes and endnotes, ``word/styles.xml`` for heading levels and
+``docProps/core.xml`` for the core properties. Images and other media are
+never decompressed. Each text part is parsed with
+:func:`xml.etree.ElementTree.iterparse` straight from the zip stream, and
+elements are cleared once their paragraph, table row or note has been emitted,
+so memory is bounded by the largest table rather than by the document.
+
+The text is lightly marked up: headings (the Title style, "heading N" styles
+and outline levels) become ``#`` lines, list paragraphs ``- `` items and table
+rows ``cell | cell`` lines. Header and footer text follows the body, each
+distinct text once, then footnotes and endnotes as ``[^n]: text`` lines that
+match the ``[^n]`` markers left in the body.
+
+Archives that cannot be read raise :class:`DocxError` naming the part that
+failed, so callers report the file instead of validating an empty body.
+"""
+
+import io
+import posixpath
+import re
+import zipfile
+import zlib
+from functools import lru_cache
+from typing import IO, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from knowledge_core.streaming import DEFAULT_CHUNK_SIZE
+
+# WordprocessingML namespaces: transitional (what Word writes) and strict
+WORD_NAMESPACES = (
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main",
+)
+MC_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+RELS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+# Core properties mapped onto front matter fields; the first element found wins
+CORE_FIELDS = {
+    "title": ("{http://purl.org/dc/elements/1.1/}title",),
+    "author": ("{http://purl.org/dc/elements/1.1/}creator",),
+    "description": ("{http://purl.org/dc/elements/1.1/}description",),
+    "status": ("{http://schemas.openxmlformats.org/package/2006/metadata/core-properties}contentStatus",),
+    "last_updated": ("{http://purl.org/dc/terms/}modified", "{http://purl.org/dc/terms/}created"),
+}
+# Footnote and endnote types that are layout furniture rather than notes
+NOTE_SEPARATORS = frozenset({"separator", "continuationSeparator", "continuationNotice"})
+MAX_HEADING_LEVEL = 6
+
+_HEADING_NAME = re.compile(r"heading\s*([1-9])$", re.IGNORECASE)
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# Elements whose subtree repeats or drops text: the fallback rendering of
+# alternate content (text boxes appear in both branches) and moved-from runs
+_SKIPPED = frozenset({f"{{{MC_NAMESPACE}}}Fallback"} | {f"{{{ns}}}moveFrom" for ns in WORD_NAMESPACES})
+
+
+class DocxError(ValueError):
+    """A DOCX archive, or one of the parts holding its text, could not be read."""
+
+
+@lru_cache(maxsize=None)
+def _names(namespace: str) -> Dict[str, str]:
+    # Qualified tag and attribute names of one WordprocessingML namespace, by local name
+    local = (
+        "body", "hdr", "ftr", "footnotes", "endnotes", "footnote", "endnote", "p", "pPr", "pStyle", "outlineLvl",
+        "numPr", "t", "tab", "br", "cr", "noBreakHyphen", "footnoteReference", "endnoteReference", "tbl", "tr",
+        "tc", "style", "name", "basedOn", "val", "id", "type", "styleId",
+    )
+    return {name: f"{{{namespace}}}{name}" for name in local}
+
+
+def _open_archive(source: str | bytes | BinaryIO) -> zipfile.ZipFile:
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        return zipfile.ZipFile(source)
+    except zipfile.BadZipFile as exc:
+        raise DocxError(f"not a DOCX (zip) archive: {exc}") from exc
+    except OSError as exc:
+        raise DocxError(f"cannot open DOCX: {exc}") from exc
+
+
+def _open_part(archive: zipfile.ZipFile, part: str) -> IO[bytes]:
+    try:
+        return archive.open(part)
+    except KeyError:
+        raise DocxError(f"DOCX has no {part} part") from None
+    except (zipfile.BadZipFile, NotImplementedError, RuntimeError, OSError) as exc:
+        raise DocxError(f"cannot read {part}: {exc}") from exc
+
+
+def _parse_part(archive: zipfile.ZipFile, part: str) -> ElementTree.Element:
+    # Small parts (relationships, styles, core properties) are parsed whole
+    with _open_part(archive, part) as f:
+        try:
+            return ElementTree.parse(f).getroot()
+        except (ElementTree.ParseError, zipfile.BadZipFile, zlib.error, EOFError, OSError) as exc:
+            raise DocxError(f"malformed {part}: {exc}") from exc
+
+
+def _relationships(archive: zipfile.ZipFile, part: str) -> List[Tuple[str, str]]:
+    """Return ``(type, target part)`` pairs for the internal relationships of ``part``, in file order."""
+    directory, name = posixpath.split(part)
+    rels_part = posixpath.join(directory, "_rels", name + ".rels")
+    if rels_part not in archive.NameToInfo:
+        return []
+    relationships = []
+    for rel in _parse_part(archive, rels_part).iter(f"{{{RELS_NAMESPACE}}}Relationship"):
+        target = rel.get("Target")
+        if not target or rel.get("TargetMode") == "External":
+            continue
+        if target.startswith("/"):
+            path = target.lstrip("/")
+        else:
+            path = posixpath.normpath(posixpath.join(directory, target))
+        relationships.append((rel.get("Type", "").rsplit("/", 1)[-1], path))
+    return relationships
+
+
+def read_core_properties(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Map ``docProps/core.xml`` onto front matter fields, skipping empty values.
+
+    ``last_updated`` takes the modified (or else created) timestamp, trimmed to
+    its ISO date.
+    """
+    core_part = next((target for rel_type, target in _relationships(archive, "") if rel_type == "core-properties"),
+                     "docProps/core.xml")
+    if core_part not in archive.NameToInfo:
+        return {}
+    root = _parse_part(archive, core_part)
+    meta: Dict[str, str] = {}
+    for field, tags in CORE_FIELDS.items():
+        for tag in tags:
+            element = root.find(tag)
+            value = (element.text or "").strip() if element is not None else ""
+            if value:
+                if field == "last_updated" and _ISO_DATE.match(value):
+                    value = value[:10]
+                meta[field] = value
+                break
+    return meta
+
+
+def read_paragraph_styles(archive: zipfile.ZipFile, part: str | None) -> Dict[str, Tuple[int, bool]]:
+    """Return ``{style id: (heading level, is list)}`` for the paragraph styles in ``part``.
+
+    The level is 0 for body text. Headings are recognised by outline level or
+    by the built-in "Title" and "heading N" names, and both the level and list
+    numbering are inherited through ``basedOn`` chains.
+    """
+    if part is None or part not in archive.NameToInfo:
+        return {}
+    root = _parse_part(archive, part)
+    w = _names(root.tag[1:].split("}", 1)[0]) if root.tag.startswith("{") else _names(WORD_NAMESPACES[0])
+    own: Dict[str, Tuple[Optional[int], Optional[bool], Optional[str]]] = {}
+    for style in root.iter(w["style"]):
+        if style.get(w["type"]) != "paragraph" or not style.get(w["styleId"]):
+            continue
+        name_element = style.find(w["name"])
+        name = (name_element.get(w["val"]) or "").strip() if name_element is not None else ""
+        level, is_list = _paragraph_format(style.find(w["pPr"]), w)
+        if level is None:
+            match = _HEADING_NAME.match(name)
+            level = int(match.group(1)) if match else 1 if name.lower() == "title" else None
+        based_on = style.find(w["basedOn"])
+        own[style.get(w["styleId"])] = (level, is_list, based_on.get(w["val"]) if based_on is not None else None)
+    styles: Dict[str, Tuple[int, bool]] = {}
+    for style_id in own:
+        level, is_list, parent = own[style_id]
+        seen = {style_id}
+        while (level is None or is_list is None) and parent in own and parent not in seen:
+            seen.add(parent)
+            parent_level, parent_list, next_parent = own[parent]
+            level = parent_level if level is None else level
+            is_list = parent_list if is_list is None else is_list
+            parent = next_parent
+        styles[style_id] = (level or 0, bool(is_list))
+    return styles
+
+
+def _paragraph_format(ppr: Optional[ElementTree.Element], w: Dict[str, str]) -> Tuple[Optional[int], Optional[bool]]:
+    # Heading level and list flag set directly on a paragraph or style; None where not set
+    if ppr is None:
+        return None, None
+    level = None
+    outline = ppr.find(w["outlineLvl"])
+    if outline is not None:
+        value = outline.get(w["val"], "")
+        # Outline levels run 0-8; 9 is body text
+        level = int(value) + 1 if value.isdigit() and int(value) < 9 else 0
+    return level, True if ppr.find(w["numPr"]) is not None else None
+
+
+class _PartReader:
+    """Turns the iterparse events of one text part into ``(text, kind)`` blocks.
+
+    ``kind`` tells the caller how to join blocks: consecutive list items, rows
+    of the same table and notes are separated by a line break, everything else
+    by a blank line.
+    """
+
+    def __init__(self, styles: Dict[str, Tuple[int, bool]]) -> None:
+        self.styles = styles
+        self.tables = 0
+
+    def blocks(self, stream: IO[bytes]) -> Iterator[Tuple[str, str]]:
+        w: Dict[str, str] = {}
+        paragraphs: List[List[str]] = []
+        # Open table cells and notes, which collect their paragraphs instead of emitting them
+        collectors: List[List[str]] = []
+        rows: List[List[str]] = []
+        table_kinds: List[str] = []
+        container = None
+        container_depth = depth = skip_depth = 0
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                depth += 1
+                if skip_depth or tag in _SKIPPED:
+                    skip_depth += 1
+                elif not w:
+                    # The root element sets the namespace of the part
+                    w = _names(tag[1:].split("}", 1)[0] if tag.startswith("{") else WORD_NAMESPACES[0])
+                    if tag in (w["hdr"], w["ftr"], w["footnotes"], w["endnotes"]):
+                        container, container_depth = element, depth
+                elif tag == w["p"]:
+                    paragraphs.append([])
+                elif tag == w["tc"] or tag == w["footnote"] or tag == w["endnote"]:
+                    collectors.append([])
+                elif tag == w["tr"]:
+                    rows.append([])
+                elif tag == w["tbl"]:
+                    self.tables += 1
+                    table_kinds.append(f"row{self.tables}")
+                elif tag == w["body"]:
+                    container, container_depth = element, depth
+                continue
+
+            depth -= 1
+            if skip_depth:
+                skip_depth -= 1
+                continue
+            if tag == w["t"]:
+                if paragraphs and element.text:
+                    paragraphs[-1].append(element.text)
+            elif tag == w["tab"]:
+                if paragraphs:
+                    paragraphs[-1].append("\t")
+            elif tag == w["br"] or tag == w["cr"]:
+                if paragraphs:
+                    paragraphs[-1].append("\n")
+            elif tag == w["noBreakHyphen"]:
+                if paragraphs:
+                    paragraphs[-1].append("-")
+            elif tag == w["footnoteReference"] or tag == w["endnoteReference"]:
+                if paragraphs:
+                    prefix = "" if tag == w["footnoteReference"] else "e"
+                    paragraphs[-1].append(f"[^{prefix}{element.get(w['id'], '')}]")
+            elif tag == w["p"]:
+                text = self._paragraph(element, "".join(paragraphs.pop()).strip(), w)
+                element.clear()
+                if text:
+                    if collectors:
+                        collectors[-1].append(text)
+                    else:
+                        kind = "list" if text.startswith("- ") else "block"
+                        yield text, kind
+            elif tag == w["tc"]:
+                cell = " ".join(collectors.pop()).replace("\n", " ")
+                if rows:
+                    rows[-1].append(cell)
+            elif tag == w["tr"]:
+                cells = rows.pop()
+                element.clear()
+                if any(cells):
+                    line = " | ".join(cells)
+                    if collectors:
+                        # A table nested in a cell becomes part of that cell's text
+                        collectors[-1].append(line)
+                    else:
+                        yield line, table_kinds[-1]
+            elif tag == w["tbl"]:
+                table_kinds.pop()
+            elif tag == w["footnote"] or tag == w["endnote"]:
+                note = " ".join(collectors.pop())
+                if note and element.get(w["type"]) not in NOTE_SEPARATORS:
+                    prefix = "" if tag == w["footnote"] else "e"
+                    yield f"[^{prefix}{element.get(w['id'], '')}]: {note}", "note"
+                element.clear()
+            if container is not None and depth == container_depth:
+                # Everything emitted so far hangs off the container; drop it
+                container.clear()
+
+    def _paragraph(self, element: ElementTree.Element, text: str, w: Dict[str, str]) -> str:
+        if not text:
+            return ""
+        ppr = element.find(w["pPr"])
+        level, is_list = 0, False
+        if ppr is not None:
+            style = ppr.find(w["pStyle"])
+            if style is not None:
+                level, is_list = self.styles.get(style.get(w["val"], ""), (0, False))
+            own_level, own_list = _paragraph_format(ppr, w)
+            level = level if own_level is None else own_level
+            is_list = is_list or bool(own_list)
+        if level:
+            return "#" * min(level, MAX_HEADING_LEVEL) + " " + " ".join(text.split())
+        if is_list:
+            return "- " + text
+        return text
+
+
+def _iter_blocks(
+    archive: zipfile.ZipFile, parts: List[str], reader: _PartReader, dedupe: bool
+) -> Iterator[Tuple[str, str]]:
+    seen = set()
+    for part in parts:
+        with _open_part(archive, part) as stream:
+            try:
+                if not dedupe:
+                    yield from reader.blocks(stream)
+                    continue
+                # Headers and footers repeat across sections; keep each distinct text once
+                blocks = list(reader.blocks(stream))
+            except (ElementTree.ParseError, zipfile.BadZipFile, zlib.error, EOFError, OSError) as exc:
+                raise DocxError(f"malformed {part}: {exc}") from exc
+        key = tuple(text for text, _ in blocks)
+        if blocks and key not in seen:
+            seen.add(key)
+            yield from blocks
+
+
+def read_docx(
+    source: str | bytes | BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[Dict[str, str], Iterator[str]]:
+    """Extract a DOCX document from a path, bytes or seekable binary file as a stream.
+
+    Returns the core-property metadata and an iterator over text chunks of
+    roughly ``chunk_size`` characters. The archive directory, relationships,
+    styles and core properties are read up front and the archive is closed
+    again. The body reopens it once iteration starts, is parsed lazily as the
+    chunks are consumed and closes it when the iterator is exhausted or
+    closed. Raises :class:`DocxError` for archives that are not DOCX files or
+    whose parts are corrupt, either here or while iterating.
+    """
+    with _open_archive(source) as archive:
+        document = next((target for rel_type, target in _relationships(archive, "") if rel_type == "officeDocument"),
+                        DEFAULT_DOCUMENT_PART)
+        if document not in archive.NameToInfo:
+            raise DocxError(f"DOCX has no {document} part")
+        related: Dict[str, List[str]] = {}
+        for rel_type, target in _relationships(archive, document):
+            if target in archive.NameToInfo:
+                related.setdefault(rel_type, []).append(target)
+        styles = read_paragraph_styles(archive, (related.get("styles") or [None])[0])
+        meta = read_core_properties(archive)
+
+    def body() -> Iterator[str]:
+        reader = _PartReader(styles)
+        sections = [
+            ([document], False),
+            (related.get("header", []) + related.get("footer", []), True),
+            (related.get("footnotes", []) + related.get("endnotes", []), False),
+        ]
+        buffer: List[str] = []
+        size = 0
+        previous = None
+        # Reopened here so no handle outlives a caller that reads only the metadata or stops early
+        with _open_archive(source) as archive:
+            for parts, dedupe in sections:
+                for text, kind in _iter_blocks(archive, parts, reader, dedupe):
+                    if previous is not None:
+                        buffer.append("\n" if kind == previous and kind != "block" else "\n\n")
+                    buffer.append(text)
+                    size += len(text)
+                    previous = kind
+                    if size >= chunk_size:
+                        yield "".join(buffer)
+                        buffer, size = [], 0
+            if buffer:
+                yield "".join(buffer)
+
+    return meta, body()
@@ -0,0 +1,195 @@
+"""
+executor.py
+
+Pluggable batch executor used to fan per-file extraction and validation out
+across a pool of workers. Results always come back in input order, and an
+optional per-item timeout keeps one pathological document from holding up the
+rest of the batch.
+"""
+
+import itertools
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Sized, Tuple
+
+EXECUTOR_KINDS = ("process", "thread", "serial")
+
+
+class TaskTimeoutError(Exception):
+    """Raised inside a worker when a single item exceeds its time budget."""
+
+
+@dataclass
+class TaskResult:
+    """Outcome of running the batch function on one input item."""
+
+    index: int
+    value: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def default_workers() -> int:
+    """Return the worker count from ``KNOWLEDGE_WORKERS`` or the CPU count."""
+    env = os.environ.get("KNOWLEDGE_WORKERS")
+    if env:
+        try:
+            return max(1, int(env))
+        except ValueError:
+            pass
+    return os.cpu_count() or 1
+
+
+def default_timeout() -> Optional[float]:
+    """Return the per-file timeout in seconds from ``KNOWLEDGE_FILE_TIMEOUT``.
+
+    Defaults to 120 seconds; a value of 0 disables the timeout.
+    """
+    env = os.environ.get("KNOWLEDGE_FILE_TIMEOUT", "120")
+    try:
+        value = float(env)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeoutError()
+
+
+def _can_use_alarm(timeout: Optional[float]) -> bool:
+    # SIGALRM is only available on POSIX and can only be installed from the
+    # main thread, which is where pool worker processes run their tasks.
+    return bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def run_task(func: Callable[[Any], Any], index: int, item: Any, timeout: Optional[float] = None) -> TaskResult:
+    """Run ``func(item)`` and capture its value, error and elapsed time.
+
+    When possible the timeout is enforced with an interval timer, so a stuck
+    extraction is interrupted rather than merely abandoned. Outside the main
+    thread the timeout cannot be enforced and the item runs to completion.
+    """
+    use_alarm = _can_use_alarm(timeout)
+    previous_handler = None
+    start = time.perf_counter()
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        value = func(item)
+        return TaskResult(index, value=value, elapsed=time.perf_counter() - start)
+    except TaskTimeoutError:
+        return TaskResult(
+            index,
+            error=f"timed out after {timeout:g}s",
+            timed_out=True,
+            elapsed=time.perf_counter() - start,
+        )
+    except Exception as exc:
+        return TaskResult(index, error=f"{type(exc).__name__}: {exc}", elapsed=time.perf_counter() - start)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+class BatchExecutor:
+    """Run a function over a batch of items and return ordered results.
+
+    ``kind`` selects a process pool (the default, suited to CPU-bound PDF and
+    DOCX parsing), a thread pool, or plain serial execution. An existing
+    ``concurrent.futures.Executor`` may be supplied instead via ``pool``; it is
+    used as-is and not shut down. Functions and items must be picklable when a
+    process pool is used.
+
+    Batches that do not need a pool (one worker or a single item) run on the
+    calling thread. With a ``timeout`` that thread must be the main thread to
+    enforce it, so off the main thread (e.g. in a web server's worker thread)
+    a process executor runs them in a one-worker pool instead. A ``serial``
+    executor always stays on the calling thread and cannot time items out
+    there.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        kind: str = "process",
+        pool: Optional[Executor] = None,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}'; expected one of {EXECUTOR_KINDS}")
+        self.workers = workers if workers and workers > 0 else default_workers()
+        self.timeout = timeout
+        self.kind = kind
+        self.pool = pool
+
+    def map(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[TaskResult]:
+        """Apply ``func`` to every item, returning one result per item in input order."""
+        return list(self.imap(func, items))
+
+    def imap(self, func: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[TaskResult]:
+        """Like :meth:`map`, but yield results in input order as they complete.
+
+        ``items`` may be any iterable, including an unbounded generator: it is
+        consumed lazily and at most two items per worker are in flight at a
+        time, so a consumer that writes results out as they arrive keeps
+        memory bounded. Closing the generator early cancels queued items.
+        """
+        # Never start more workers than there are items, when that is known up front
+        max_workers = min(self.workers, len(items)) if isinstance(items, Sized) else self.workers
+        items = iter(items)
+        head = list(itertools.islice(items, 2))
+        items = itertools.chain(head, items)
+        inline = self.workers <= 1 or len(head) <= 1
+        if self.kind == "process" and self.timeout and not _can_use_alarm(self.timeout):
+            # Only a pool worker's main thread can enforce the timeout
+            inline = False
+        if self.pool is None and (self.kind == "serial" or inline):
+            for idx, item in enumerate(items):
+                yield run_task(func, idx, item, self.timeout)
+            return
+        if self.pool is not None:
+            yield from self._collect(self.pool, func, items)
+            return
+        # Imported here so that loading the module does not pull in multiprocessing
+        if self.kind == "process":
+            from concurrent.futures import ProcessPoolExecutor as pool_cls
+        else:
+            from concurrent.futures import ThreadPoolExecutor as pool_cls
+        with pool_cls(max_workers=max_workers) as pool:
+            yield from self._collect(pool, func, items)
+
+    def _collect(self, pool: Executor, func: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[TaskResult]:
+        in_flight: Deque[Tuple[int, Future]] = deque()
+        max_in_flight = 2 * self.workers
+        try:
+            for idx, item in enumerate(items):
+                in_flight.append((idx, pool.submit(run_task, func, idx, item, self.timeout)))
+                if len(in_flight) >= max_in_flight:
+                    yield self._result(*in_flight.popleft())
+            while in_flight:
+                yield self._result(*in_flight.popleft())
+        finally:
+            # When the consumer stops early, drop work that has not started yet
+            for _, future in in_flight:
+                future.cancel()
+
+    @staticmethod
+    def _result(idx: int, future: Future) -> TaskResult:
+        try:
+            return future.result()
+        except Exception as exc:
+            # A worker crash (e.g. BrokenProcessPool) only fails its own item
+            return TaskResult(idx, error=f"{type(exc).__name__}: {exc}")
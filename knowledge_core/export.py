@@ -0,0 +1,153 @@
+"""
+export.py
+
+Serialization of validated bundles (lists of ``{"metadata", "content",
+"issues"}`` entries) to JSON, JSONL and Parquet files, a ZIP of one JSON file
+per article, a CSV of the validation table, or JSONL chunk records ready for
+embedding. Entries are written one at a time, so the complete serialized text
+is never held in memory.
+"""
+
+import csv
+import json
+import os
+import re
+import tempfile
+import textwrap
+import zipfile
+from typing import Iterable, List, Set
+
+from knowledge_core.chunking import bundle_chunks
+from knowledge_core.columnar import write_bundle
+from knowledge_core.metrics import timed
+from knowledge_core.pipeline import ROW_FIELDS, build_row
+
+EXPORT_FORMATS = {
+    "JSON": ".json",
+    "JSONL": ".jsonl",
+    "Parquet": ".parquet",
+    "ZIP (JSON per article)": ".zip",
+    "CSV (validation table)": ".csv",
+    "Chunks (JSONL)": ".chunks.jsonl",
+}
+# Longest file name stem used for an article inside a ZIP export
+MAX_ENTRY_NAME = 80
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+# Spreadsheets evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def write_bundle_json(bundle: Iterable[dict], path: str) -> int:
+    """Write bundle entries as an indented JSON array; returns the entry count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for article in bundle:
+            f.write(",\n" if count else "\n")
+            f.write(textwrap.indent(json.dumps(article, indent=2, default=str), "  "))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+    return count
+
+
+def write_bundle_jsonl(bundle: Iterable[dict], path: str) -> int:
+    """Write bundle entries one JSON object per line; returns the entry count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for article in bundle:
+            f.write(json.dumps(article, default=str) + "\n")
+            count += 1
+    return count
+
+
+def _entry_name(article: dict, used: Set[str]) -> str:
+    # A file name derived from the title, made unique within the archive
+    title = str(article.get("metadata", {}).get("title") or "")
+    stem = _UNSAFE_NAME.sub("_", title).strip("._")[:MAX_ENTRY_NAME] or "article"
+    name, n = f"{stem}.json", 1
+    while name.lower() in used:
+        n += 1
+        name = f"{stem}-{n}.json"
+    used.add(name.lower())
+    return name
+
+
+def write_bundle_zip(bundle: Iterable[dict], path: str) -> int:
+    """Write each bundle entry as its own indented JSON file in a ZIP archive; returns the entry count.
+
+    Files are named after the article titles. Each entry is compressed as it
+    is written, so only one article's JSON is in memory at a time.
+    """
+    count = 0
+    used: Set[str] = set()
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for article in bundle:
+            with archive.open(_entry_name(article, used), "w") as f:
+                f.write(json.dumps(article, indent=2, default=str).encode("utf-8"))
+            count += 1
+    return count
+
+
+def _csv_cell(value) -> str:
+    text = "" if value is None else str(value)
+    return "'" + text if text.startswith(_FORMULA_PREFIXES) else text
+
+
+def write_bundle_csv(bundle: Iterable[dict], path: str) -> int:
+    """Write the validation table (one row per entry, issues joined by ``;``) as CSV; returns the row count.
+
+    Cells that a spreadsheet would run as a formula are prefixed with ``'``.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(ROW_FIELDS + ["issues"])
+        for article in bundle:
+            row = build_row(article["metadata"], article["issues"])
+            writer.writerow([_csv_cell(value) for value in row.values()])
+            count += 1
+    return count
+
+
+def export_bundle(bundle: List[dict], fmt: str = "JSON", directory: str | None = None) -> str:
+    """Write the full bundle to a temporary file and return its path.
+
+    ``fmt`` is one of :data:`EXPORT_FORMATS`. Articles are serialized one at a
+    time, so the complete JSON text is never held in memory. A partly written
+    file is removed if the export fails; the caller owns the returned file and
+    should remove it with :func:`discard_export` once it has been served.
+    """
+    suffix = EXPORT_FORMATS.get(fmt, ".json")
+    fd, path = tempfile.mkstemp(prefix="knowledge_bundle_", suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        with timed("export", suffix.lstrip(".")) as timer:
+            if suffix == ".parquet":
+                write_bundle(bundle, path)
+            elif suffix == ".chunks.jsonl":
+                write_bundle_jsonl(bundle_chunks(bundle), path)
+            elif suffix == ".zip":
+                write_bundle_zip(bundle, path)
+            elif suffix == ".csv":
+                write_bundle_csv(bundle, path)
+            elif suffix == ".jsonl":
+                write_bundle_jsonl(bundle, path)
+            else:
+                write_bundle_json(bundle, path)
+            if timer.active:
+                timer.bytes_out = os.path.getsize(path)
+    except BaseException:
+        discard_export(path)
+        raise
+    return path
+
+
+def discard_export(path: str | None) -> None:
+    """Delete an export file once it has been handed over, ignoring files already gone."""
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,200 @@
+"""
+extract.py
+
+Text extraction for the supported upload formats: Markdown, plain text, HTML,
+PDF and DOCX. The PDF library is an optional dependency imported on first use;
+when it is missing the extractor returns an empty string and the caller reports
+the document as empty instead of failing. DOCX archives are read with the
+standard library (see :mod:`knowledge_core.docxtext`), and a corrupt one raises
+:class:`~knowledge_core.docxtext.DocxError` so it is reported as an extraction
+failure.
+"""
+
+import importlib
+import io
+import os
+import re
+from functools import lru_cache
+from types import ModuleType
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+from knowledge_core.docxtext import read_docx
+from knowledge_core.frontmatter import parse_front_matter
+from knowledge_core.htmltext import html_to_text, read_html
+from knowledge_core.metrics import file_type, timed
+
+PDF_EXTENSIONS = (".pdf",)
+DOCX_EXTENSIONS = (".docx",)
+HTML_EXTENSIONS = (".html", ".htm")
+# Formats that need a dedicated extractor and cannot be streamed as plain text
+BINARY_EXTENSIONS = PDF_EXTENSIONS + DOCX_EXTENSIONS
+
+
+@lru_cache(maxsize=None)
+def optional_module(name: str) -> ModuleType | None:
+    """Import an optional dependency on first use, returning None if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def iter_pdf_pages(
+    file_obj,
+    max_pages: int | None = None,
+    page_range: Tuple[int, int] | None = None,
+) -> Iterator[str]:
+    """Yield the text of a PDF one page at a time.
+
+    ``file_obj`` may be a path or a seekable file-like object; pdfplumber reads
+    it lazily, so the document never needs to be loaded into memory whole.
+    Each page's parsed layout objects are released as soon as its text has
+    been yielded, keeping peak memory roughly flat regardless of page count.
+    ``page_range`` is a 1-based inclusive ``(first, last)`` tuple and
+    ``max_pages`` caps the number of pages read; both are handed to pdfplumber
+    so pages outside them are never set up. Pages without text are skipped.
+    """
+    pdfplumber = optional_module("pdfplumber")  # may not be installed in all environments
+    if pdfplumber is None:
+        return
+    pages = None
+    if page_range is not None or max_pages is not None:
+        first, last = page_range if page_range is not None else (1, None)
+        first = max(1, first)
+        if max_pages is not None:
+            cap = first + max(0, max_pages) - 1
+            last = cap if last is None else min(last, cap)
+        pages = range(first, last + 1)
+    with pdfplumber.open(file_obj, pages=pages) as pdf:
+        for page in pdf.pages:
+            try:
+                page_text = page.extract_text()
+            finally:
+                # Drop the cached chars/layout for this page before moving on
+                page.close()
+            if page_text:
+                yield page_text
+
+
+def extract_pdf(
+    file_obj,
+    max_pages: int | None = None,
+    page_range: Tuple[int, int] | None = None,
+) -> str:
+    """Extract text from a PDF path or file-like object.
+
+    This function uses the pdfplumber library when available, streaming pages
+    through :func:`iter_pdf_pages`. If pdfplumber isn't installed or an error
+    occurs during extraction, it returns an empty string. The caller should
+    handle missing content gracefully.
+    """
+    buffer = io.StringIO()
+    try:
+        for page_text in iter_pdf_pages(file_obj, max_pages=max_pages, page_range=page_range):
+            buffer.write(page_text)
+            buffer.write("\n")
+    except Exception:
+        return ""
+    return buffer.getvalue()
+
+
+def extract_docx(file_obj) -> str:
+    """Extract text from a DOCX path, bytes or file-like object.
+
+    Body paragraphs, table cells, headers, footers and notes are streamed from
+    the archive by :func:`knowledge_core.docxtext.read_docx`, with headings and
+    list items marked up. Raises :class:`~knowledge_core.docxtext.DocxError`
+    if the file is not a readable DOCX.
+    """
+    return "".join(read_docx(file_obj)[1])
+
+
+def strip_html_tags(text: str) -> str:
+    """Convert HTML to plain text.
+
+    Uses the single-pass :func:`knowledge_core.htmltext.html_to_text`: script,
+    style and navigation subtrees are dropped, entities decoded and block
+    elements turned into paragraph breaks.
+    """
+    return html_to_text(text)
+
+
+def clean_text(text: str) -> str:
+    """Remove emojis and non-ASCII characters from text.
+
+    This uses a regex to strip characters outside of the basic multilingual
+    plane. The resulting text should retain standard punctuation and
+    printable ASCII characters.
+    """
+    # Remove characters that are not basic printable ASCII or common punctuation
+    return re.sub(r"[^\x00-\x7F]+", "", text)
+
+
+def read_text(source: str | bytes) -> str:
+    """Decode a text document from a path or raw bytes, dropping undecodable bytes."""
+    try:
+        if isinstance(source, str):
+            with open(source, "r", encoding="utf-8", errors="ignore") as f:
+                return f.read()
+        return source.decode("utf-8", errors="ignore")
+    except Exception:
+        return ""
+
+
+def extract_text(name: str, source: str | bytes | BinaryIO, max_pdf_pages: int | None = None) -> str:
+    """Extract the raw text of one document, choosing the extractor by ``name``'s extension.
+
+    ``source`` is a path, the document's bytes, or a binary file object. HTML
+    is converted to text as a stream; everything else that is not PDF or DOCX
+    is decoded as UTF-8 text.
+    """
+    return _extract(name, source, max_pdf_pages)[1]
+
+
+def _extract(name: str, source: str | bytes | BinaryIO, max_pdf_pages: int | None = None) -> Tuple[Dict[str, str], str]:
+    # Returns the metadata found by the extractor itself (HTML <meta> tags, DOCX core properties) and the text
+    ext = os.path.splitext(name)[1].lower()
+    meta: Dict[str, str] = {}
+    with timed("extract", file_type(name)) as timer:
+        if timer.active and isinstance(source, (str, bytes, bytearray)):
+            timer.bytes_in = len(source) if not isinstance(source, str) else _file_size(source)
+        if ext in PDF_EXTENSIONS:
+            file_obj = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+            text = extract_pdf(file_obj, max_pages=max_pdf_pages)
+        elif ext in DOCX_EXTENSIONS:
+            meta, chunks = read_docx(source)
+            text = "".join(chunks)
+        elif ext in HTML_EXTENSIONS:
+            meta, chunks = read_html(source)
+            text = "".join(chunks)
+        else:
+            if not isinstance(source, (str, bytes, bytearray)):
+                source = source.read()
+            text = read_text(source)
+        timer.bytes_out = len(text)
+    return meta, text
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def extract_document(
+    name: str, source: str | bytes | BinaryIO, max_pdf_pages: int | None = None
+) -> Tuple[dict, str]:
+    """Extract, clean and parse one document into front matter metadata and body.
+
+    Metadata from HTML ``<meta>`` tags and DOCX core properties fills in fields
+    the front matter does not set.
+    """
+    extracted_meta, text = _extract(name, source, max_pdf_pages=max_pdf_pages)
+    with timed("clean", file_type(name), bytes_in=len(text)) as timer:
+        text = clean_text(text)
+        timer.bytes_out = len(text)
+    meta, body = parse_front_matter(text)
+    if extracted_meta:
+        meta = {**extracted_meta, **meta}
+    return meta, body
@@ -0,0 +1,308 @@
+"""
+freshness.py
+
+Batch date normalization and staleness scoring for ``last_updated`` values.
+
+:func:`parse_dates` turns a column of values (strings, dates, datetimes or
+None) into a NumPy ``datetime64[D]`` array in bulk: ISO-style dates
+(``YYYY-MM-DD``, also with ``/`` or ``.`` separators) are decoded with
+vectorized arithmetic, and anything else, timestamps included, is parsed once
+per distinct value. Besides ISO 8601, the lenient parser accepts US or day-first
+numeric dates, month names (``May 1, 2024``, ``1 May 2024``, ``01-May-2024``)
+and RFC 2822 timestamps. Unparseable values become ``NaT``.
+
+:func:`freshness_report` ages every date against one reference day and
+returns staleness buckets and an age histogram, optionally per group (e.g.
+per domain), for dashboards such as ``notebooks/kpi_eval.ipynb``.
+:func:`parse_date` applies the same rules to a single value, for per-article
+validation.
+
+NumPy is imported only when a batch function runs.
+"""
+
+import email.utils
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Bound by _require_numpy() on first use
+np = None
+
+DEFAULT_STALE_DAYS = 365
+# Upper bounds (in days, inclusive) of the age buckets in a freshness report
+DEFAULT_AGE_BUCKETS = (30, 90, 180, 365, 730)
+DEFAULT_HISTOGRAM_DAYS = 30
+FUTURE_BUCKET = "future"
+INVALID_BUCKET = "invalid"
+
+# Formats tried after ISO 8601; ``day_first`` picks which numeric order comes first
+_MONTH_FIRST = ("%m/%d/%Y", "%m/%d/%y", "%m-%d-%Y")
+_DAY_FIRST = ("%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y")
+_OTHER_FORMATS = (
+    "%Y/%m/%d", "%Y.%m.%d", "%d.%m.%Y",
+    "%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y",
+    "%d %B %Y", "%d %b %Y", "%d %B, %Y", "%d %b, %Y",
+    "%d-%b-%Y", "%d-%B-%Y", "%b-%d-%Y", "%Y-%b-%d",
+    "%B %Y", "%b %Y",
+)
+# Separators accepted by the vectorized YYYY?MM?DD path
+_ISO_SEPARATORS = ("-", "/", ".")
+
+
+def _require_numpy() -> None:
+    global np
+    if np is not None:
+        return
+    try:
+        import numpy  # type: ignore
+    except ImportError as exc:
+        raise ImportError("numpy is required for batch freshness scoring; install it with `pip install numpy`") from exc
+    np = numpy
+
+
+def utc_today() -> date:
+    """Return today's date in UTC, the default reference day for staleness."""
+    return datetime.now(timezone.utc).date()
+
+
+def parse_date(value: Any, lenient: bool = True, day_first: bool = False) -> Optional[date]:
+    """Parse one ``last_updated`` value, returning None if it is not a date.
+
+    With ``lenient=False`` only ISO 8601 is accepted. ``day_first`` reads
+    ambiguous numeric dates such as ``01/05/2024`` as 1 May instead of 5 January.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    return _parse_text(text, lenient, day_first) if text else None
+
+
+@lru_cache(maxsize=65536)
+def _parse_text(text: str, lenient: bool, day_first: bool) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(text).date()
+    except ValueError:
+        pass
+    if not lenient:
+        return None
+    for fmt in (_DAY_FIRST if day_first else _MONTH_FIRST) + _OTHER_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    try:
+        return email.utils.parsedate_to_datetime(text).date()
+    except (TypeError, ValueError, IndexError):
+        pass
+    # A date followed by a time of day, e.g. "05/01/2024 10:30"
+    head, _, rest = text.partition(" ")
+    if rest and ":" in rest and any(ch.isdigit() for ch in head):
+        return _parse_text(head, lenient, day_first)
+    return None
+
+
+def _as_strings(values: Any) -> "np.ndarray":
+    array = np.asarray(values)
+    if array.dtype.kind == "U":
+        return array.ravel()
+    # Objects (None, date, datetime) and numbers are stringified element-wise
+    return np.array(["" if value is None else str(value) for value in array.ravel()], dtype=str)
+
+
+def parse_dates(values: Any, lenient: bool = True, day_first: bool = False) -> "np.ndarray":
+    """Parse a column of ``last_updated`` values into a ``datetime64[D]`` array.
+
+    ``values`` may be any sequence or array (a list, a NumPy array, a pandas
+    Series). Unparseable and missing values become ``NaT``. See
+    :func:`parse_date` for ``lenient`` and ``day_first``.
+    """
+    _require_numpy()
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[D]").ravel()
+    out = np.full(array.size, np.datetime64("NaT"), dtype="datetime64[D]")
+    if array.size == 0:
+        return out
+    strings = _as_strings(array)
+    iso = _parse_iso(strings, out, lenient)
+    rest = ~iso & (strings != "")
+    if rest.any():
+        # Columns repeat a handful of formats and dates; parse each distinct value once
+        unique, inverse = np.unique(strings[rest], return_inverse=True)
+        parsed = [parse_date(text, lenient, day_first) for text in unique.tolist()]
+        out[rest] = np.array([np.datetime64(d, "D") if d else np.datetime64("NaT") for d in parsed],
+                             dtype="datetime64[D]")[inverse]
+    return out
+
+
+def _parse_iso(strings: "np.ndarray", out: "np.ndarray", lenient: bool) -> "np.ndarray":
+    # Decode YYYY-MM-DD prefixes from the UTF-32 code points of each string; returns the handled rows
+    codes = strings.astype("U11").view(np.uint32).reshape(len(strings), 11)
+    # Unsigned, so anything below "0" wraps around and fails the <= 9 test too
+    digits = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]] - np.uint32(ord("0"))
+    matched = (digits <= 9).all(axis=1)
+    separators = [ord("-")] if not lenient else [ord(sep) for sep in _ISO_SEPARATORS]
+    matched &= np.isin(codes[:, 4], separators) & (codes[:, 4] == codes[:, 7])
+    # Date only: anything after it (a time, or junk) is left to parse_date so both paths agree
+    matched &= codes[:, 10] == 0
+    rows = np.flatnonzero(matched)
+    digits = digits[rows].astype(np.int64)
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    valid = (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    months = (year - 1970) * 12 + month - 1
+    start = months.astype("datetime64[M]").astype("datetime64[D]")
+    length = ((months + 1).astype("datetime64[M]").astype("datetime64[D]") - start).astype(np.int64)
+    valid &= day <= length
+    out[rows[valid]] = start[valid] + (day[valid] - 1)
+    return matched
+
+
+def _reference(reference: Optional[date]) -> "np.datetime64":
+    return np.datetime64(reference or utc_today(), "D")
+
+
+def age_days(dates: "np.ndarray", reference: Optional[date] = None) -> "np.ndarray":
+    """Return each date's age in days at ``reference`` (today in UTC by default); NaN where invalid."""
+    _require_numpy()
+    ages = (_reference(reference) - dates).astype(np.float64)
+    ages[np.isnat(dates)] = np.nan
+    return ages
+
+
+def stale_mask(
+    dates: "np.ndarray",
+    stale_days: int = DEFAULT_STALE_DAYS,
+    reference: Optional[date] = None,
+    invalid_is_stale: bool = True,
+) -> "np.ndarray":
+    """Return a boolean array marking dates more than ``stale_days`` before ``reference``."""
+    _require_numpy()
+    invalid = np.isnat(dates)
+    stale = np.zeros(len(dates), dtype=bool)
+    stale[~invalid] = (_reference(reference) - dates[~invalid]).astype(np.int64) > stale_days
+    if invalid_is_stale:
+        stale |= invalid
+    return stale
+
+
+def age_histogram(ages: "np.ndarray", bin_days: int = DEFAULT_HISTOGRAM_DAYS) -> Tuple[List[int], List[int]]:
+    """Count ages (in days) in bins of ``bin_days``; returns the bin start days and counts.
+
+    Invalid (NaN) and future (negative) ages are left out.
+    """
+    _require_numpy()
+    ages = ages[~np.isnan(ages) & (ages >= 0)].astype(np.int64)
+    counts = np.bincount(ages // bin_days) if len(ages) else np.zeros(0, dtype=np.int64)
+    return [i * bin_days for i in range(len(counts))], counts.tolist()
+
+
+def bucket_labels(edges: Sequence[int] = DEFAULT_AGE_BUCKETS) -> List[str]:
+    """Return the labels of the age buckets bounded by ``edges``, e.g. ``0-30`` and ``>730``."""
+    labels = []
+    low = 0
+    for edge in edges:
+        labels.append(f"{low}-{edge}")
+        low = edge + 1
+    labels.append(f">{edges[-1]}" if edges else "0+")
+    return labels + [FUTURE_BUCKET, INVALID_BUCKET]
+
+
+def _bucket_index(ages: "np.ndarray", edges: Sequence[int]) -> "np.ndarray":
+    invalid = np.isnan(ages)
+    index = np.searchsorted(np.asarray(edges, dtype=np.float64), np.where(invalid, 0, ages), side="left")
+    index[ages < 0] = len(edges) + 1
+    index[invalid] = len(edges) + 2
+    return index
+
+
+@dataclass
+class FreshnessReport:
+    """Staleness buckets and an age histogram for a column of dates.
+
+    ``histogram`` counts articles per ``histogram_days``-wide age bin starting
+    at ``histogram_start`` days; ``groups`` holds the bucket counts per group
+    when :func:`freshness_report` was given group labels.
+    """
+
+    reference: date
+    stale_days: int
+    total: int
+    invalid: int
+    future: int
+    stale: int
+    buckets: Dict[str, int]
+    histogram_days: int
+    histogram_start: List[int]
+    histogram: List[int]
+    groups: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def fresh_pct(self) -> float:
+        """Share of articles, in percent, that are neither stale nor undated."""
+        return 100.0 * (self.total - self.stale) / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reference": self.reference.isoformat(),
+            "stale_days": self.stale_days,
+            "total": self.total,
+            "invalid": self.invalid,
+            "future": self.future,
+            "stale": self.stale,
+            "fresh_pct": round(self.fresh_pct, 2),
+            "buckets": self.buckets,
+            "histogram": {"bin_days": self.histogram_days, "start": self.histogram_start, "count": self.histogram},
+            "groups": self.groups,
+        }
+
+
+def freshness_report(
+    values: Any,
+    reference: Optional[date] = None,
+    stale_days: int = DEFAULT_STALE_DAYS,
+    edges: Sequence[int] = DEFAULT_AGE_BUCKETS,
+    histogram_days: int = DEFAULT_HISTOGRAM_DAYS,
+    groups: Optional[Sequence[Any]] = None,
+    day_first: bool = False,
+) -> FreshnessReport:
+    """Score the freshness of a column of ``last_updated`` values against one reference day.
+
+    ``values`` is parsed with :func:`parse_dates` unless it already is a
+    ``datetime64`` array. Undated values count as stale, as in the quality
+    checks. ``groups``, aligned with ``values``, adds per-group bucket counts.
+    """
+    _require_numpy()
+    reference = reference or utc_today()
+    dates = parse_dates(values, day_first=day_first)
+    ages = age_days(dates, reference)
+    labels = bucket_labels(edges)
+    index = _bucket_index(ages, edges)
+    counts = np.bincount(index, minlength=len(labels))
+    stale = stale_mask(dates, stale_days, reference)
+    starts, histogram = age_histogram(ages, histogram_days)
+    report = FreshnessReport(
+        reference=reference,
+        stale_days=stale_days,
+        total=len(dates),
+        invalid=int(counts[-1]),
+        future=int(counts[-2]),
+        stale=int(stale.sum()),
+        buckets=dict(zip(labels, counts.tolist())),
+        histogram_days=histogram_days,
+        histogram_start=starts,
+        histogram=histogram,
+    )
+    if groups is not None:
+        names, group_index = np.unique(_as_strings(np.asarray(groups, dtype=object)), return_inverse=True)
+        table = np.bincount(group_index * len(labels) + index, minlength=len(names) * len(labels))
+        report.groups = {
+            name: dict(zip(labels, row)) for name, row in zip(names.tolist(), table.reshape(-1, len(labels)).tolist())
+        }
+    return report
@@ -0,0 +1,96 @@
+"""
+frontmatter.py
+
+YAML front matter parsing shared by the app, the batch scripts and workers.
+
+A front matter block opens with ``---`` at the very start of the document and
+closes at the next line that starts with ``---``. Everything after the closing
+delimiter, with surrounding whitespace stripped, is the body. The same rule applies to whole strings
+(:func:`parse_front_matter`) and to chunked streams (:func:`read_front_matter`),
+where only the head of the document is buffered.
+"""
+
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Tuple
+
+from knowledge_core.metrics import timed
+from knowledge_core.streaming import (
+    DEFAULT_CHUNK_SIZE,
+    MAX_FRONT_MATTER_CHARS,
+    iter_text_chunks,
+    split_front_matter_stream,
+)
+
+# The closing delimiter must start a line, so "---" inside a value is not mistaken for it
+FRONT_MATTER_DELIMITER = "\n---"
+
+
+def load_front_matter(front_matter: Optional[str], strict: bool = False) -> dict:
+    """Parse a YAML front matter block into a dict.
+
+    Returns ``{}`` when the block is absent or not a mapping. Invalid YAML
+    also yields ``{}`` unless ``strict`` is set, in which case a
+    ``ValueError`` describing the problem is raised.
+    """
+    if not front_matter:
+        return {}
+    import yaml
+
+    try:
+        with timed("front_matter", bytes_in=len(front_matter)):
+            meta = yaml.safe_load(front_matter) or {}
+    except yaml.YAMLError as exc:
+        if strict:
+            raise ValueError(f"Invalid YAML front matter: {exc}") from exc
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def split_front_matter(content: str) -> Tuple[Optional[str], str]:
+    """Split a document into its raw front matter text (or None) and its body."""
+    if content.startswith("---"):
+        end = content.find(FRONT_MATTER_DELIMITER, 3)
+        if end != -1:
+            return content[3:end], content[end + len(FRONT_MATTER_DELIMITER):].strip()
+    return None, content
+
+
+def parse_front_matter(content: str, strict: bool = False) -> Tuple[dict, str]:
+    """Parse YAML front matter and return metadata and body.
+
+    Documents without front matter yield ``{}`` and the unchanged content.
+    """
+    front_matter, body = split_front_matter(content)
+    if front_matter is None:
+        return {}, content
+    return load_front_matter(front_matter, strict=strict), body
+
+
+def read_front_matter(
+    source: str | bytes | BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    strict: bool = False,
+    transform: Optional[Callable[[str], str]] = None,
+    max_chars: int = MAX_FRONT_MATTER_CHARS,
+) -> Tuple[dict, Iterator[str]]:
+    """Parse front matter from the head of a path, bytes or binary file.
+
+    Returns the metadata and an iterator over the remaining body chunks, which
+    are read lazily, so a large document is never loaded whole. ``transform``
+    is applied to every decoded chunk (e.g. text cleaning) before parsing.
+    """
+    chunks = iter_text_chunks(source, chunk_size)
+    if transform is not None:
+        chunks = (transform(chunk) for chunk in chunks)
+    return parse_front_matter_stream(chunks, strict=strict, max_chars=max_chars)
+
+
+def parse_front_matter_stream(
+    chunks: Iterable[str], strict: bool = False, max_chars: int = MAX_FRONT_MATTER_CHARS
+) -> Tuple[dict, Iterator[str]]:
+    """Parse front matter from the head of a stream of text chunks.
+
+    Like :func:`read_front_matter`, for text that is already decoded (e.g. the
+    output of a streaming extractor).
+    """
+    front_matter, body_chunks = split_front_matter_stream(chunks, max_chars, delimiter=FRONT_MATTER_DELIMITER)
+    return load_front_matter(front_matter, strict=strict), body_chunks
@@ -0,0 +1,388 @@
+"""
+htmltext.py
+
+Streaming HTML-to-text extraction.
+
+:class:`HTMLTextExtractor` is an incremental converter: it is fed the document
+in chunks and hands back the text produced so far, so multi-megabyte pages are
+converted in a single linear pass with memory bounded by the chunk size.
+Script, style, navigation and similar subtrees are skipped, entities are
+decoded, runs of whitespace are collapsed and block elements end in paragraph
+(or line) breaks. ``<meta>`` tags and the ``<title>`` are collected into a
+metadata dict using the front matter field names.
+
+Only the tags that change the parser's state (skipped subtrees, comments,
+``<meta>``, ``<title>``, ``<pre>`` and ``<body>``) are handled one by one in
+Python. The markup between them is converted in bulk with a few regex passes:
+block tags become break markers, every other tag is dropped, then entities are
+decoded and whitespace collapsed. None of the patterns can scan past the next
+``<``, so malformed markup (unclosed tags, comments or scripts) costs no more
+than well-formed markup. :mod:`html.parser` was measured at about 30 times
+slower than the old regex stripping on large pages, hence the custom scanner.
+As with that regex, a ``>`` inside a quoted attribute value ends the tag.
+"""
+
+import re
+from html import unescape
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from knowledge_core.streaming import DEFAULT_CHUNK_SIZE, iter_text_chunks
+
+# Subtrees whose text is never part of the article
+SKIP_TAGS = frozenset({"script", "style", "nav", "noscript", "template", "svg", "iframe", "select"})
+# Elements whose content is raw text rather than markup
+RAW_TEXT_TAGS = frozenset({"script", "style"})
+# Block elements that end a paragraph, and those that only end a line
+PARAGRAPH_TAGS = (
+    "address", "article", "aside", "blockquote", "dl", "div", "fieldset", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "ol", "p", "pre", "section", "table", "ul",
+)
+LINE_TAGS = ("br", "dd", "dt", "figcaption", "li", "tr")
+# Metadata fields that <meta> tags may fill in
+META_FIELDS = (
+    "title", "domain", "subdomain", "audience", "format", "status", "last_updated", "author", "description",
+)
+META_PREFIXES = ("og:", "article:", "dcterms.", "dc.")
+META_ALIASES = {
+    "modified_time": "last_updated",
+    "modified": "last_updated",
+    "date.modified": "last_updated",
+    "datemodified": "last_updated",
+    "last_modified": "last_updated",
+    "creator": "author",
+}
+# A "<" with no closing ">" within this many characters is treated as text
+MAX_TAG_CHARS = 64 * 1024
+# Longest named or numeric character reference, kept back at a chunk boundary
+MAX_ENTITY_CHARS = 32
+
+_STATE_TAGS = sorted(SKIP_TAGS | {"meta", "title", "pre", "body"})
+_STATE_TAG = re.compile(r"<!--|<(/?)(" + "|".join(_STATE_TAGS) + r")(?=[\s/>])([^<>]*)>", re.IGNORECASE)
+_PARAGRAPH_TAG = re.compile(r"</?(?:" + "|".join(PARAGRAPH_TAGS) + r")(?=[\s/>])[^<>]*>", re.IGNORECASE)
+_LINE_TAG = re.compile(r"</?(?:" + "|".join(LINE_TAGS) + r")(?=[\s/>])[^<>]*>", re.IGNORECASE)
+_ANY_TAG = re.compile(r"</?[a-zA-Z!?][^<>]*>")
+# Break markers left by block tags; outside <pre> they are padded with spaces so
+# that collapsing whitespace leaves each one a separate word, easy to merge
+_PARAGRAPH = "\x02"
+_LINE = "\x01"
+_BREAK_RUN = re.compile(r"[\x01\x02]{2,}")
+_ATTR = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+_WHITESPACE = re.compile(r"\s+")
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _meta_key(name: str) -> str:
+    key = name.strip().lower()
+    for prefix in META_PREFIXES:
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+            break
+    key = key.replace("-", "_")
+    return META_ALIASES.get(key, key)
+
+
+def _attributes(text: str) -> Dict[str, str]:
+    attrs = {}
+    for match in _ATTR.finditer(text):
+        value = next((group for group in match.groups()[1:] if group is not None), "")
+        attrs.setdefault(match.group(1).lower(), unescape(value))
+    return attrs
+
+
+def _find_ci(text: str, needle: str, pos: int) -> int:
+    # Case-insensitive find of a lowercase "</tag" without lowercasing all of ``text``
+    while True:
+        hit = text.find("</", pos)
+        if hit == -1 or text[hit:hit + len(needle)].lower() == needle:
+            return hit
+        pos = hit + 2
+
+
+def _merge_breaks(match: "re.Match[str]") -> str:
+    return _PARAGRAPH if _PARAGRAPH in match.group() else _LINE
+
+
+def _break_level(marker: str) -> int:
+    return 2 if marker == _PARAGRAPH else 1
+
+
+class HTMLTextExtractor:
+    """Incremental HTML-to-text converter.
+
+    Call :meth:`feed` with successive chunks and :meth:`pop_text` to take the
+    text produced so far; call :meth:`close` after the last chunk. ``meta``
+    holds the metadata found in ``<meta>`` tags (and the ``<title>``), and
+    ``body_started`` turns True once the document body is reached, at which
+    point the head's metadata is complete.
+
+    Text before the first tag is kept verbatim, so a Markdown front matter
+    block at the top of an HTML file survives extraction.
+    """
+
+    def __init__(self) -> None:
+        self.meta: Dict[str, str] = {}
+        self.body_started = False
+        self._buffer = ""
+        # Text that ends the construct being skipped ("-->" or "</script"), if any
+        self._until: Optional[str] = None
+        self._parts: List[str] = []
+        self._title: List[str] = []
+        self._seen_tag = False
+        self._skip = 0
+        self._pre = 0
+        self._in_title = False
+        self._emitted = False
+        self._space = False
+        self._break = 0
+
+    def feed(self, data: str) -> None:
+        """Parse the next chunk of the document."""
+        self._buffer += data
+        self._parse(final=False)
+
+    def close(self) -> None:
+        """Parse whatever is left; an unterminated tag at the end counts as text."""
+        self._parse(final=True)
+        self._start_body()
+
+    def pop_text(self) -> str:
+        """Return the text extracted since the last call."""
+        text = "".join(self._parts)
+        self._parts.clear()
+        return text
+
+    # Scanner -----------------------------------------------------------------
+
+    def _parse(self, final: bool) -> None:
+        text = self._buffer
+        n = len(text)
+        pos = 0
+        while pos < n:
+            if self._until is not None:
+                end = self._find_until(text, pos)
+                if end == -1:
+                    # Discard the skipped text, keeping enough to spot the terminator across chunks
+                    pos = n if final else max(pos, n - len(self._until) + 1)
+                    break
+                pos = end
+                continue
+            match = _STATE_TAG.search(text, pos)
+            if match is None:
+                end = n if final else self._safe_end(text, pos, n)
+                if end > pos:
+                    self._markup(text[pos:end])
+                pos = end
+                break
+            if match.start() > pos:
+                self._markup(text[pos:match.start()])
+            pos = match.end()
+            closing, name, attrs = match.groups()
+            if name is None:
+                self._until = "-->"
+            elif closing:
+                self._end_tag(name.lower())
+            else:
+                self._start_tag(name.lower(), attrs)
+        self._buffer = text[pos:]
+
+    def _find_until(self, text: str, pos: int) -> int:
+        # Return where scanning resumes once the skipped construct ends, or -1
+        if self._until == "-->":
+            end = text.find("-->", pos)
+            if end != -1:
+                self._until = None
+                return end + 3
+            return -1
+        end = _find_ci(text, self._until, pos)
+        if end != -1:
+            # The closing tag itself is scanned normally
+            self._until = None
+        return end
+
+    @staticmethod
+    def _safe_end(text: str, pos: int, n: int) -> int:
+        # Stop before a tag or character reference cut off by the end of the chunk
+        end = n
+        lt = text.rfind("<", pos, n)
+        if lt != -1 and text.find(">", lt, n) == -1 and n - lt <= MAX_TAG_CHARS:
+            end = lt
+        amp = text.rfind("&", max(pos, end - MAX_ENTITY_CHARS), end)
+        if amp != -1 and ";" not in text[amp:end]:
+            end = amp
+        return end
+
+    # State tags --------------------------------------------------------------
+
+    def _start_tag(self, tag: str, attrs: str) -> None:
+        self._seen_tag = True
+        if tag in RAW_TEXT_TAGS:
+            self._until = "</" + tag
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif self._skip:
+            return
+        elif tag == "meta":
+            self._add_meta(_attributes(attrs))
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "body":
+            self._start_body()
+        elif tag == "pre":
+            self._pre += 1
+            self._add_break(2)
+
+    def _end_tag(self, tag: str) -> None:
+        self._seen_tag = True
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif self._skip:
+            return
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "pre":
+            self._pre = max(0, self._pre - 1)
+            self._add_break(2)
+
+    def _add_break(self, level: int) -> None:
+        self._break = max(self._break, level)
+        self._space = False
+
+    def _add_meta(self, attrs: Dict[str, str]) -> None:
+        name = attrs.get("name") or attrs.get("property") or attrs.get("itemprop")
+        value = attrs.get("content", "").strip()
+        if not name or not value:
+            return
+        key = _meta_key(name)
+        if key not in META_FIELDS or key in self.meta:
+            return
+        if key == "last_updated" and _ISO_DATE.match(value):
+            # Keep the date of ISO timestamps such as 2024-05-01T10:00:00Z
+            value = value[:10]
+        self.meta[key] = value
+
+    def _start_body(self) -> None:
+        if self.body_started:
+            return
+        self.body_started = True
+        title = _WHITESPACE.sub(" ", "".join(self._title)).strip()
+        if title:
+            self.meta.setdefault("title", title)
+
+    # Markup between state tags -----------------------------------------------
+
+    def _markup(self, markup: str) -> None:
+        if self._skip:
+            return
+        if not self._seen_tag:
+            # Leading text, e.g. front matter: keep it exactly as written
+            first_tag = markup.find("<")
+            leading = markup if first_tag == -1 else markup[:first_tag]
+            if leading:
+                self._parts.append(leading)
+                self._emitted = self._emitted or bool(leading.strip())
+            if first_tag == -1:
+                return
+            self._seen_tag = True
+            markup = markup[first_tag:]
+        if self._in_title:
+            self._title.append(unescape(_ANY_TAG.sub("", markup)))
+            return
+        pad = "" if self._pre else " "
+        if "<" in markup:
+            markup = _PARAGRAPH_TAG.sub(pad + _PARAGRAPH + pad, markup)
+            markup = _LINE_TAG.sub(pad + _LINE + pad, markup)
+            markup = _ANY_TAG.sub("", markup)
+        if "&" in markup:
+            markup = unescape(markup)
+        has_breaks = _PARAGRAPH in markup or _LINE in markup
+        if not self._pre and markup:
+            # str.split() collapses whitespace far faster than a regex; keep one space at each edge
+            lead = " " if markup[0].isspace() else ""
+            trail = " " if markup[-1].isspace() else ""
+            markup = " ".join(markup.split())
+            if has_breaks:
+                for marker in (_PARAGRAPH, _LINE):
+                    markup = markup.replace(" " + marker, marker).replace(marker + " ", marker)
+            markup = lead + markup + trail if markup else lead or trail
+        if has_breaks:
+            markup = _BREAK_RUN.sub(_merge_breaks, markup)
+        self._text(markup)
+
+    def _text(self, text: str) -> None:
+        # Append normalized text; spaces and break markers at its edges are merged
+        # with those of the neighbouring pieces, which may come from other chunks
+        lead_space = trail_space = False
+        lead_break = trail_break = 0
+        if not self._pre:
+            lead_space, trail_space = text.startswith(" "), text.endswith(" ")
+            text = text.strip(" ")
+        if text[:1] in (_PARAGRAPH, _LINE):
+            lead_break = _break_level(text[0])
+            text = text[1:]
+        if text[-1:] in (_PARAGRAPH, _LINE):
+            trail_break = _break_level(text[-1])
+            text = text[:-1]
+        if not text:
+            if lead_break or trail_break:
+                self._add_break(max(lead_break, trail_break))
+            elif lead_space or trail_space:
+                self._space = True
+            return
+        self._start_body()
+        if self._emitted:
+            level = max(self._break, lead_break)
+            if level:
+                self._parts.append("\n" * level)
+            elif self._space or lead_space:
+                self._parts.append(" ")
+        if _PARAGRAPH in text or _LINE in text:
+            text = text.replace(_PARAGRAPH, "\n\n").replace(_LINE, "\n")
+        self._parts.append(text)
+        self._emitted = True
+        self._break = trail_break
+        self._space = trail_space and not trail_break
+
+
+def html_to_text(html: str) -> str:
+    """Convert a complete HTML document to plain text."""
+    parser = HTMLTextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.pop_text()
+
+
+def read_html(
+    source: str | bytes | BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[Dict[str, str], Iterator[str]]:
+    """Extract an HTML document from a path, bytes or binary file as a stream.
+
+    Returns the ``<meta>`` metadata and an iterator over the text chunks. Only
+    the head is parsed up front (until the body starts), so the metadata is
+    complete while the body is still read lazily, one chunk at a time.
+    """
+    parser = HTMLTextExtractor()
+    chunks = iter_text_chunks(source, chunk_size)
+    head: List[str] = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        head.append(parser.pop_text())
+        if parser.body_started:
+            break
+    else:
+        # The whole document was read without reaching a body
+        parser.close()
+        head.append(parser.pop_text())
+
+    def body() -> Iterator[str]:
+        yield from (text for text in head if text)
+        for chunk in chunks:
+            parser.feed(chunk)
+            text = parser.pop_text()
+            if text:
+                yield text
+        parser.close()
+        tail = parser.pop_text()
+        if tail:
+            yield tail
+
+    return parser.meta, body()
@@ -0,0 +1,96 @@
+"""
+importtime.py
+
+Cold-start import timing, in the style of ``python -X importtime``.
+
+:func:`measure_imports` imports a module in a fresh interpreter with
+``-X importtime`` and parses the per-module timings it reports, so the numbers
+reflect a real cold start rather than modules already loaded in this process.
+"""
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """Self and cumulative import time of one module, in microseconds."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse ``-X importtime`` output into timings, in the order reported."""
+    timings: List[ImportTiming] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Skip the column header
+            continue
+        raw_name = fields[2].rstrip()
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        timings.append(ImportTiming(name, int(fields[0]), int(fields[1]), depth))
+    return timings
+
+
+def measure_imports(module: str, cwd: Optional[str] = None) -> List[ImportTiming]:
+    """Import ``module`` in a fresh interpreter and return its import timings."""
+    env = dict(os.environ)
+    root = cwd or os.getcwd()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=root,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.strip()}")
+    return parse_importtime(proc.stderr)
+
+
+def direct_imports(timings: List[ImportTiming], module: str) -> List[ImportTiming]:
+    """Return the modules first imported directly by ``module``.
+
+    ``-X importtime`` reports a module after everything it imports, so its
+    children are the entries one level deeper listed just before it.
+    """
+    for idx in range(len(timings) - 1, -1, -1):
+        root = timings[idx]
+        if root.name == module:
+            break
+    else:
+        return []
+    children: List[ImportTiming] = []
+    for timing in reversed(timings[:idx]):
+        if timing.depth <= root.depth:
+            break
+        if timing.depth == root.depth + 1:
+            children.append(timing)
+    return children[::-1]
+
+
+def format_import_report(timings: List[ImportTiming], module: str, top: int = 20) -> str:
+    """Format the cold import time of ``module`` and its ``top`` slowest direct imports."""
+    root = next((t for t in reversed(timings) if t.name == module), None)
+    if root is None:
+        return f"No import timings recorded for {module}"
+    children = sorted(direct_imports(timings, module), key=lambda t: t.cumulative_us, reverse=True)
+    lines = [
+        f"Cold import of {module}: {root.cumulative_us / 1000:.1f} ms "
+        f"({root.self_us / 1000:.1f} ms in the module itself)",
+        f"{'cumulative ms':>14}  {'self ms':>8}  module",
+    ]
+    for timing in children[:top]:
+        lines.append(f"{timing.cumulative_us / 1000:>14.1f}  {timing.self_us / 1000:>8.1f}  {timing.name}")
+    return "\n".join(lines)
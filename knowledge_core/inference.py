@@ -0,0 +1,393 @@
+"""
+inference.py
+
+Suggesting taxonomy values for articles whose front matter leaves them out.
+
+A :class:`MetadataModel` is a nearest-centroid classifier over hashed TF-IDF
+features, trained from articles that are already tagged (for example
+``docs/packs/*/articles``). Words and word pairs of the title and the head of
+the body are hashed into a fixed number of features, so there is no
+vocabulary to store, and each value of each field in :data:`INFER_FIELDS`
+keeps the normalized mean vector of its training articles. A document gets
+the most similar value the taxonomy allows, with a confidence taken from a
+softmax over the similarities of every learned value and of a "no
+suggestion" option, so weak or ambiguous matches are not suggested.
+Subdomains are learned per domain and only suggested within the article's
+(given or suggested) domain.
+
+Prediction is batched: the features of every document in a batch are built
+with one round of array operations, and scored against all centroids of a
+field with one gather and one segmented sum, so a batch costs well under a
+millisecond per document on a CPU. Models are saved as a single ``.npz`` file.
+
+NumPy is imported when a model is trained or loaded.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from knowledge_core.frontmatter import read_front_matter
+from knowledge_core.records import is_jsonl, iter_records
+from knowledge_core.taxonomy import CompiledTaxonomy
+
+# Bound by _require_numpy() when a model is trained or loaded
+np = None
+
+# Fields a model suggests; status records a review decision the text cannot reveal
+INFER_FIELDS = ("domain", "subdomain", "audience", "format")
+# Bump whenever features or the file layout change so older models are rejected
+INFERENCE_VERSION = "1"
+# Hashed feature space; a centroid is a dense float32 row of this length
+FEATURES = 1 << 16
+# Suggestions below this confidence are dropped
+DEFAULT_MIN_CONFIDENCE = 0.5
+# Similarity of the implicit "no suggestion" option every value competes with, so a
+# field with a single candidate value is not suggested with full confidence
+MIN_SIMILARITY = 0.05
+# Softmax temperature turning centroid similarities into confidences
+TEMPERATURE = 0.03
+# Characters of a body that feed its features; the head of an article says what it is about
+MAX_CHARS = 20000
+# Documents scored together by suggest_metadata
+INFER_BATCH = 256
+# Characters of a word that feed its hash; longer words are hashed by their prefix
+_WORD_CHARS = 24
+_TOKEN = re.compile(r"\w+")
+_ISSUE_PREFIX = "Inferred "
+# Separates domain and subdomain in the labels of subdomain centroids
+_PAIR = "\x1f"
+
+
+def _require_numpy() -> None:
+    global np
+    if np is None:
+        try:
+            import numpy  # type: ignore
+        except ImportError as exc:
+            raise ImportError("numpy is required for metadata inference; install it with `pip install numpy`") from exc
+        np = numpy
+
+
+def default_model_path() -> str:
+    """Return the model location from ``KNOWLEDGE_MODEL_PATH``, next to the content cache by default.
+
+    An empty ``KNOWLEDGE_MODEL_PATH`` disables inference and yields ``""``.
+    """
+    env = os.environ.get("KNOWLEDGE_MODEL_PATH")
+    if env is not None:
+        return env
+    return os.path.join(os.path.expanduser("~"), ".cache", "knowledge-ai", "metadata_model.npz")
+
+
+def is_missing(value: Any) -> bool:
+    """Return True for field values that count as not set ("Unknown" included)."""
+    return value is None or value == "" or value == "Unknown"
+
+
+def document_text(meta: dict, body: str) -> str:
+    """Return the text a document is classified by: its title and the head of its body."""
+    title = meta.get("title")
+    return f"{title if not is_missing(title) else ''}\n{(body or '')[:MAX_CHARS]}"
+
+
+def _features(texts: Sequence[str]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Return ``(doc, feature, count)`` arrays for ``texts``, sorted by document then feature."""
+    words: List[str] = []
+    lengths = []
+    for text in texts:
+        tokens = _TOKEN.findall(text.lower())
+        words.extend(tokens)
+        lengths.append(len(tokens))
+    docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    if not words:
+        empty = np.empty(0, np.int64)
+        return empty, empty, empty
+    # Polynomial hash over the UTF-32 code points of each word, one column at a time
+    codes = np.array(words, dtype=f"U{_WORD_CHARS}").view(np.uint32).reshape(len(words), -1).astype(np.uint64)
+    hashes = np.full(len(words), 14695981039346656037, dtype=np.uint64)
+    for column in range(codes.shape[1]):
+        hashes = hashes * np.uint64(1099511628211) + codes[:, column]
+    # Word pairs, never across two documents
+    same = docs[1:] == docs[:-1]
+    pairs = (hashes[:-1] * np.uint64(31) + hashes[1:])[same] ^ np.uint64(0x9E3779B97F4A7C15)
+    all_docs = np.concatenate([docs, docs[1:][same]])
+    features = (np.concatenate([hashes, pairs]) >> np.uint64(48)).astype(np.int64)
+    keys, counts = np.unique(all_docs * FEATURES + features, return_counts=True)
+    return keys // FEATURES, keys % FEATURES, counts
+
+
+def _weights(docs: "np.ndarray", features: "np.ndarray", counts: "np.ndarray", idf: "np.ndarray",
+             size: int) -> "np.ndarray":
+    """Return L2-normalized sublinear TF-IDF weights for the entries of :func:`_features`."""
+    weights = (1.0 + np.log(counts)) * idf[features]
+    norms = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=size))
+    return (weights / np.maximum(norms[docs], 1e-12)).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """A suggested value for one field, with the model's confidence in it."""
+
+    field: str
+    value: str
+    confidence: float
+
+
+def inference_issue(suggestion: Suggestion) -> str:
+    """Return the issue that asks a reviewer to confirm a suggested value."""
+    return f"{_ISSUE_PREFIX}{suggestion.field} '{suggestion.value}' ({suggestion.confidence:.0%} confidence)"
+
+
+def is_inference_issue(issue: str) -> bool:
+    """Return True for issues produced by :func:`inference_issue`."""
+    return issue.startswith(_ISSUE_PREFIX)
+
+
+def inference_issue_field(issue: str) -> str:
+    """Return the field an :func:`inference_issue` is about."""
+    return issue[len(_ISSUE_PREFIX):].split(" ", 1)[0]
+
+
+class MetadataModel:
+    """Nearest-centroid classifier for the fields in :data:`INFER_FIELDS`.
+
+    Build one with :meth:`train` (or :func:`train_model`), keep it with
+    :meth:`save` and load it with :meth:`load`. ``labels`` maps each field to
+    its values in centroid row order; subdomain labels are ``(domain,
+    subdomain)`` pairs joined by a control character.
+    """
+
+    def __init__(self, idf: "np.ndarray", labels: Dict[str, List[str]], centroids: Dict[str, "np.ndarray"]) -> None:
+        _require_numpy()
+        self.idf = idf
+        self.labels = labels
+        self.centroids = centroids
+        self.documents = 0
+
+    @classmethod
+    def train(cls, documents: Iterable[Tuple[dict, str]]) -> "MetadataModel":
+        """Train on ``(metadata, body)`` pairs; fields that are missing or "Unknown" are skipped."""
+        _require_numpy()
+        metas: List[dict] = []
+        texts: List[str] = []
+        for meta, body in documents:
+            metas.append(meta)
+            texts.append(document_text(meta, body))
+        docs, features, counts = _features(texts)
+        # Smoothed IDF, as if one extra document contained every feature
+        df = np.bincount(features, minlength=FEATURES)
+        idf = (np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0).astype(np.float32)
+        weights = _weights(docs, features, counts, idf, len(texts))
+        labels: Dict[str, List[str]] = {}
+        centroids: Dict[str, "np.ndarray"] = {}
+        for field in INFER_FIELDS:
+            targets = [_label(field, meta) for meta in metas]
+            values = sorted({target for target in targets if target is not None})
+            if not values:
+                continue
+            rows = {value: row for row, value in enumerate(values)}
+            row_of_doc = np.array([rows[target] if target is not None else -1 for target in targets], dtype=np.int64)
+            keep = row_of_doc[docs] >= 0
+            sums = np.zeros((len(values), FEATURES), dtype=np.float32)
+            np.add.at(sums, (row_of_doc[docs[keep]], features[keep]), weights[keep])
+            sums /= np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+            labels[field] = values
+            centroids[field] = sums
+        model = cls(idf, labels, centroids)
+        model.documents = len(texts)
+        return model
+
+    def save(self, path: str) -> None:
+        """Write the model to ``path`` (a ``.npz`` file), replacing it atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = {"version": INFERENCE_VERSION, "features": FEATURES, "labels": self.labels,
+                  "documents": self.documents}
+        arrays = {f"centroids_{field}": matrix for field, matrix in self.centroids.items()}
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(tmp, header=np.array(json.dumps(header)), idf=self.idf, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataModel":
+        """Load a model written by :meth:`save`; raises ``ValueError`` for other versions."""
+        _require_numpy()
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            if header.get("version") != INFERENCE_VERSION or header.get("features") != FEATURES:
+                raise ValueError(f"{path} was trained by an incompatible version; train it again")
+            centroids = {field: data[f"centroids_{field}"] for field in header["labels"]}
+            model = cls(data["idf"], header["labels"], centroids)
+        model.documents = header.get("documents", 0)
+        return model
+
+    def predict(self, texts: Sequence[str]) -> Dict[str, "np.ndarray"]:
+        """Return each field's ``(documents x labels)`` cosine similarities for ``texts``."""
+        docs, features, counts = _features(texts)
+        weights = _weights(docs, features, counts, self.idf, len(texts))
+        # Entries are grouped by document, so each document's block starts where its number first appears
+        starts = np.searchsorted(docs, np.arange(len(texts)))
+        present = np.bincount(docs, minlength=len(texts)) > 0
+        similarities = {}
+        for field, centroids in self.centroids.items():
+            scores = np.zeros((len(texts), len(self.labels[field])), dtype=np.float32)
+            if len(weights):
+                contributions = centroids[:, features] * weights
+                scores[present] = np.add.reduceat(contributions, starts[present], axis=1).T
+            similarities[field] = scores
+        return similarities
+
+    def suggest(
+        self,
+        articles: Sequence[dict],
+        taxonomy: Optional[CompiledTaxonomy] = None,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    ) -> List[Dict[str, Suggestion]]:
+        """Return suggestions for the missing fields of bundle entries, one dict per entry.
+
+        Only values the ``taxonomy`` allows are considered. A subdomain is
+        suggested within the entry's domain, which may itself be suggested.
+        """
+        if not articles:
+            return []
+        metas = [article.get("metadata") or {} for article in articles]
+        similarities = self.predict([document_text(meta, article.get("content") or "")
+                                     for meta, article in zip(metas, articles)])
+        results: List[Dict[str, Suggestion]] = [{} for _ in articles]
+        for field in INFER_FIELDS:
+            if field not in similarities:
+                continue
+            labels = self.labels[field]
+            competing = allowed = None
+            if field != "subdomain":
+                allowed = np.array([taxonomy is None or field not in taxonomy.values or taxonomy.allows(field, label)
+                                    for label in labels])
+            for row, (meta, suggestions) in enumerate(zip(metas, results)):
+                if not is_missing(meta.get(field)):
+                    continue
+                if field == "subdomain":
+                    domain = meta.get("domain")
+                    if is_missing(domain):
+                        domain = suggestions["domain"].value if "domain" in suggestions else None
+                    if domain is None:
+                        continue
+                    # Subdomains of other domains do not compete; those of this one do, allowed or not
+                    competing = np.array([label.split(_PAIR, 1)[0] == domain for label in labels])
+                    allowed = competing & np.array([_subdomain_allowed(label, domain, taxonomy) for label in labels])
+                suggestion = _best(field, labels, similarities[field][row], competing, allowed, min_confidence)
+                if suggestion is not None:
+                    suggestions[field] = suggestion
+        return results
+
+
+def _label(field: str, meta: dict) -> Optional[str]:
+    value = meta.get(field)
+    if is_missing(value) or isinstance(value, (list, dict)):
+        return None
+    if field == "subdomain":
+        domain = meta.get("domain")
+        if is_missing(domain) or isinstance(domain, (list, dict)):
+            return None
+        return f"{domain}{_PAIR}{value}"
+    return str(value)
+
+
+def _subdomain_allowed(label: str, domain: str, taxonomy: Optional[CompiledTaxonomy]) -> bool:
+    subdomain = label.split(_PAIR, 1)[1]
+    allowed = taxonomy.allowed_subdomains(domain) if taxonomy is not None else None
+    return allowed is None or subdomain in allowed
+
+
+def _best(field: str, labels: List[str], scores: "np.ndarray", competing: Optional["np.ndarray"],
+          allowed: Optional["np.ndarray"], min_confidence: float) -> Optional[Suggestion]:
+    # Values the taxonomy rejects still take their share of the confidence, they just cannot be suggested
+    if competing is not None:
+        scores = np.where(competing, scores, -np.inf)
+    candidates = scores if allowed is None else np.where(allowed, scores, -np.inf)
+    best = int(np.argmax(candidates))
+    if candidates[best] < MIN_SIMILARITY:
+        return None
+    exp = np.exp((scores - scores[best]) / TEMPERATURE)
+    confidence = float(1.0 / (exp.sum() + np.exp((MIN_SIMILARITY - scores[best]) / TEMPERATURE)))
+    if confidence < min_confidence:
+        return None
+    value = labels[best].split(_PAIR, 1)[1] if field == "subdomain" else labels[best]
+    return Suggestion(field, value, round(confidence, 3))
+
+
+def apply_suggestions(article: dict, suggestions: Dict[str, Suggestion]) -> dict:
+    """Return a bundle entry with suggested values filled in and flagged for review.
+
+    Values go into the metadata and their confidences into
+    ``metadata["inferred"]``; each one replaces the entry's "Missing required
+    field" issue with an :func:`inference_issue`. ``article`` itself is not
+    modified.
+    """
+    if not suggestions:
+        return article
+    metadata = {**article["metadata"], "inferred": {**(article["metadata"].get("inferred") or {})}}
+    issues = list(article["issues"])
+    for field, suggestion in suggestions.items():
+        metadata[field] = suggestion.value
+        metadata["inferred"][field] = suggestion.confidence
+        issues = [issue for issue in issues if issue != f"Missing required field: {field}"]
+        issues.append(inference_issue(suggestion))
+    return {**article, "metadata": metadata, "issues": issues}
+
+
+def suggest_metadata(
+    bundle: Iterable[dict],
+    model: MetadataModel,
+    taxonomy: Optional[CompiledTaxonomy] = None,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    batch_size: int = INFER_BATCH,
+) -> Iterator[dict]:
+    """Yield bundle entries with suggestions applied, scoring ``batch_size`` entries at a time."""
+    batch: List[dict] = []
+    for article in bundle:
+        batch.append(article)
+        if len(batch) >= batch_size:
+            yield from _suggest_batch(batch, model, taxonomy, min_confidence)
+            batch = []
+    if batch:
+        yield from _suggest_batch(batch, model, taxonomy, min_confidence)
+
+
+def _suggest_batch(batch: List[dict], model: MetadataModel, taxonomy: Optional[CompiledTaxonomy],
+                   min_confidence: float) -> Iterator[dict]:
+    # Entries with every field set are passed through without being featurized
+    needy = [idx for idx, article in enumerate(batch)
+             if any(is_missing((article.get("metadata") or {}).get(field)) for field in INFER_FIELDS)]
+    suggestions = dict(zip(needy, model.suggest([batch[idx] for idx in needy], taxonomy, min_confidence)))
+    for idx, article in enumerate(batch):
+        yield apply_suggestions(article, suggestions[idx]) if idx in suggestions else article
+
+
+def iter_tagged_documents(paths: Iterable[str]) -> Iterator[Tuple[dict, str]]:
+    """Yield ``(metadata, body)`` training pairs from Markdown files, directories or bundle files.
+
+    Directories are walked for ``.md`` files with front matter. ``.json`` and
+    ``.jsonl`` files are read as app bundles (``metadata`` and ``content``).
+    Files without front matter are skipped.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                yield from iter_tagged_documents(os.path.join(root, name) for name in sorted(files)
+                                                 if name.lower().endswith(".md"))
+        elif is_jsonl(path) or path.lower().endswith(".json"):
+            for article in iter_records(path):
+                yield article.get("metadata") or {}, article.get("content") or ""
+        else:
+            meta, body = read_front_matter(path)
+            if meta:
+                yield meta, "".join(body)
+
+
+def train_model(paths: Iterable[str]) -> MetadataModel:
+    """Train a model on the tagged documents found under ``paths`` (see :func:`iter_tagged_documents`)."""
+    return MetadataModel.train(iter_tagged_documents(paths))
@@ -0,0 +1,240 @@
+"""
+jobs.py
+
+Background job queue for validating uploads without blocking the caller.
+
+A submitted batch becomes a :class:`Job` with an ID. A background thread runs
+it through :func:`knowledge_core.pipeline.iter_process_files` and records each
+article as soon as it finishes, so callers can poll progress, render partial
+results and cancel the job at any time.
+
+Jobs are split into two lanes by size, each with its own concurrency limit:
+batches of more than ``bulk_threshold`` files go to the *bulk* lane, everything
+else to the *interactive* lane. A huge batch can therefore only occupy bulk
+slots, and by default it leaves one CPU free, so small validations keep
+running alongside it instead of queueing behind it.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from knowledge_core.cache import ContentCache
+from knowledge_core.executor import default_workers
+from knowledge_core.metrics import Metrics, profiled
+from knowledge_core.pipeline import iter_process_files
+from knowledge_core.taxonomy import CompiledTaxonomy
+
+LANES = ("interactive", "bulk")
+# Finished jobs kept around for lookups by ID
+MAX_FINISHED_JOBS = 50
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+class Job:
+    """One background validation batch and its progress.
+
+    ``state`` moves from ``queued`` to ``running`` and ends as ``done``,
+    ``cancelled`` or ``failed``. Articles are stored by upload index as they
+    finish; all methods are safe to call from any thread.
+    """
+
+    def __init__(self, total: int, lane: str, metrics: Optional[Metrics] = None) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.total = total
+        self.lane = lane
+        self.state = "queued"
+        self.error: Optional[str] = None
+        self.completed = 0
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.metrics = metrics
+        self._articles: List[Optional[dict]] = [None] * total
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Ask the job to stop; files already validated are kept."""
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes or ``timeout`` passes; returns True when finished."""
+        return self._finished.wait(timeout)
+
+    def progress(self) -> Tuple[int, int]:
+        """Return ``(completed files, total files)``."""
+        return self.completed, self.total
+
+    def results(self) -> List[Tuple[int, dict]]:
+        """Return ``(upload index, article)`` for every finished file, in upload order."""
+        with self._lock:
+            return [(idx, article) for idx, article in enumerate(self._articles) if article is not None]
+
+    def bundle(self) -> List[dict]:
+        """Return the finished articles in upload order."""
+        return [article for _, article in self.results()]
+
+    def describe(self) -> str:
+        """One-line Markdown summary of the job's state and progress."""
+        done, total = self.progress()
+        text = f"Job `{self.id}` ({self.lane}): {done}/{total} files, {self.state}"
+        if self.state == "running" and self.cancel_requested:
+            text += " (cancelling)"
+        if self.error:
+            text += f": {self.error}"
+        return text
+
+    def _record(self, idx: int, article: dict) -> None:
+        with self._lock:
+            if self._articles[idx] is None:
+                self.completed += 1
+            self._articles[idx] = article
+
+    def _finish(self, state: str, error: Optional[str] = None) -> None:
+        if self.metrics is not None:
+            self.metrics.finish()
+        self.state = state
+        self.error = error
+        self.finished_at = time.time()
+        self._finished.set()
+
+
+class JobQueue:
+    """Run validation batches as background jobs with per-lane concurrency limits.
+
+    ``max_bulk_jobs`` and ``max_interactive_jobs`` cap how many jobs of each
+    lane run at once (``KNOWLEDGE_MAX_BULK_JOBS``, default 1, and
+    ``KNOWLEDGE_MAX_INTERACTIVE_JOBS``, default 4); further jobs wait in
+    ``queued`` state. ``bulk_threshold`` (``KNOWLEDGE_BULK_THRESHOLD``, default
+    20 files) decides the lane. Each lane splits a worker budget between the
+    jobs it may run at once: bulk jobs use ``bulk_workers`` processes
+    (``KNOWLEDGE_BULK_WORKERS``, by default one less than the worker count,
+    divided by the bulk job limit) and interactive jobs ``interactive_workers``
+    (``KNOWLEDGE_INTERACTIVE_WORKERS``, by default the worker count divided by
+    the interactive job limit), so full lanes never oversubscribe the CPUs.
+    A job's own ``workers`` option overrides its lane's.
+    """
+
+    def __init__(
+        self,
+        max_bulk_jobs: Optional[int] = None,
+        max_interactive_jobs: Optional[int] = None,
+        bulk_threshold: Optional[int] = None,
+        bulk_workers: Optional[int] = None,
+        interactive_workers: Optional[int] = None,
+    ) -> None:
+        self.bulk_threshold = bulk_threshold or _env_int("KNOWLEDGE_BULK_THRESHOLD", 20)
+        self.limits = {
+            "bulk": max_bulk_jobs or _env_int("KNOWLEDGE_MAX_BULK_JOBS", 1),
+            "interactive": max_interactive_jobs or _env_int("KNOWLEDGE_MAX_INTERACTIVE_JOBS", 4),
+        }
+        workers = default_workers()
+        self.bulk_workers = bulk_workers or _env_int(
+            "KNOWLEDGE_BULK_WORKERS", max(1, (workers - 1) // self.limits["bulk"]))
+        self.interactive_workers = interactive_workers or _env_int(
+            "KNOWLEDGE_INTERACTIVE_WORKERS", max(1, workers // self.limits["interactive"]))
+        self._slots = {lane: threading.BoundedSemaphore(limit) for lane, limit in self.limits.items()}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lane_for(self, count: int) -> str:
+        return "bulk" if count > self.bulk_threshold else "interactive"
+
+    def submit(
+        self,
+        files: List[Any],
+        taxonomy: bytes | CompiledTaxonomy | None = None,
+        cache: ContentCache | None = None,
+        **options: Any,
+    ) -> Job:
+        """Queue a batch and return its job immediately.
+
+        ``options`` are passed on to :func:`iter_process_files` (``timeout``,
+        ``max_pdf_pages``, ``stream_threshold``, ``workers``, ``metrics``,
+        ``dedup``, ``search_index``, ``inference``); a ``metrics`` object is
+        also kept on the job as ``job.metrics``.
+        """
+        files = list(files)
+        job = Job(len(files), self.lane_for(len(files)), options.get("metrics"))
+        options.setdefault("workers", self.bulk_workers if job.lane == "bulk" else self.interactive_workers)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        thread = threading.Thread(
+            target=self._run, args=(job, files, taxonomy, cache, options), name=f"job-{job.id}", daemon=True
+        )
+        thread.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job by ID; returns False if the ID is unknown."""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, files: List[Any], taxonomy, cache, options: Dict[str, Any]) -> None:
+        slot = self._slots[job.lane]
+        # Wait for a free slot in the job's lane, giving up if cancelled meanwhile
+        while not slot.acquire(timeout=0.1):
+            if job.cancel_requested:
+                job._finish("cancelled")
+                return
+        try:
+            if job.cancel_requested:
+                job._finish("cancelled")
+                return
+            job.state = "running"
+            job.started_at = time.time()
+            with profiled(job.metrics):
+                for idx, article in iter_process_files(files, taxonomy, cache=cache, cancel=job._cancel, **options):
+                    job._record(idx, article)
+            job._finish("cancelled" if job.cancel_requested and job.completed < job.total else "done")
+        except Exception as exc:
+            job._finish("failed", f"{type(exc).__name__}: {exc}")
+        finally:
+            slot.release()
+
+
+_JOB_QUEUE: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use."""
+    global _JOB_QUEUE
+    if _JOB_QUEUE is None:
+        _JOB_QUEUE = JobQueue()
+    return _JOB_QUEUE
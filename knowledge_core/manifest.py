@@ -0,0 +1,137 @@
+"""
+manifest.py
+
+On-disk manifest for incremental batch ingestion.
+
+The manifest records, for every source file seen by the last run, its size,
+modification time and content hash together with the result produced for it.
+On the next run files whose size and mtime are unchanged are reused without
+being opened; files whose stat changed are hashed, and only those whose content
+actually changed (plus new files) are ingested again. Files that disappeared are
+dropped. Changing the taxonomy or the ingestion options invalidates every entry.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from knowledge_core.cache import hash_source
+
+MANIFEST_VERSION = 1
+
+
+def file_fingerprint(path: str) -> Tuple[int, int, str]:
+    """Return ``(mtime_ns, size, sha256)`` for a file.
+
+    Take it before reading the file for ingestion, so an edit made while the
+    file is being ingested is picked up by the next run.
+    """
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, hash_source(path)
+
+
+@dataclass
+class ManifestEntry:
+    """What the manifest knows about one source file."""
+
+    mtime_ns: int
+    size: int
+    sha256: str
+    # The ingested record, or None when ingestion failed with ``error``
+    record: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ManifestDiff:
+    """Classification of the current files against the previous manifest."""
+
+    unchanged: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+class IngestManifest:
+    """Per-file stat, hash and result bookkeeping for incremental runs.
+
+    ``context`` captures everything besides file content that affects results
+    (taxonomy fingerprint, options); a manifest loaded with a different
+    context starts out empty.
+    """
+
+    def __init__(self, path: str, context: Optional[Dict[str, Any]] = None) -> None:
+        self.path = path
+        self.context: Dict[str, Any] = dict(context or {})
+        self.entries: Dict[str, ManifestEntry] = {}
+
+    @classmethod
+    def load(cls, path: str, context: Optional[Dict[str, Any]] = None) -> "IngestManifest":
+        """Load a manifest, or return an empty one if missing, corrupt or stale."""
+        manifest = cls(path, context)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if data.get("version") != MANIFEST_VERSION or data.get("context") != manifest.context:
+            return manifest
+        for source, entry in (data.get("files") or {}).items():
+            manifest.entries[source] = ManifestEntry(**entry)
+        return manifest
+
+    def diff(self, paths: Iterable[str]) -> ManifestDiff:
+        """Split ``paths`` into unchanged and changed files and list removed ones.
+
+        A file is unchanged when its size and mtime match the manifest, or when
+        they differ but its content hash does not (e.g. after a ``touch``).
+        """
+        result = ManifestDiff()
+        seen = set()
+        for source in paths:
+            seen.add(source)
+            entry = self.entries.get(source)
+            if entry is None:
+                result.changed.append(source)
+                continue
+            st = os.stat(source)
+            if st.st_size == entry.size and st.st_mtime_ns == entry.mtime_ns:
+                result.unchanged.append(source)
+                continue
+            if hash_source(source) == entry.sha256:
+                entry.mtime_ns, entry.size = st.st_mtime_ns, st.st_size
+                result.unchanged.append(source)
+            else:
+                result.changed.append(source)
+        result.removed = [source for source in self.entries if source not in seen]
+        return result
+
+    def record(
+        self,
+        source: str,
+        fingerprint: Tuple[int, int, str],
+        record: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Store the result of ingesting ``source`` with its :func:`file_fingerprint`."""
+        mtime_ns, size, sha256 = fingerprint
+        self.entries[source] = ManifestEntry(mtime_ns, size, sha256, record, error)
+
+    def forget(self, sources: Iterable[str]) -> None:
+        for source in sources:
+            self.entries.pop(source, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically next to its previous version."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "context": self.context,
+            "files": {source: entry.__dict__ for source, entry in self.entries.items()},
+        }
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,286 @@
+"""
+metrics.py
+
+Opt-in per-stage timing for the extraction and validation pipeline.
+
+Pipeline code wraps each stage in :func:`timed`, which records wall time and
+bytes in/out into the :class:`Metrics` installed with :func:`collecting` for
+the current thread or task, and costs next to nothing when none is installed.
+Pool workers collect into their own :class:`Metrics` and return it as a dict
+that the parent merges, so the numbers cover work done in every process.
+
+A summary is available as JSON (:meth:`Metrics.summary`) or in the Prometheus
+text exposition format (:meth:`Metrics.to_prometheus`). Files slower than
+``slow_threshold`` seconds are kept in a slow-file log, with their per-stage
+breakdown, and reported through the ``knowledge_core.metrics`` logger.
+"""
+
+import contextvars
+import io
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("cprofile", "pyinstrument")
+# Lines of cProfile output kept in the report
+PROFILE_TOP = 40
+
+_CURRENT: "contextvars.ContextVar[Optional[Metrics]]" = contextvars.ContextVar("knowledge_metrics", default=None)
+
+
+def default_slow_threshold() -> float:
+    """Return the slow-file threshold in seconds from ``KNOWLEDGE_SLOW_FILE_SECONDS`` (default 5)."""
+    try:
+        return float(os.environ.get("KNOWLEDGE_SLOW_FILE_SECONDS", "5"))
+    except ValueError:
+        return 5.0
+
+
+def file_type(name: str) -> str:
+    """Return the metrics label for a file name, e.g. ``pdf`` or ``md``."""
+    return os.path.splitext(name)[1].lower().lstrip(".") or "unknown"
+
+
+@dataclass
+class StageStats:
+    """Totals for one (stage, file type) pair."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def add(self, seconds: float, bytes_in: int = 0, bytes_out: int = 0, calls: int = 1) -> None:
+        self.calls += calls
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds if calls == 1 else 0.0)
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+
+class StageTimer:
+    """Handle yielded by :func:`timed`; set ``bytes_in``/``bytes_out`` while the stage runs.
+
+    ``active`` is False when no metrics are being collected, so callers can
+    skip computing byte counts that would be thrown away.
+    """
+
+    def __init__(self, active: bool, bytes_in: int = 0) -> None:
+        self.active = active
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+
+
+class Metrics:
+    """Per-stage wall time, byte counts and per-file-type totals for one run.
+
+    ``profiler`` (``"cprofile"`` or ``"pyinstrument"``) asks the pipeline to
+    profile the run in-process; the text report ends up in ``profile``.
+    """
+
+    def __init__(self, slow_threshold: Optional[float] = None, profiler: Optional[str] = None) -> None:
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'; expected one of {PROFILERS}")
+        self.slow_threshold = default_slow_threshold() if slow_threshold is None else slow_threshold
+        self.profiler = profiler
+        self.profile: Optional[str] = None
+        self.stages: Dict[Tuple[str, str], StageStats] = {}
+        self.files: Dict[str, StageStats] = {}
+        self.slow_files: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.wall_seconds = 0.0
+
+    def add(
+        self, stage: str, kind: str = "", seconds: float = 0.0, bytes_in: int = 0, bytes_out: int = 0, calls: int = 1
+    ) -> None:
+        """Add one (or ``calls``) timed executions of ``stage`` for file type ``kind``."""
+        self.stages.setdefault((stage, kind), StageStats()).add(seconds, bytes_in, bytes_out, calls)
+
+    def observe_file(
+        self, name: str, seconds: float, bytes_in: int = 0, stages: Optional[Dict[str, float]] = None
+    ) -> None:
+        """Count one processed file and log it if it took longer than the slow threshold."""
+        kind = file_type(name)
+        self.files.setdefault(kind, StageStats()).add(seconds, bytes_in)
+        if seconds >= self.slow_threshold:
+            entry = {"file": name, "file_type": kind, "seconds": round(seconds, 6), "bytes": bytes_in}
+            if stages:
+                entry["stages"] = {stage: round(value, 6) for stage, value in stages.items()}
+            self.slow_files.append(entry)
+            logger.warning("Slow file %s: %.2fs (%s)", name, seconds, entry.get("stages", {}))
+
+    def stage_seconds(self) -> Dict[str, float]:
+        """Return total seconds per stage, summed over file types, slowest first."""
+        totals: Dict[str, float] = {}
+        for (stage, _), stats in self.stages.items():
+            totals[stage] = totals.get(stage, 0.0) + stats.seconds
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def finish(self) -> "Metrics":
+        """Record the run's wall time; call once the run is over."""
+        self.wall_seconds = time.perf_counter() - self.started
+        return self
+
+    # Serialization ---------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the raw counters, e.g. to send from a worker to the parent."""
+        return {
+            "stages": [[stage, kind, s.calls, s.seconds, s.max_seconds, s.bytes_in, s.bytes_out]
+                       for (stage, kind), s in self.stages.items()],
+            "files": [[kind, s.calls, s.seconds, s.max_seconds, s.bytes_in] for kind, s in self.files.items()],
+            "slow_files": self.slow_files,
+        }
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Add counters produced by :meth:`to_dict` (typically from a pool worker)."""
+        for stage, kind, calls, seconds, max_seconds, bytes_in, bytes_out in data.get("stages", ()):
+            stats = self.stages.setdefault((stage, kind), StageStats())
+            stats.add(seconds, bytes_in, bytes_out, calls)
+            stats.max_seconds = max(stats.max_seconds, max_seconds)
+        for kind, calls, seconds, max_seconds, bytes_in in data.get("files", ()):
+            stats = self.files.setdefault(kind, StageStats())
+            stats.add(seconds, bytes_in, calls=calls)
+            stats.max_seconds = max(stats.max_seconds, max_seconds)
+        self.slow_files.extend(data.get("slow_files", ()))
+
+    def summary(self) -> Dict[str, Any]:
+        """Return a JSON-friendly summary: stages, per-type file totals and slow files."""
+        return {
+            "wall_seconds": round(self.wall_seconds, 6),
+            "stages": [
+                {
+                    "stage": stage,
+                    "file_type": kind,
+                    "calls": s.calls,
+                    "seconds": round(s.seconds, 6),
+                    "max_seconds": round(s.max_seconds, 6),
+                    "bytes_in": s.bytes_in,
+                    "bytes_out": s.bytes_out,
+                }
+                for (stage, kind), s in sorted(self.stages.items(), key=lambda item: item[1].seconds, reverse=True)
+            ],
+            "files": {
+                kind: {"count": s.calls, "seconds": round(s.seconds, 6), "bytes": s.bytes_in}
+                for kind, s in sorted(self.files.items())
+            },
+            "slow_threshold_seconds": self.slow_threshold,
+            "slow_files": self.slow_files,
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.summary(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "knowledge") -> str:
+        """Render the counters in the Prometheus text exposition format."""
+        out = io.StringIO()
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> None:
+            out.write(f"# HELP {prefix}_{name} {help_text}\n# TYPE {prefix}_{name} {kind}\n")
+            for labels, value in samples:
+                rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                out.write(f"{prefix}_{name}{{{rendered}}} {value:g}\n" if rendered else f"{prefix}_{name} {value:g}\n")
+
+        stage_labels = [({"stage": stage, "file_type": kind}, s) for (stage, kind), s in sorted(self.stages.items())]
+        family("stage_seconds_total", "counter", "Wall time spent per pipeline stage.",
+               [(labels, s.seconds) for labels, s in stage_labels])
+        family("stage_calls_total", "counter", "Executions per pipeline stage.",
+               [(labels, s.calls) for labels, s in stage_labels])
+        family("stage_bytes_in_total", "counter", "Bytes read per pipeline stage.",
+               [(labels, s.bytes_in) for labels, s in stage_labels])
+        family("stage_bytes_out_total", "counter", "Bytes produced per pipeline stage.",
+               [(labels, s.bytes_out) for labels, s in stage_labels])
+        family("files_total", "counter", "Files processed per file type.",
+               [({"file_type": kind}, s.calls) for kind, s in sorted(self.files.items())])
+        family("file_seconds_total", "counter", "Per-file processing time per file type.",
+               [({"file_type": kind}, s.seconds) for kind, s in sorted(self.files.items())])
+        family("slow_files_total", "counter", "Files slower than the slow-file threshold.",
+               [({}, len(self.slow_files))])
+        family("run_wall_seconds", "gauge", "Wall time of the run.", [({}, self.wall_seconds)])
+        return out.getvalue()
+
+    def write(self, path: str) -> None:
+        """Write Prometheus text for ``.prom``/``.txt`` paths and a JSON summary otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def current_metrics() -> Optional[Metrics]:
+    """Return the metrics being collected in this context, if any."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def collecting(metrics: Optional[Metrics]) -> Iterator[Optional[Metrics]]:
+    """Install ``metrics`` as the target of :func:`timed` for the enclosed code."""
+    token = _CURRENT.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def timed(stage: str, kind: str = "", bytes_in: int = 0) -> Iterator[StageTimer]:
+    """Time the enclosed block as ``stage`` for file type ``kind``.
+
+    A no-op unless metrics are being collected (see :func:`collecting`).
+    """
+    metrics = _CURRENT.get()
+    if metrics is None:
+        yield StageTimer(False)
+        return
+    timer = StageTimer(True, bytes_in)
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        metrics.add(stage, kind, time.perf_counter() - start, timer.bytes_in, timer.bytes_out)
+
+
+@contextmanager
+def profiled(metrics: Optional[Metrics]) -> Iterator[None]:
+    """Profile the enclosed block with ``metrics.profiler`` and store the text report.
+
+    Does nothing when ``metrics`` is None or has no profiler. Without
+    pyinstrument installed, ``"pyinstrument"`` falls back to cProfile.
+    """
+    if metrics is None or metrics.profiler is None:
+        yield
+        return
+    from knowledge_core.extract import optional_module
+
+    pyinstrument = optional_module("pyinstrument") if metrics.profiler == "pyinstrument" else None
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            metrics.profile = profiler.output_text(unicode=False, color=False)
+        return
+    import cProfile
+    import pstats
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        metrics.profile = report.getvalue()
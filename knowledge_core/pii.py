@@ -0,0 +1,246 @@
+"""
+pii.py
+
+Single-pass PII scanner for article bodies.
+
+All detectors are compiled once into one alternation regex with a named group
+per detector, so the body is walked a single time no matter how many
+detectors are enabled. Each detector declares the characters a match can start
+with; the combined pattern is gated on their union so positions that cannot
+begin any match are skipped cheaply. Detectors may carry a validator (e.g. a
+Luhn check for card numbers) that rejects pattern matches which are not real
+PII. Once a detector reaches its per-type limit it is dropped from the pattern
+and the scan continues with the rest, stopping as soon as every detector is
+done.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Detector:
+    """A named PII pattern with the issue message reported when it matches.
+
+    ``first`` is a regex character-class body (without brackets) covering
+    every character a match can start with. ``extend_left`` optionally names
+    a character class over which a finding's start is extended backwards,
+    for patterns anchored on an inner character such as the ``@`` of an email.
+    """
+
+    kind: str
+    pattern: str
+    message: str
+    first: str
+    validator: Optional[Callable[[str], bool]] = None
+    extend_left: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PIIFinding:
+    """One PII match, as character offsets into the scanned text."""
+
+    kind: str
+    start: int
+    end: int
+
+
+@dataclass
+class PIIScanResult:
+    """Findings and per-type counts from one scan."""
+
+    findings: List[PIIFinding] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+    # Detector kinds that stopped early because they hit their limit
+    truncated: FrozenSet[str] = frozenset()
+
+    @property
+    def kinds(self) -> FrozenSet[str]:
+        return frozenset(kind for kind, count in self.counts.items() if count)
+
+
+def luhn_valid(candidate: str) -> bool:
+    """Return True if the digits in ``candidate`` pass the Luhn checksum."""
+    digits = [int(ch) for ch in candidate if ch.isdigit()]
+    if not 13 <= len(digits) <= 19:
+        return False
+    total = 0
+    for idx, digit in enumerate(reversed(digits)):
+        if idx % 2 == 1:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def iban_valid(candidate: str) -> bool:
+    """Return True if ``candidate`` passes the ISO 13616 mod-97 IBAN check."""
+    compact = candidate.replace(" ", "").upper()
+    if not 15 <= len(compact) <= 34:
+        return False
+    rearranged = compact[4:] + compact[:4]
+    try:
+        numeric = "".join(str(int(ch, 36)) for ch in rearranged)
+    except ValueError:
+        return False
+    return int(numeric) % 97 == 1
+
+
+SSN = Detector(
+    "ssn",
+    r"\b\d{3}-\d{2}-\d{4}\b",
+    "Possible SSN-like pattern detected in body",
+    first=r"\d",
+)
+# Anchored on the "@" so letters never have to be tried as a local-part start
+EMAIL = Detector(
+    "email",
+    r"@(?<=[A-Za-z0-9._%+-]@)[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "Email addresses detected in body (verify necessity)",
+    first="@",
+    extend_left="A-Za-z0-9._%+-",
+)
+PHONE = Detector(
+    "phone",
+    # US formats
+    r"(?:\+?1[-.\s]?)?(?:\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}\b",
+    "Possible phone number detected in body",
+    first=r"\d+(",
+)
+IBAN = Detector(
+    "iban",
+    r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,4})?\b",
+    "Possible IBAN detected in body",
+    first="A-Z",
+    validator=iban_valid,
+)
+CREDIT_CARD = Detector(
+    "credit_card",
+    r"\b(?:\d[ -]?){12,18}\d\b",
+    "Possible credit card number detected in body",
+    first=r"\d",
+    validator=luhn_valid,
+)
+
+# Alternation order matters when two patterns could match at the same offset.
+# Validated detectors go last: when a candidate fails validation the scan
+# resumes one character later, so only other validated matches could be lost.
+DEFAULT_DETECTORS: Tuple[Detector, ...] = (SSN, EMAIL, PHONE, IBAN, CREDIT_CARD)
+
+# Emails are extended left over at most this many local-part characters
+_MAX_EXTEND = 64
+
+
+class PIIScanner:
+    """Scan text for all configured detectors in a single regex pass.
+
+    ``max_per_type`` caps how many findings are collected per detector; use 1
+    when only presence matters. ``None`` collects every match.
+    """
+
+    def __init__(self, detectors: Iterable[Detector] = DEFAULT_DETECTORS, max_per_type: Optional[int] = None) -> None:
+        self.detectors: Tuple[Detector, ...] = tuple(detectors)
+        kinds = [d.kind for d in self.detectors]
+        if len(set(kinds)) != len(kinds):
+            raise ValueError(f"Duplicate detector kinds: {kinds}")
+        self.max_per_type = max_per_type
+        self._by_kind: Dict[str, Detector] = {d.kind: d for d in self.detectors}
+        self._patterns: Dict[FrozenSet[str], "re.Pattern[str]"] = {}
+        self._left_patterns: Dict[str, "re.Pattern[str]"] = {}
+
+    def with_detectors(self, *extra: Detector) -> "PIIScanner":
+        """Return a new scanner with additional detectors appended."""
+        return PIIScanner(self.detectors + extra, max_per_type=self.max_per_type)
+
+    def _pattern(self, active: FrozenSet[str]) -> "re.Pattern[str]":
+        # One combined pattern per set of still-active detectors, compiled lazily
+        pattern = self._patterns.get(active)
+        if pattern is None:
+            detectors = [d for d in self.detectors if d.kind in active]
+            gate = "".join(dict.fromkeys(d.first for d in detectors))
+            branches = "|".join(f"(?P<{d.kind}>{d.pattern})" for d in detectors)
+            pattern = re.compile(f"(?=[{gate}])(?:{branches})")
+            self._patterns[active] = pattern
+        return pattern
+
+    def scan(
+        self, text: str, start: int = 0, end: Optional[int] = None, exclude: FrozenSet[str] = frozenset()
+    ) -> PIIScanResult:
+        """Scan ``text[start:end]`` and return findings with absolute offsets.
+
+        Characters before ``start`` still count as context for word boundaries
+        and look-behinds. Detector kinds in ``exclude`` are skipped.
+        """
+        counts: Dict[str, int] = {d.kind: 0 for d in self.detectors}
+        findings: List[PIIFinding] = []
+        remaining = {kind: 0 for kind in exclude}
+        for finding, _ in self.iter_findings(text, start, end, remaining):
+            counts[finding.kind] += 1
+            findings.append(finding)
+        saturated = frozenset(
+            kind for kind, count in counts.items() if self.max_per_type is not None and count >= self.max_per_type
+        )
+        return PIIScanResult(findings=findings, counts=counts, truncated=saturated)
+
+    def iter_findings(
+        self,
+        text: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        remaining: Optional[Dict[str, Optional[int]]] = None,
+    ) -> Iterator[Tuple[PIIFinding, int]]:
+        """Yield ``(finding, match_start)`` pairs in scan order.
+
+        ``match_start`` is where the regex match began, which differs from
+        ``finding.start`` for detectors with ``extend_left``; pairs are ordered
+        by it. ``remaining`` caps how many more findings each kind may report
+        (0 disables a kind); kinds not listed fall back to ``max_per_type``.
+        """
+        end = len(text) if end is None else end
+        budget: Dict[str, Optional[int]] = {d.kind: self.max_per_type for d in self.detectors}
+        if remaining:
+            budget.update(remaining)
+        active = frozenset(kind for kind, left in budget.items() if left is None or left > 0)
+        pos = start
+        while active:
+            match = self._pattern(active).search(text, pos, end)
+            if match is None:
+                return
+            kind = match.lastgroup
+            detector = self._by_kind[kind]
+            if detector.validator is not None and not detector.validator(match.group()):
+                # Not real PII; shorter matches may still start inside it
+                pos = match.start() + 1
+                continue
+            pos = match.end()
+            found_at = match.start()
+            if detector.extend_left:
+                found_at = self._extend_left(text, found_at, detector.extend_left)
+            yield PIIFinding(kind, found_at, match.end()), match.start()
+            if budget[kind] is not None:
+                budget[kind] -= 1
+                if budget[kind] <= 0:
+                    # Drop the saturated detector; the rest keep scanning from here
+                    active = active - {kind}
+
+    def _extend_left(self, text: str, at: int, chars: str) -> int:
+        pattern = self._left_patterns.get(chars)
+        if pattern is None:
+            pattern = self._left_patterns[chars] = re.compile(f"[{chars}]+$")
+        match = pattern.search(text, max(0, at - _MAX_EXTEND), at)
+        return match.start() if match else at
+
+    def issues(self, result: PIIScanResult) -> List[str]:
+        """Return the issue messages for detector kinds present in ``result``."""
+        return [d.message for d in self.detectors if result.counts.get(d.kind)]
+
+
+# Shared scanner used by validation, which only needs to know whether each kind occurs
+DEFAULT_SCANNER = PIIScanner(max_per_type=1)
+
+
+def scan_pii(text: str, max_per_type: Optional[int] = None) -> PIIScanResult:
+    """Scan ``text`` with the default detectors."""
+    return PIIScanner(max_per_type=max_per_type).scan(text)
@@ -0,0 +1,526 @@
+"""
+pipeline.py
+
+End-to-end processing of uploaded documents: extraction, validation, caching,
+metadata inference, duplicate detection, search indexing and fan-out across a
+worker pool. This is what the Gradio app runs on "Run Analysis", usable from
+scripts and workers without any UI dependency.
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import nullcontext
+from functools import partial
+from typing import Iterator, List, Tuple
+
+from knowledge_core.cache import ContentCache, default_cache_path, hash_source
+from knowledge_core.chunking import bundle_chunks
+from knowledge_core.columnar import write_bundle
+from knowledge_core.dedup import DedupIndex, default_dedup_path, link_duplicates
+from knowledge_core.executor import BatchExecutor, default_timeout
+from knowledge_core.docxtext import read_docx
+from knowledge_core.extract import DOCX_EXTENSIONS, HTML_EXTENSIONS, PDF_EXTENSIONS, clean_text, extract_document
+from knowledge_core.freshness import utc_today
+from knowledge_core.frontmatter import parse_front_matter_stream, read_front_matter
+from knowledge_core.htmltext import read_html
+from knowledge_core.inference import MetadataModel, default_model_path, suggest_metadata
+from knowledge_core.metrics import Metrics, collecting, file_type, profiled, timed
+from knowledge_core.records import RecordWriter
+from knowledge_core.search import SearchIndex, default_search_path
+from knowledge_core.taxonomy import CompiledTaxonomy
+from knowledge_core.validation import (
+    DEFAULT_COMPILED_TAXONOMY,
+    SOURCE_FIELD,
+    finalize_article,
+    infer_metadata,
+    validate_document,
+    validate_many,
+)
+
+# Table columns built for every article by build_row, in column order
+ROW_FIELDS = ["title", "domain", "subdomain", "audience", "format", "status", "last_updated"]
+
+
+def resolve_upload(uploaded_file) -> Tuple[str, str | bytes]:
+    """Return the file name and a source for an uploaded file.
+
+    Files that live on disk (Gradio ``filepath`` uploads or temp-file wrappers)
+    are passed on by path so workers can stream them; anything else is read
+    into bytes.
+    """
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        path = os.fspath(uploaded_file)
+        return path, path
+    # Determine file name and extension if possible
+    name = getattr(uploaded_file, "name", "uploaded")
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, name
+    # Read raw bytes
+    try:
+        content_bytes = uploaded_file.read()  # type: ignore[attr-defined]
+    except Exception:
+        content_bytes = uploaded_file  # assume it's bytes
+    return name, content_bytes
+
+
+def process_stream(upload: Tuple[str, str | bytes], taxonomy: CompiledTaxonomy) -> dict:
+    """Validate a large text, HTML or DOCX upload chunk by chunk.
+
+    Front matter is parsed from the head of the stream only and the body is
+    cleaned and scanned for PII in overlapping windows, so no intermediate
+    full-size copies of the raw, decoded or cleaned text are made. HTML and
+    DOCX are converted to text on the fly, with ``<meta>`` tags or the DOCX
+    core properties filling in fields the front matter does not set. The body
+    chunks are joined once at the end for the bundle.
+    """
+    name, source = upload
+    ext = os.path.splitext(name)[1].lower()
+    if ext in HTML_EXTENSIONS or ext in DOCX_EXTENSIONS:
+        doc_meta, text_chunks = read_html(source) if ext in HTML_EXTENSIONS else read_docx(source)
+        meta, body_chunks = parse_front_matter_stream(clean_text(chunk) for chunk in text_chunks)
+        meta = {**doc_meta, **meta}
+    else:
+        meta, body_chunks = read_front_matter(source, transform=clean_text)
+    article = validate_document(name, meta, body_chunks, taxonomy)
+    extracted = {"metadata": meta, "content": article["content"]}
+    return {"article": article, "extracted": extracted}
+
+
+def should_stream(upload: Tuple[str, str | bytes], stream_threshold: int | None) -> bool:
+    """Return True for text, HTML or DOCX uploads on disk larger than ``stream_threshold`` bytes."""
+    name, source = upload
+    if stream_threshold is None or not isinstance(source, str):
+        return False
+    if os.path.splitext(name)[1].lower() in PDF_EXTENSIONS:
+        return False
+    try:
+        return os.path.getsize(source) > stream_threshold
+    except OSError:
+        return False
+
+
+def process_upload(
+    upload: Tuple[str, str | bytes],
+    taxonomy: CompiledTaxonomy,
+    max_pdf_pages: int | None = None,
+    stream_threshold: int | None = None,
+    collect_metrics: bool = False,
+) -> dict:
+    """Extract, clean, parse and validate one uploaded file.
+
+    Runs inside a pool worker, so it only receives picklable inputs (the file
+    name and either its path or its bytes). Returns the article dict together
+    with the raw extraction so the parent process can cache it. With
+    ``collect_metrics`` the worker's per-stage timings are returned under
+    ``"metrics"`` (see :meth:`knowledge_core.metrics.Metrics.to_dict`).
+    """
+    if collect_metrics:
+        metrics = Metrics()
+        with collecting(metrics):
+            result = process_upload(upload, taxonomy, max_pdf_pages, stream_threshold)
+        result["metrics"] = metrics.to_dict()
+        return result
+    if should_stream(upload, stream_threshold):
+        return process_stream(upload, taxonomy)
+    meta, body = extract_document(upload[0], upload[1], max_pdf_pages=max_pdf_pages)
+    extracted = {"metadata": dict(meta), "content": body}
+    return {"article": validate_document(upload[0], meta, body, taxonomy), "extracted": extracted}
+
+
+def upload_dir() -> str:
+    """Return the directory Gradio copies uploads into (``GRADIO_TEMP_DIR``, or ``gradio`` in the temp dir)."""
+    return os.environ.get("GRADIO_TEMP_DIR") or os.path.join(tempfile.gettempdir(), "gradio")
+
+
+def source_id(upload: Tuple[str, str | bytes]) -> str:
+    """Return the name an upload is identified by across runs.
+
+    It is recorded in each article's metadata as :data:`SOURCE_FIELD` and keys
+    the duplicate index, the search index and chunk IDs. Files on disk are
+    identified by their path, so equally named files from different folders
+    keep separate entries. Uploads copied into :func:`upload_dir` (one folder
+    per content hash) and in-memory uploads are identified by their file name,
+    so a corrected re-upload replaces its earlier version and no server temp
+    path shows up in issues.
+    """
+    name, source = upload
+    if isinstance(source, str):
+        path = os.path.realpath(source)
+        root = os.path.realpath(upload_dir())
+        if os.path.commonpath([path, root]) != root:
+            return path
+    return os.path.basename(name)
+
+
+def source_size(source: str | bytes) -> int:
+    """Return the size in bytes of an upload source (a path or raw bytes), or 0 if unknown."""
+    if isinstance(source, str):
+        try:
+            return os.path.getsize(source)
+        except OSError:
+            return 0
+    return len(source)
+
+
+def build_row(meta: dict, issues: List[str]) -> dict:
+    """Build the validation table row for one article."""
+    row = {field: meta.get(field) for field in ROW_FIELDS}
+    row["issues"] = "; ".join(issues) if issues else "None"
+    return row
+
+
+_CACHE: ContentCache | None = None
+
+
+def get_cache() -> ContentCache | None:
+    """Return the process-wide content cache, creating it on first use.
+
+    The location comes from ``KNOWLEDGE_CACHE_PATH`` (empty disables caching)
+    and the size bound from ``KNOWLEDGE_CACHE_MAX_MB``.
+    """
+    global _CACHE
+    if _CACHE is None:
+        path = default_cache_path()
+        if not path:
+            return None
+        max_mb = int(os.environ.get("KNOWLEDGE_CACHE_MAX_MB", "512"))
+        _CACHE = ContentCache(path, max_bytes=max_mb * 1024 * 1024)
+    return _CACHE
+
+
+_DEDUP: DedupIndex | None = None
+
+
+def get_dedup_index() -> DedupIndex | None:
+    """Return the process-wide duplicate index, creating it on first use.
+
+    The location comes from ``KNOWLEDGE_DEDUP_PATH`` (empty disables duplicate
+    detection) and the similarity threshold from ``KNOWLEDGE_DEDUP_THRESHOLD``.
+    """
+    global _DEDUP
+    if _DEDUP is None:
+        path = default_dedup_path()
+        if not path:
+            return None
+        _DEDUP = DedupIndex(path)
+    return _DEDUP
+
+
+_SEARCH: SearchIndex | None = None
+
+
+def get_search_index() -> SearchIndex | None:
+    """Return the process-wide search index, opening it on first use.
+
+    The location comes from ``KNOWLEDGE_SEARCH_PATH`` (empty disables indexing).
+    """
+    global _SEARCH
+    if _SEARCH is None:
+        path = default_search_path()
+        if not path:
+            return None
+        _SEARCH = SearchIndex(path)
+    return _SEARCH
+
+
+_MODEL: MetadataModel | None = None
+
+
+def get_metadata_model() -> MetadataModel | None:
+    """Return the process-wide metadata model, loading it on first use.
+
+    The model is read from ``KNOWLEDGE_MODEL_PATH`` (empty disables inference);
+    None is returned until a model has been trained there.
+    """
+    global _MODEL
+    if _MODEL is None:
+        path = default_model_path()
+        if not path or not os.path.exists(path):
+            return None
+        _MODEL = MetadataModel.load(path)
+    return _MODEL
+
+
+def format_cache_stats(cache: ContentCache | None) -> str:
+    """Summarize cache hit/miss counters as a one-line Markdown string."""
+    if cache is None:
+        return ""
+    stats = cache.stats()
+    return (
+        f"Cache: {stats['extraction_hits']} extraction hits / {stats['extraction_misses']} misses, "
+        f"{stats['validation_hits']} validation hits / {stats['validation_misses']} misses "
+        f"({stats['entries']} entries, {stats['bytes'] / (1024 * 1024):.1f} MB)"
+    )
+
+
+def load_taxonomy(taxonomy_file: bytes | CompiledTaxonomy | None) -> CompiledTaxonomy:
+    """Compile an uploaded taxonomy JSON file, falling back to the default taxonomy.
+
+    The JSON may hold the taxonomy directly or under a top-level ``taxonomy``
+    key. Invalid or missing uploads yield the compiled default taxonomy.
+    """
+    if isinstance(taxonomy_file, CompiledTaxonomy):
+        return taxonomy_file
+    if taxonomy_file is not None:
+        try:
+            return CompiledTaxonomy.from_json(taxonomy_file)
+        except Exception:
+            # If JSON parsing fails, ignore and keep default
+            pass
+    return DEFAULT_COMPILED_TAXONOMY
+
+
+def iter_process_files(
+    files: List[str | bytes],
+    taxonomy_file: bytes | CompiledTaxonomy | None,
+    workers: int | None = None,
+    timeout: float | None = None,
+    max_pdf_pages: int | None = None,
+    cache: ContentCache | None = None,
+    stream_threshold: int | None = None,
+    cancel: threading.Event | None = None,
+    metrics: Metrics | None = None,
+    dedup: DedupIndex | None = None,
+    search_index: SearchIndex | None = None,
+    inference: MetadataModel | None = None,
+) -> Iterator[Tuple[int, dict]]:
+    """Process uploaded files, yielding ``(upload index, article)`` as each one finishes.
+
+    Cached results come first, then pool results in upload order. Setting
+    ``cancel`` stops the run at the next result: items not yet started are
+    dropped and the generator returns early. Closing the generator has the
+    same effect. See :func:`process_files` for the options.
+    """
+    uploads = [resolve_upload(uploaded_file) for uploaded_file in files]
+    taxonomy = load_taxonomy(taxonomy_file)
+    articles = _iter_articles(uploads, taxonomy, workers, timeout, max_pdf_pages, cache, stream_threshold, cancel,
+                              metrics)
+    try:
+        for idx, article in articles:
+            name = uploads[idx][0]
+            # Cached results are shared by uploads with the same content and name, so the source is added afterwards
+            article = {**article, "metadata": {**article["metadata"], SOURCE_FIELD: source_id(uploads[idx])}}
+            if inference is not None:
+                # Suggestions depend on the model, so like links they are applied after caching
+                with collecting(metrics), timed("infer", file_type(name)):
+                    article = next(suggest_metadata([article], inference, taxonomy))
+            if dedup is not None:
+                # Links depend on what else is indexed, so they are added after caching and never cached themselves
+                with collecting(metrics), timed("dedup", file_type(name)):
+                    duplicates = dedup.add(source_id(uploads[idx]), dedup.sign(article["content"]))
+                article = link_duplicates(article, duplicates)
+            if search_index is not None:
+                with collecting(metrics), timed("index", file_type(name)):
+                    search_index.add_article(article, source_id(uploads[idx]))
+            yield idx, article
+    finally:
+        articles.close()
+        if dedup is not None:
+            dedup.flush()
+        if search_index is not None:
+            search_index.flush()
+
+
+def _iter_articles(
+    uploads: List[Tuple[str, str | bytes]],
+    taxonomy_file: bytes | CompiledTaxonomy | None,
+    workers: int | None,
+    timeout: float | None,
+    max_pdf_pages: int | None,
+    cache: ContentCache | None,
+    stream_threshold: int | None,
+    cancel: threading.Event | None,
+    metrics: Metrics | None,
+) -> Iterator[Tuple[int, dict]]:
+    kind = "process"
+    if metrics is not None and metrics.profiler is not None:
+        # Profilers only see the current process, so keep all the work in it (without timeouts off the main thread)
+        kind = "serial"
+    taxonomy = load_taxonomy(taxonomy_file)
+    cache_keys: List[Tuple[str, str] | None] = [None] * len(uploads)
+    pending: List[int] = []
+    if cache is not None:
+        taxonomy_hash = taxonomy.fingerprint
+        # Staleness depends on the current date, so validation entries expire daily
+        context = utc_today().isoformat()
+        # Extraction options that change the body, part of both keys
+        options = str(max_pdf_pages or "")
+        # Uploads whose extraction is cached and only need the (cheap) validation step again
+        revalidate: List[Tuple[int, dict]] = []
+        for idx, (name, source) in enumerate(uploads):
+            ext = os.path.splitext(name)[1].lower()
+            with collecting(metrics), timed("hash", file_type(name)) as timer:
+                try:
+                    content_hash = hash_source(source)
+                except OSError:
+                    content_hash = None
+                if timer.active:
+                    timer.bytes_in = source_size(source)
+            if content_hash is None:
+                pending.append(idx)
+                continue
+            extraction_key = cache.extraction_key(content_hash, ext, options=options)
+            validation_key = cache.validation_key(content_hash, ext, os.path.basename(name), taxonomy_hash, context,
+                                                  options=options)
+            cache_keys[idx] = (extraction_key, validation_key)
+            with collecting(metrics), timed("cache_lookup", file_type(name)):
+                article = cache.get_validation(validation_key)
+                extracted = cache.get_extraction(extraction_key) if article is None else None
+            if article is not None:
+                yield idx, article
+                continue
+            if extracted is not None:
+                revalidate.append((idx, extracted))
+            else:
+                pending.append(idx)
+        documents = ((uploads[idx][0], extracted["metadata"], extracted["content"]) for idx, extracted in revalidate)
+        with collecting(metrics):
+            # Revalidation is cheap, so it is done up front to keep the timings out of the caller's code
+            revalidated = list(validate_many(documents, taxonomy))
+        for (idx, _), article in zip(revalidate, revalidated):
+            cache.put_validation(cache_keys[idx][1], article)
+            yield idx, article
+    else:
+        pending = list(range(len(uploads)))
+    if timeout is None:
+        timeout = default_timeout()
+    executor = BatchExecutor(workers=workers, timeout=timeout, kind=kind)
+    if stream_threshold is None:
+        stream_threshold = int(float(os.environ.get("KNOWLEDGE_STREAM_THRESHOLD_MB", "8")) * 1024 * 1024)
+    worker = partial(
+        process_upload,
+        taxonomy=taxonomy,
+        max_pdf_pages=max_pdf_pages,
+        stream_threshold=stream_threshold,
+        collect_metrics=metrics is not None,
+    )
+    results = executor.imap(worker, [uploads[idx] for idx in pending])
+    try:
+        for idx, result in zip(pending, results):
+            if cancel is not None and cancel.is_set():
+                return
+            name = uploads[idx][0]
+            if metrics is not None:
+                observe_result(metrics, name, uploads[idx][1], result)
+            if result.ok:
+                article = result.value["article"]
+                if cache is not None and cache_keys[idx] is not None:
+                    extraction_key, validation_key = cache_keys[idx]
+                    cache.put_extraction(extraction_key, result.value["extracted"])
+                    cache.put_validation(validation_key, article)
+            else:
+                # Keep a row for files that failed so nothing silently disappears
+                reason = "Extraction timed out" if result.timed_out else "Extraction failed"
+                article = finalize_article(infer_metadata(name, {}), "", [f"{reason}: {result.error}"])
+            yield idx, article
+    finally:
+        # Cancels queued pool work and shuts the pool down
+        results.close()
+
+
+def observe_result(metrics: Metrics, name: str, source: str | bytes, result) -> None:
+    """Merge a worker's stage timings into ``metrics`` and record the file's total time."""
+    stages = None
+    if result.ok and "metrics" in result.value:
+        worker_metrics = Metrics()
+        worker_metrics.merge(result.value["metrics"])
+        metrics.merge(result.value["metrics"])
+        stages = worker_metrics.stage_seconds()
+    metrics.observe_file(name, result.elapsed, source_size(source), stages)
+
+
+def process_files(
+    files: List[str | bytes],
+    taxonomy_file: bytes | CompiledTaxonomy | None,
+    workers: int | None = None,
+    timeout: float | None = None,
+    max_pdf_pages: int | None = None,
+    cache: ContentCache | None = None,
+    stream_threshold: int | None = None,
+    export_path: str | None = None,
+    metrics: Metrics | None = None,
+    dedup: DedupIndex | None = None,
+    chunks_path: str | None = None,
+    search_index: SearchIndex | None = None,
+    inference: MetadataModel | None = None,
+) -> Tuple[List[dict], List[dict]]:
+    """Process uploaded files and return the bundle and table data.
+
+    The bundle is a list of ``{"metadata", "content", "issues"}`` dicts, one
+    per upload; use :func:`knowledge_core.export.export_bundle` to serialize it.
+
+    This function now supports multiple file types including Markdown, text,
+    HTML, PDF and DOCX. It removes emojis/non-ASCII characters from the
+    extracted text, infers missing metadata when possible, and uses the
+    default taxonomy unless a custom taxonomy file (or an already compiled
+    taxonomy) is provided. Missing
+    required metadata fields are marked as "Unknown" and a corresponding
+    issue is recorded for transparency.
+
+    Extraction and validation are fanned out across a process pool of
+    ``workers`` processes (``KNOWLEDGE_WORKERS`` or the CPU count by default)
+    and results are returned in upload order. A file that takes longer than
+    ``timeout`` seconds (``KNOWLEDGE_FILE_TIMEOUT``) or fails to extract is
+    reported with an issue instead of stalling or aborting the batch.
+
+    Uploads that are already on disk are handed to the workers by path and
+    never read into memory up front; PDFs are streamed page by page, with
+    ``max_pdf_pages`` optionally capping how many pages are read per file.
+    Text, Markdown and HTML files larger than ``stream_threshold`` bytes
+    (``KNOWLEDGE_STREAM_THRESHOLD_MB``, 8 MB by default) are validated in
+    streaming mode, chunk by chunk.
+
+    When a ``cache`` is given, files whose content hash was seen before skip
+    extraction, and also skip validation if the taxonomy is unchanged. Only
+    the remaining files are sent to the pool.
+
+    With a :class:`~knowledge_core.inference.MetadataModel` as ``inference``,
+    taxonomy fields left missing are filled with the model's suggestions when
+    it is confident enough. Each one is recorded in ``metadata["inferred"]``
+    with its confidence and flagged with an issue asking for review.
+
+    With a :class:`~knowledge_core.dedup.DedupIndex` every body is signed and
+    indexed under its :func:`source_id`. Articles that repeat (exactly, or above the
+    index's similarity threshold) a document indexed earlier, in this batch
+    or a previous one, get a duplicate issue and ``metadata["duplicate_of"]``
+    links to those documents.
+
+    With ``export_path`` ending in ``.parquet`` or ``.arrow`` the bundle is
+    also written there in a fixed columnar schema (requires pyarrow).
+
+    With ``chunks_path`` (``.jsonl`` or ``.jsonl.gz``) every body is also split
+    into embedding-ready chunk records (see :mod:`knowledge_core.chunking`)
+    that are streamed to that file as each article finishes.
+
+    A :class:`~knowledge_core.search.SearchIndex` gets every article added
+    under its :func:`source_id`, replacing earlier versions, and is flushed at the end of
+    the run so the batch becomes searchable.
+
+    Pass a :class:`~knowledge_core.metrics.Metrics` to record per-stage wall
+    time and bytes, per-file-type counts and slow files for the run. If it
+    names a ``profiler`` the run is kept in-process and profiled as well.
+    """
+    articles: List[dict | None] = [None] * len(files)
+    with profiled(metrics), (RecordWriter(chunks_path) if chunks_path else nullcontext()) as chunk_writer:
+        for idx, article in iter_process_files(
+            files, taxonomy_file, workers, timeout, max_pdf_pages, cache, stream_threshold, metrics=metrics,
+            dedup=dedup, search_index=search_index, inference=inference,
+        ):
+            articles[idx] = article
+            if chunk_writer is not None:
+                with collecting(metrics), timed("chunk", file_type(chunks_path)):
+                    for record in bundle_chunks([article]):
+                        chunk_writer.write(record)
+    records: List[dict] = []
+    bundle: List[dict] = []
+    for article in articles:
+        records.append(build_row(article["metadata"], article["issues"]))
+        # Append to bundle for JSON export
+        bundle.append(article)
+    if export_path:
+        with collecting(metrics), timed("export", file_type(export_path)):
+            write_bundle(bundle, export_path)
+    if metrics is not None:
+        metrics.finish()
+    return bundle, records
@@ -0,0 +1,153 @@
+"""
+records.py
+
+Streaming JSONL (optionally gzip-compressed) storage for ingestion output.
+
+Records are written one JSON object per line as they are produced, so neither
+the writer nor the reader ever holds the whole dataset. Alongside the data file
+an offset index (``<path>.idx``) stores, for every record, a pair of unsigned
+64-bit integers that :func:`read_record` uses to seek straight to it:
+
+* plain JSONL: ``(line offset, 0)``
+* gzip JSONL: ``(offset of the gzip member holding the line, offset of the line
+  inside that member's decompressed data)``
+
+Gzip output is written as a series of independent members of roughly
+``GZIP_BLOCK_BYTES`` uncompressed bytes each (any gzip reader concatenates
+them transparently), so a seek only decompresses one block.
+"""
+
+import gzip
+import json
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+GZIP_SUFFIXES = (".jsonl.gz", ".ndjson.gz")
+
+GZIP_BLOCK_BYTES = 1024 * 1024
+
+_INDEX_ENTRY = struct.Struct("<QQ")
+
+
+def is_jsonl(path: str) -> bool:
+    """Return True if ``path`` names a JSONL or gzip-JSONL file."""
+    return path.endswith(JSONL_SUFFIXES + GZIP_SUFFIXES)
+
+
+def is_gzip(path: str) -> bool:
+    return path.endswith(GZIP_SUFFIXES)
+
+
+def index_path_for(path: str) -> str:
+    """Return the location of the offset index for a JSONL data file."""
+    return f"{path}.idx"
+
+
+class RecordWriter:
+    """Write records to a JSONL or gzip-JSONL file plus its offset index.
+
+    Data goes to temporary files that replace ``path`` and its index only when
+    the writer is closed without error, so readers never see a partial file.
+    Use as a context manager.
+    """
+
+    def __init__(self, path: str, block_bytes: int = GZIP_BLOCK_BYTES) -> None:
+        self.path = path
+        self.index_path = index_path_for(path)
+        self.block_bytes = block_bytes
+        self.count = 0
+        self.compressed = is_gzip(path)
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._raw: BinaryIO = open(f"{path}.tmp", "wb")
+        self._index: BinaryIO = open(f"{self.index_path}.tmp", "wb")
+        self._member: Optional[gzip.GzipFile] = None
+        self._member_start = 0
+        self._member_bytes = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one record; non-JSON values such as dates are written as strings."""
+        line = (json.dumps(record, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+        if not self.compressed:
+            self._index.write(_INDEX_ENTRY.pack(self._raw.tell(), 0))
+            self._raw.write(line)
+        else:
+            if self._member is None or self._member_bytes >= self.block_bytes:
+                self._start_member()
+            self._index.write(_INDEX_ENTRY.pack(self._member_start, self._member_bytes))
+            self._member.write(line)
+            self._member_bytes += len(line)
+        self.count += 1
+
+    def _start_member(self) -> None:
+        self._close_member()
+        self._member_start = self._raw.tell()
+        self._member_bytes = 0
+        self._member = gzip.GzipFile(fileobj=self._raw, mode="wb", mtime=0)
+
+    def _close_member(self) -> None:
+        if self._member is not None:
+            # Closing a GzipFile built on fileobj finishes the member but keeps the file open
+            self._member.close()
+            self._member = None
+
+    def close(self, commit: bool = True) -> None:
+        self._close_member()
+        self._raw.close()
+        self._index.close()
+        if commit:
+            os.replace(f"{self.path}.tmp", self.path)
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+        else:
+            os.remove(f"{self.path}.tmp")
+            os.remove(f"{self.index_path}.tmp")
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a JSONL, gzip-JSONL or JSON-array file in order.
+
+    JSONL files are read line by line in constant memory. A plain ``.json``
+    array (the legacy export format) has to be loaded whole.
+    """
+    if not is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    opener = gzip.open if is_gzip(path) else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def count_records(path: str) -> int:
+    """Return the number of records in a JSONL file, using its index."""
+    return os.path.getsize(index_path_for(path)) // _INDEX_ENTRY.size
+
+
+def read_record(path: str, n: int) -> Dict[str, Any]:
+    """Return record ``n`` (0-based) of a JSONL file by seeking via its index."""
+    if n < 0:
+        raise IndexError(f"record {n} out of range for {path}")
+    with open(index_path_for(path), "rb") as index:
+        index.seek(n * _INDEX_ENTRY.size)
+        entry = index.read(_INDEX_ENTRY.size)
+    if len(entry) != _INDEX_ENTRY.size:
+        raise IndexError(f"record {n} out of range for {path}")
+    offset, inner = _INDEX_ENTRY.unpack(entry)
+    with open(path, "rb") as raw:
+        raw.seek(offset)
+        if not is_gzip(path):
+            return json.loads(raw.readline())
+        with gzip.GzipFile(fileobj=raw, mode="rb") as member:
+            member.seek(inner)
+            return json.loads(member.readline())
@@ -0,0 +1,571 @@
+"""
+search.py
+
+Embedded BM25 search over validated articles.
+
+A :class:`SearchIndex` is a directory of immutable segments plus an
+``index.json`` manifest. Each segment stores compact arrays as ``.npy`` files
+that are memory-mapped on load:
+
+* ``terms.npy``: the sorted 64-bit hashes of the segment's terms
+* ``offsets.npy``: where each term's postings start
+* ``postings.npy`` / ``tfs.npy``: document numbers and term frequencies
+* ``lengths.npy`` / ``fields.npy``: document lengths and taxonomy field codes
+
+The stored fields shown with a hit (title, taxonomy fields, a snippet) are
+kept as JSONL with an offset index (see :mod:`knowledge_core.records`) and read
+only for the hits returned. Added documents are buffered and written as a new
+segment on :meth:`SearchIndex.flush`. Replacing or removing a document marks it
+deleted in its old segment, and small segments are merged as they pile up. A
+query costs one binary search per term and segment, plus vectorized BM25
+scoring of the matching postings only, so it stays fast however many articles
+are indexed.
+
+NumPy is imported when an index is opened.
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from knowledge_core.records import RecordWriter, iter_records, read_record
+from knowledge_core.validation import article_id
+
+# Bound by _require_numpy() when an index is opened
+np = None
+
+# Taxonomy fields a search can be filtered by, in the column order of fields.npy
+FILTER_FIELDS = ("domain", "subdomain", "audience", "status")
+# Bump whenever the on-disk layout changes so older indexes are rebuilt
+SEARCH_VERSION = "1"
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Documents buffered before they are written out as a segment; also the size below which segments get merged
+SEGMENT_DOCS = 20000
+# Small segments tolerated before they are merged
+MAX_SMALL_SEGMENTS = 8
+SNIPPET_CHARS = 200
+# Characters of a term that feed its hash; longer terms are hashed by their prefix
+_TERM_CHARS = 32
+_TOKEN = re.compile(r"\w+")
+
+
+def _require_numpy() -> None:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError as exc:
+            raise RuntimeError("Search needs numpy; install it with `pip install numpy`") from exc
+        np = numpy
+
+
+def default_search_path() -> str:
+    """Return the index location from ``KNOWLEDGE_SEARCH_PATH``, next to the content cache by default.
+
+    An empty ``KNOWLEDGE_SEARCH_PATH`` disables indexing and yields ``""``.
+    """
+    env = os.environ.get("KNOWLEDGE_SEARCH_PATH")
+    if env is not None:
+        return env
+    return os.path.join(os.path.expanduser("~"), ".cache", "knowledge-ai", "search")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def _term_hashes(words: List[str]) -> "np.ndarray":
+    # Polynomial hash over the UTF-32 code points of each term, one column at a time
+    codes = np.array(words, dtype=f"U{_TERM_CHARS}")
+    codes = codes.view(np.uint32).reshape(len(words), -1).astype(np.uint64)
+    hashes = np.full(len(words), 14695981039346656037, dtype=np.uint64)
+    for column in range(codes.shape[1]):
+        hashes = hashes * np.uint64(1099511628211) + codes[:, column]
+    return hashes
+
+
+@dataclass
+class DocTerms:
+    """Term statistics of one document: unique term hashes, their counts and the length."""
+
+    hashes: "np.ndarray"
+    counts: "np.ndarray"
+    length: int
+    snippet: str = ""
+
+
+class TermCounter:
+    """Count the terms of a body that arrives in chunks.
+
+    Call :meth:`update` with each chunk (or pass the chunks through
+    :meth:`feed`), then :meth:`terms`. The first characters of the body are
+    kept as the document's snippet.
+    """
+
+    def __init__(self) -> None:
+        _require_numpy()
+        self._carry = ""
+        self._hashes: List["np.ndarray"] = []
+        self._counts: List["np.ndarray"] = []
+        self._length = 0
+        self._snippet = ""
+
+    def update(self, text: str, final: bool = False) -> None:
+        """Add the next chunk of the body; ``final`` marks the last one."""
+        if len(self._snippet) < SNIPPET_CHARS:
+            self._snippet = " ".join((self._snippet + " " + text[:SNIPPET_CHARS * 2]).split())[:SNIPPET_CHARS]
+        text = self._carry + text
+        words = tokenize(text)
+        # A word touching the end of the chunk may continue in the next one
+        self._carry = words.pop() if words and not final and _TOKEN.match(text[-1:]) else ""
+        self._count(words)
+
+    def add_field(self, text: str) -> None:
+        """Count the terms of a short field such as the title, leaving the snippet alone."""
+        self._count(tokenize(text))
+
+    def _count(self, words: List[str]) -> None:
+        if words:
+            hashes, counts = np.unique(_term_hashes(words), return_counts=True)
+            self._hashes.append(hashes)
+            self._counts.append(counts)
+            self._length += len(words)
+
+    def feed(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield ``chunks`` unchanged while counting their terms."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def terms(self) -> DocTerms:
+        """Return the statistics of everything added so far."""
+        if self._carry:
+            self.update("", final=True)
+        if not self._hashes:
+            return DocTerms(np.empty(0, np.uint64), np.empty(0, np.uint32), 0, self._snippet)
+        if len(self._hashes) == 1:
+            hashes, counts = self._hashes[0], self._counts[0]
+        else:
+            hashes, inverse = np.unique(np.concatenate(self._hashes), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate(self._counts), minlength=len(hashes))
+        return DocTerms(hashes, counts.astype(np.uint32), self._length, self._snippet)
+
+
+def count_terms(text: str) -> DocTerms:
+    """Return the term statistics of a whole body."""
+    counter = TermCounter()
+    counter.update(text, final=True)
+    return counter.terms()
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One search result: the document ID, its BM25 score and its stored fields."""
+
+    id: str
+    score: float
+    title: str
+    snippet: str
+    fields: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "score": round(self.score, 4), "title": self.title, **self.fields,
+                "snippet": self.snippet}
+
+
+class _Segment:
+    """One immutable segment on disk; only its deletion flags change."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.name = os.path.basename(directory)
+
+        def load(name: str) -> "np.ndarray":
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        self.terms = load("terms")
+        self.offsets = load("offsets")
+        self.postings = load("postings")
+        self.tfs = load("tfs")
+        self.lengths = load("lengths")
+        self.fields = load("fields")
+        self.deleted = np.array(load("deleted"))
+        self.dirty = False
+
+    @property
+    def size(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def live(self) -> int:
+        return self.size - int(self.deleted.sum())
+
+    def ids(self) -> List[str]:
+        with open(os.path.join(self.directory, "ids.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def document(self, local: int) -> Dict[str, Any]:
+        return read_record(os.path.join(self.directory, "docs.jsonl"), local)
+
+    def documents(self) -> Iterator[Dict[str, Any]]:
+        return iter_records(os.path.join(self.directory, "docs.jsonl"))
+
+    def save_deleted(self) -> None:
+        if self.dirty:
+            np.save(os.path.join(self.directory, "deleted.npy"), self.deleted)
+            self.dirty = False
+
+
+class SearchIndex:
+    """Persistent BM25 index of articles, filterable by taxonomy fields.
+
+    ``path`` is a directory, created if needed. Documents passed to
+    :meth:`add` (or :meth:`add_article`) are searchable once :meth:`flush`
+    writes them out; adding an ID again replaces the earlier version. The
+    index is safe to share between threads of one process.
+    """
+
+    def __init__(self, path: str) -> None:
+        _require_numpy()
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+        self._segments = [_Segment(os.path.join(path, name)) for name in self._manifest["segments"]]
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self._manifest["fields"].items()}
+        self._pending: Dict[str, Tuple[Dict[str, Any], DocTerms]] = {}
+        # Document ID -> (segment, local number), built on the first update
+        self._locations: Optional[Dict[str, Tuple[_Segment, int]]] = None
+        self._refresh_stats()
+
+    # Manifest ---------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, "index.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == SEARCH_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        # Missing, unreadable or from another version: start over
+        for name in os.listdir(self.path):
+            if name.startswith("seg"):
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        return {"version": SEARCH_VERSION, "next_segment": 0, "segments": [],
+                "fields": {name: [] for name in FILTER_FIELDS}}
+
+    def _save_manifest(self) -> None:
+        self._manifest["segments"] = [segment.name for segment in self._segments]
+        target = os.path.join(self.path, "index.json")
+        with open(f"{target}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f)
+        os.replace(f"{target}.tmp", target)
+
+    def _code(self, name: str, value: Any) -> int:
+        if value is None or value == "" or value == "Unknown":
+            return -1
+        value = str(value)
+        codes = self._codes[name]
+        if value not in codes:
+            codes[value] = len(codes)
+            self._manifest["fields"][name].append(value)
+        return codes[value]
+
+    def values(self, name: str) -> List[str]:
+        """Return the values of filter field ``name`` seen so far, sorted."""
+        with self._lock:
+            return sorted(self._manifest["fields"].get(name, []))
+
+    # Updates ----------------------------------------------------------------
+
+    def add(self, doc_id: str, fields: Dict[str, Any], terms: DocTerms) -> None:
+        """Queue a document for the next segment, replacing any earlier version.
+
+        ``fields`` supplies the title and the taxonomy fields in
+        :data:`FILTER_FIELDS`; other keys are ignored.
+        """
+        stored = {"id": doc_id, "title": str(fields.get("title") or doc_id), "snippet": terms.snippet}
+        for name in FILTER_FIELDS:
+            value = fields.get(name)
+            stored[name] = None if value is None else str(value)
+        with self._lock:
+            self._delete(doc_id)
+            self._pending[doc_id] = (stored, terms)
+            if len(self._pending) >= SEGMENT_DOCS:
+                self._flush()
+
+    def add_article(self, article: dict, doc_id: Optional[str] = None) -> None:
+        """Index an app bundle entry (title and body) under ``doc_id``.
+
+        ``doc_id`` defaults to :func:`~knowledge_core.validation.article_id`,
+        the entry's source file; titles alone would let same-titled articles
+        replace each other.
+        """
+        meta = article.get("metadata") or {}
+        content = article.get("content") or ""
+        counter = TermCounter()
+        counter.add_field(str(meta.get("title") or ""))
+        counter.update(content, final=True)
+        self.add(doc_id or article_id(article), meta, counter.terms())
+
+    def add_bundle(self, bundle: Iterable[dict]) -> int:
+        """Index every entry of a bundle and flush; returns the number of entries."""
+        count = 0
+        for article in bundle:
+            self.add_article(article)
+            count += 1
+        self.flush()
+        return count
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index; unknown IDs are ignored."""
+        with self._lock:
+            self._delete(doc_id)
+
+    def flush(self) -> None:
+        """Write queued documents out as a segment so they become searchable."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """Flush queued documents; the index stays usable."""
+        self.flush()
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return doc_id in self._pending or doc_id in self._location_map()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._documents + len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of searchable and queued documents, segments and the average length."""
+        with self._lock:
+            return {"documents": self._documents, "pending": len(self._pending), "segments": len(self._segments),
+                    "avg_length": round(self._avg_length, 1)}
+
+    def _location_map(self) -> Dict[str, Tuple[_Segment, int]]:
+        if self._locations is None:
+            self._locations = {}
+            for segment in self._segments:
+                for local, doc_id in enumerate(segment.ids()):
+                    if not segment.deleted[local]:
+                        self._locations[doc_id] = (segment, local)
+        return self._locations
+
+    def _delete(self, doc_id: str) -> None:
+        self._pending.pop(doc_id, None)
+        location = self._location_map().pop(doc_id, None)
+        if location is not None:
+            segment, local = location
+            segment.deleted[local] = True
+            segment.dirty = True
+            self._documents -= 1
+
+    def _flush(self) -> None:
+        if self._pending:
+            ids = list(self._pending)
+            stored = [self._pending[doc_id][0] for doc_id in ids]
+            terms = [self._pending[doc_id][1] for doc_id in ids]
+            counts = np.array([len(entry.hashes) for entry in terms], dtype=np.int64)
+            fields = np.array([[self._code(name, doc[name]) for name in FILTER_FIELDS] for doc in stored],
+                              dtype=np.int32).reshape(len(ids), len(FILTER_FIELDS))
+            segment = self._write_segment(
+                np.concatenate([entry.hashes for entry in terms]),
+                np.repeat(np.arange(len(ids), dtype=np.int32), counts),
+                np.concatenate([entry.counts for entry in terms]),
+                np.array([entry.length for entry in terms], dtype=np.uint32),
+                fields,
+                ids,
+                stored,
+            )
+            self._pending = {}
+        elif not any(segment.dirty for segment in self._segments):
+            return
+        for segment in self._segments:
+            segment.save_deleted()
+        self._merge_small_segments()
+        self._save_manifest()
+        self._refresh_stats()
+
+    def _write_segment(self, hashes, postings, tfs, lengths, fields, ids: List[str],
+                       stored: Iterable[Dict[str, Any]]) -> _Segment:
+        name = f"seg{self._manifest['next_segment']:06d}"
+        self._manifest["next_segment"] += 1
+        directory = os.path.join(self.path, name)
+        os.makedirs(directory, exist_ok=True)
+        # Postings sorted by term, then document
+        order = np.lexsort((postings, hashes))
+        hashes, postings, tfs = hashes[order], postings[order], tfs[order]
+        terms, starts = np.unique(hashes, return_index=True)
+        arrays = {
+            "terms": terms,
+            "offsets": np.append(starts, len(hashes)).astype(np.int64),
+            "postings": postings.astype(np.int32),
+            "tfs": np.minimum(tfs, np.iinfo(np.uint16).max).astype(np.uint16),
+            "lengths": lengths,
+            "fields": fields,
+            "deleted": np.zeros(len(ids), dtype=bool),
+        }
+        for array_name, array in arrays.items():
+            np.save(os.path.join(directory, f"{array_name}.npy"), array)
+        with RecordWriter(os.path.join(directory, "docs.jsonl")) as writer:
+            for doc in stored:
+                writer.write(doc)
+        with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+        segment = _Segment(directory)
+        self._segments.append(segment)
+        if self._locations is not None:
+            for local, doc_id in enumerate(ids):
+                self._locations[doc_id] = (segment, local)
+        return segment
+
+    def _merge_small_segments(self) -> None:
+        # Merge the smallest segments (by live documents) into one of at most SEGMENT_DOCS documents
+        small = sorted((segment for segment in self._segments if segment.live < SEGMENT_DOCS),
+                       key=lambda segment: segment.live)
+        if len(small) <= MAX_SMALL_SEGMENTS:
+            return
+        chosen: List[_Segment] = []
+        total = 0
+        for segment in small:
+            if chosen and total + segment.live > SEGMENT_DOCS:
+                break
+            chosen.append(segment)
+            total += segment.live
+        if len(chosen) < 2:
+            return
+        parts, lengths, fields, ids, stored = [], [], [], [], []
+        base = 0
+        for segment in chosen:
+            live = ~segment.deleted
+            renumber = np.cumsum(live, dtype=np.int64) - 1 + base
+            keep = live[segment.postings]
+            term_of_posting = np.repeat(segment.terms, np.diff(segment.offsets))
+            parts.append((term_of_posting[keep], renumber[segment.postings[keep]], segment.tfs[keep]))
+            lengths.append(segment.lengths[live])
+            fields.append(segment.fields[live])
+            segment_ids = segment.ids()
+            ids.extend(doc_id for local, doc_id in enumerate(segment_ids) if live[local])
+            stored.extend(doc for local, doc in enumerate(segment.documents()) if live[local])
+            base += int(live.sum())
+        self._segments = [segment for segment in self._segments if segment not in chosen]
+        self._write_segment(
+            np.concatenate([part[0] for part in parts]),
+            np.concatenate([part[1] for part in parts]),
+            np.concatenate([part[2] for part in parts]),
+            np.concatenate(lengths),
+            np.concatenate(fields),
+            ids,
+            stored,
+        )
+        if self._locations is not None:
+            self._locations = None
+        self._save_manifest()
+        for segment in chosen:
+            shutil.rmtree(segment.directory, ignore_errors=True)
+
+    def _refresh_stats(self) -> None:
+        self._documents = sum(segment.live for segment in self._segments)
+        total = sum(int(segment.lengths[~segment.deleted].sum(dtype=np.int64)) for segment in self._segments)
+        self._avg_length = total / self._documents if self._documents else 0.0
+
+    # Queries ----------------------------------------------------------------
+
+    def search(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchHit]:
+        """Return the ``k`` best BM25 matches for ``query``, best first.
+
+        ``filters`` maps fields in :data:`FILTER_FIELDS` to a value or a list of
+        accepted values. Only flushed documents are searched.
+        """
+        words = tokenize(query)
+        if not words or k <= 0:
+            return []
+        hashes = np.unique(_term_hashes(words))
+        with self._lock:
+            if not self._documents:
+                return []
+            allowed = self._filter_codes(filters or {})
+            if allowed is None:
+                return []
+            lookups = []
+            frequencies = np.zeros(len(hashes), dtype=np.int64)
+            for segment in self._segments:
+                positions = np.searchsorted(segment.terms, hashes)
+                found = positions < len(segment.terms)
+                found[found] = segment.terms[positions[found]] == hashes[found]
+                starts = np.where(found, segment.offsets[np.minimum(positions, len(segment.terms))], 0)
+                ends = np.where(found, segment.offsets[np.minimum(positions + 1, len(segment.terms))], 0)
+                counts = ends - starts
+                if segment.live < segment.size:
+                    # Deleted documents keep their postings until the segment is merged; count live ones only
+                    for term in np.flatnonzero(counts):
+                        postings = segment.postings[starts[term]:ends[term]]
+                        counts[term] = np.count_nonzero(~segment.deleted[postings])
+                frequencies += counts
+                lookups.append((segment, starts, ends))
+            documents = self._documents
+            idf = np.maximum(np.log1p((documents - frequencies + 0.5) / (frequencies + 0.5)), 0.0)
+            candidates = []
+            for segment, starts, ends in lookups:
+                candidates.extend(self._score(segment, starts, ends, idf, allowed, k))
+            candidates.sort(key=lambda candidate: -candidate[0])
+            hits = []
+            for score, segment, local in candidates[:k]:
+                doc = segment.document(local)
+                hits.append(SearchHit(doc["id"], score, doc["title"], doc.get("snippet", ""),
+                                      {name: doc.get(name) for name in FILTER_FIELDS}))
+            return hits
+
+    def _filter_codes(self, filters: Dict[str, Any]) -> Optional[Dict[int, List[int]]]:
+        # Column -> accepted codes, or None when a filter matches no indexed value
+        allowed = {}
+        for name, accepted in filters.items():
+            if accepted in (None, "", [], ()):
+                continue
+            if name not in FILTER_FIELDS:
+                raise ValueError(f"Cannot filter on {name!r}; use one of {', '.join(FILTER_FIELDS)}")
+            values = [accepted] if isinstance(accepted, str) else list(accepted)
+            codes = [self._codes[name][value] for value in values if value in self._codes[name]]
+            if not codes:
+                return None
+            allowed[FILTER_FIELDS.index(name)] = codes
+        return allowed
+
+    def _score(self, segment: _Segment, starts, ends, idf, allowed: Dict[int, List[int]],
+               k: int) -> List[Tuple[float, _Segment, int]]:
+        scores = None
+        for term in np.flatnonzero(ends > starts):
+            docs = segment.postings[starts[term]:ends[term]]
+            tf = segment.tfs[starts[term]:ends[term]].astype(np.float32)
+            norm = K1 * (1 - B + B * segment.lengths[docs].astype(np.float32) / self._avg_length)
+            if scores is None:
+                scores = np.zeros(segment.size, dtype=np.float32)
+            scores[docs] += np.float32(idf[term]) * tf * (K1 + 1) / (tf + norm)
+        if scores is None:
+            return []
+        matched = np.flatnonzero(scores)
+        keep = ~segment.deleted[matched]
+        for column, codes in allowed.items():
+            keep &= np.isin(segment.fields[matched, column], codes)
+        matched = matched[keep]
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        return [(float(scores[local]), segment, int(local)) for local in matched]
+
+
+def format_hits(hits: List[SearchHit]) -> List[list]:
+    """Return hits as table rows: score, title, taxonomy fields and snippet."""
+    return [[round(hit.score, 3), hit.title] + [hit.fields.get(name) or "" for name in FILTER_FIELDS] + [hit.snippet]
+            for hit in hits]
@@ -0,0 +1,149 @@
+"""
+streaming.py
+
+Chunked, bounded-memory building blocks for validating very large documents.
+
+Text is decoded incrementally in fixed-size chunks, front matter is parsed
+from the head of the stream only, and the body is scanned for PII in
+overlapping windows so patterns spanning a chunk boundary are still found.
+Memory stays proportional to the chunk size rather than the document size.
+"""
+
+import codecs
+import io
+import itertools
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from knowledge_core.pii import PIIFinding, PIIScanner, PIIScanResult
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Must exceed the longest PII match (and the email look-back) for boundary matches
+DEFAULT_OVERLAP = 1024
+# Front matter larger than this is treated as absent
+MAX_FRONT_MATTER_CHARS = 64 * 1024
+
+
+def iter_text_chunks(source: str | bytes | BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded UTF-8 text from a path, bytes or binary file in chunks.
+
+    Multi-byte characters split across chunk boundaries are decoded correctly;
+    undecodable bytes are dropped, matching the non-streaming upload path.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter_text_chunks(f, chunk_size)
+        return
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    for block in iter(lambda: source.read(chunk_size), b""):
+        text = decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def split_front_matter_stream(
+    chunks: Iterable[str], max_chars: int = MAX_FRONT_MATTER_CHARS, delimiter: str = "---"
+) -> Tuple[Optional[str], Iterator[str]]:
+    """Split a chunk stream into its front matter text and the body chunks.
+
+    Only the head of the stream is buffered: chunks are read until the closing
+    ``delimiter`` is found or ``max_chars`` is exceeded. Returns ``None`` for
+    the front matter when the stream does not start with a ``---`` block.
+    Leading whitespace of the body is stripped, as in ``parse_front_matter``.
+    """
+    chunks = iter(chunks)
+    head = ""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= 3 and not head.startswith("---"):
+            return None, itertools.chain([head], chunks)
+        end = head.find(delimiter, 3)
+        if end != -1:
+            body_start = head[end + len(delimiter):].lstrip()
+            return head[3:end], _lstrip_chunks(itertools.chain([body_start], chunks))
+        if len(head) > max_chars:
+            break
+    return None, itertools.chain([head], chunks)
+
+
+def _lstrip_chunks(chunks: Iterator[str]) -> Iterator[str]:
+    # Skip leading whitespace even when it spans several chunks
+    for chunk in chunks:
+        stripped = chunk.lstrip()
+        if stripped:
+            yield stripped
+            yield from chunks
+            return
+
+
+def scan_stream(
+    chunks: Iterable[str], scanner: PIIScanner, overlap: int = DEFAULT_OVERLAP
+) -> PIIScanResult:
+    """Scan a stream of text chunks for PII in overlapping windows.
+
+    Each window is the previous window's tail plus the next chunk. Findings
+    are only accepted once at least ``overlap`` characters follow them (or the
+    stream has ended), so a match cut by a chunk boundary is found whole in
+    the next window, and the retained left context keeps word boundaries and
+    look-behinds correct. Offsets are absolute positions in the stream.
+    Per-type limits apply across the whole stream, and scanning stops early
+    (while still draining ``chunks``) once every detector is saturated.
+    """
+    counts: Dict[str, int] = {d.kind: 0 for d in scanner.detectors}
+    findings: List[PIIFinding] = []
+    limit = scanner.max_per_type
+
+    def remaining() -> Dict[str, Optional[int]]:
+        return {kind: None if limit is None else limit - count for kind, count in counts.items()}
+
+    def done() -> bool:
+        return limit is not None and all(count >= limit for count in counts.values())
+
+    window = ""
+    # Absolute offset of window[0], and the window index where unscanned text starts
+    window_offset = 0
+    scan_from = 0
+    pending = iter(chunks)
+    exhausted = False
+    while not exhausted:
+        chunk = next(pending, None)
+        if chunk is None:
+            exhausted = True
+        elif done():
+            # Nothing left to find; just drain the stream
+            continue
+        else:
+            window += chunk
+            if len(window) - scan_from < 2 * overlap:
+                continue
+        if done():
+            break
+        accept_before = len(window) if exhausted else len(window) - overlap
+        resume = accept_before
+        for finding, match_start in scanner.iter_findings(window, start=scan_from, remaining=remaining()):
+            if match_start >= accept_before:
+                # Rescanned whole in the next window, with enough text after it
+                break
+            counts[finding.kind] += 1
+            findings.append(PIIFinding(finding.kind, finding.start + window_offset, finding.end + window_offset))
+            # A match straddling the boundary is complete; resume after it
+            resume = max(resume, finding.end)
+        # Keep `overlap` chars of left context before the resume point
+        keep_from = max(0, accept_before - overlap)
+        window_offset += keep_from
+        window = window[keep_from:]
+        scan_from = resume - keep_from
+    saturated = frozenset(kind for kind, count in counts.items() if limit is not None and count >= limit)
+    return PIIScanResult(findings=findings, counts=counts, truncated=saturated)
+
+
+def tee_chunks(chunks: Iterable[str], sink: List[str]) -> Iterator[str]:
+    """Yield chunks unchanged while appending each one to ``sink``."""
+    for chunk in chunks:
+        sink.append(chunk)
+        yield chunk
+
@@ -0,0 +1,157 @@
+"""
+taxonomy.py
+
+Compiled, read-only view of a taxonomy definition.
+
+A taxonomy arrives as a plain mapping (the app's default, an uploaded JSON file
+or ``taxonomy.yaml``), optionally wrapped in a top-level ``taxonomy`` key.
+:class:`CompiledTaxonomy` turns it into frozenset/dict indexes once, so
+membership checks during validation are O(1), precomputes case-folded variants
+for "did you mean" suggestions, and exposes a stable fingerprint for cache keys.
+"""
+
+import difflib
+import hashlib
+import json
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+# Taxonomy fields that hold a flat list of allowed values
+FLAT_FIELDS = ("domain", "audience", "format", "status")
+# Rejected values whose suggestion is remembered; the oldest are dropped first
+MAX_SUGGESTIONS = 4096
+
+
+def _normalize(value: Any) -> str:
+    """Case-fold a value and unify separators for fuzzy matching."""
+    return " ".join(str(value).casefold().replace("_", " ").replace("-", " ").split())
+
+
+def taxonomy_fingerprint(taxonomy: dict) -> str:
+    """Return a stable hash of a taxonomy mapping, independent of key and value order."""
+    return compile_taxonomy(taxonomy).fingerprint
+
+
+class CompiledTaxonomy:
+    """Taxonomy indexes built once and shared by every validation call.
+
+    ``options`` keeps each field's values in their declared order (for
+    messages and dropdowns) while ``values`` and ``subdomains`` hold the
+    frozensets used for membership checks.
+    """
+
+    def __init__(self, mapping: dict) -> None:
+        if isinstance(mapping, dict) and isinstance(mapping.get("taxonomy"), dict):
+            mapping = mapping["taxonomy"]
+        if not isinstance(mapping, dict):
+            raise ValueError("Taxonomy must be a mapping of field names to allowed values")
+        self.source: dict = mapping
+        self.options: Dict[str, Tuple[str, ...]] = {}
+        self.values: Dict[str, FrozenSet[str]] = {}
+        for field in FLAT_FIELDS:
+            raw = mapping.get(field)
+            if raw:
+                self.options[field] = tuple(raw)
+                self.values[field] = frozenset(raw)
+        self.subdomain_options: Dict[str, Tuple[str, ...]] = {
+            domain: tuple(subs or ()) for domain, subs in (mapping.get("subdomain") or {}).items()
+        }
+        self.subdomains: Dict[str, FrozenSet[str]] = {
+            domain: frozenset(subs) for domain, subs in self.subdomain_options.items()
+        }
+        # Normalized value -> canonical value, per field and per domain's subdomains
+        self._folded: Dict[str, Dict[str, str]] = {
+            field: {_normalize(v): v for v in reversed(opts)} for field, opts in self.options.items()
+        }
+        for domain, subs in self.subdomain_options.items():
+            self._folded[f"subdomain:{domain}"] = {_normalize(v): v for v in reversed(subs)}
+        self._suggestions: Dict[Tuple[str, str], Optional[str]] = {}
+        canonical = {field: sorted(map(str, vals)) for field, vals in self.values.items()}
+        canonical["subdomain"] = {d: sorted(map(str, subs)) for d, subs in self.subdomains.items()}
+        self.fingerprint: str = hashlib.sha256(
+            json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> "CompiledTaxonomy":
+        """Compile a taxonomy from JSON text or bytes (e.g. an uploaded file)."""
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return cls(json.loads(data))
+
+    @classmethod
+    def from_yaml_file(cls, path: str) -> "CompiledTaxonomy":
+        """Compile a taxonomy from a YAML file such as ``taxonomy.yaml``."""
+        import yaml
+
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(yaml.safe_load(f) or {})
+
+    def allows(self, field: str, value: Any) -> bool:
+        """Return True if ``value`` is one of the allowed values for ``field``."""
+        try:
+            return value in self.values.get(field, ())
+        except TypeError:
+            # Unhashable values (e.g. a YAML list) can never match
+            return False
+
+    def allowed_subdomains(self, domain: Any) -> Optional[FrozenSet[str]]:
+        """Return the subdomains defined for ``domain``, or None if unrestricted."""
+        try:
+            return self.subdomains.get(domain)
+        except TypeError:
+            return None
+
+    def allows_subdomain(self, domain: Any, subdomain: Any) -> bool:
+        """Return True if ``subdomain`` is allowed for ``domain``; domains without subdomains allow any."""
+        allowed = self.allowed_subdomains(domain)
+        if not allowed:
+            return True
+        try:
+            return subdomain in allowed
+        except TypeError:
+            # Unhashable values (e.g. a YAML list) can never match
+            return False
+
+    def suggest(self, field: str, value: Any, domain: Any = None) -> Optional[str]:
+        """Suggest the closest allowed value for a rejected ``value``.
+
+        Case and separator differences are resolved by an exact lookup on the
+        precomputed normalized values; otherwise the closest fuzzy match is
+        returned if it is similar enough. The latest :data:`MAX_SUGGESTIONS`
+        results are memoized, so arbitrary input cannot grow the cache.
+        """
+        key = f"subdomain:{domain}" if field == "subdomain" else field
+        folded = self._folded.get(key)
+        if not folded:
+            return None
+        normalized = _normalize(value)
+        memo_key = (key, normalized)
+        try:
+            return self._suggestions[memo_key]
+        except KeyError:
+            pass
+        match = folded.get(normalized)
+        if match is None:
+            close = difflib.get_close_matches(normalized, folded.keys(), n=1, cutoff=0.75)
+            match = folded[close[0]] if close else None
+        if len(self._suggestions) >= MAX_SUGGESTIONS:
+            # Dicts keep insertion order, so the first key is the oldest; another thread may have dropped it
+            self._suggestions.pop(next(iter(self._suggestions), None), None)
+        self._suggestions[memo_key] = match
+        return match
+
+    def hint(self, field: str, value: Any, domain: Any = None) -> str:
+        """Return a " (did you mean '...'?)" suffix for an issue message, or ""."""
+        suggestion = self.suggest(field, value, domain)
+        return f" (did you mean '{suggestion}'?)" if suggestion else ""
+
+    def to_dict(self) -> dict:
+        """Return the plain taxonomy mapping this index was compiled from."""
+        return self.source
+
+
+def compile_taxonomy(taxonomy: "dict | CompiledTaxonomy") -> CompiledTaxonomy:
+    """Return a :class:`CompiledTaxonomy` for a mapping or an already-compiled taxonomy."""
+    if isinstance(taxonomy, CompiledTaxonomy):
+        return taxonomy
+    return CompiledTaxonomy(taxonomy)
@@ -0,0 +1,298 @@
+"""
+validation.py
+
+Metadata and content validation for knowledge articles, independent of any UI.
+
+:func:`validate_many` is the batch entry point used by the Gradio app and the
+ingestion script alike: it takes ``(name, metadata, body)`` documents and yields
+one bundle entry (``{"metadata", "content", "issues"}``) per document, in input
+order. Bodies may be whole strings or chunk iterables, which are scanned for
+PII in bounded memory.
+"""
+
+import os
+from collections import deque
+from datetime import date
+from functools import partial
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+from knowledge_core.executor import BatchExecutor
+from knowledge_core.freshness import DEFAULT_STALE_DAYS, parse_date, utc_today
+from knowledge_core.metrics import file_type, timed
+from knowledge_core.pii import DEFAULT_SCANNER
+from knowledge_core.streaming import scan_stream, tee_chunks
+from knowledge_core.taxonomy import CompiledTaxonomy, compile_taxonomy
+
+# Default taxonomy schema used if none is provided by the user
+DEFAULT_TAXONOMY = {
+    "domain": [
+        "product",
+        "customer-support",
+        "marketing",
+        "engineering",
+        "operations",
+    ],
+    "subdomain": {
+        "product": ["features", "pricing", "release-notes"],
+        "customer-support": ["troubleshooting", "faq", "how-to"],
+        "marketing": ["positioning", "competitive-analysis"],
+        "engineering": ["architecture", "runbooks", "postmortems"],
+        "operations": ["policies", "procedures"],
+    },
+    "audience": ["customer", "internal", "partner"],
+    "format": ["article", "faq", "how-to", "runbook", "policy"],
+    "status": ["draft", "reviewed", "published", "deprecated"],
+}
+
+DEFAULT_COMPILED_TAXONOMY = CompiledTaxonomy(DEFAULT_TAXONOMY)
+
+# Required fields for front matter
+REQUIRED_FIELDS = [
+    "title",
+    "domain",
+    "subdomain",
+    "audience",
+    "format",
+    "status",
+    "last_updated",
+]
+
+# Metadata key naming the file a bundle entry was built from
+SOURCE_FIELD = "source_file"
+
+# Documents handed to a worker per task when validate_many runs in parallel
+VALIDATE_BATCH_SIZE = 256
+
+# A document to validate: its name (path or file name), metadata, and body as a
+# string, an iterable of text chunks, or None to skip body checks
+Document = Tuple[str, dict, "str | Iterable[str] | None"]
+
+
+def validate_article(
+    meta: dict,
+    body: str,
+    taxonomy: dict | CompiledTaxonomy,
+    stale_days: int | None = DEFAULT_STALE_DAYS,
+    reference: date | None = None,
+) -> List[str]:
+    """Validate a single article's metadata and body.
+
+    ``taxonomy`` may be a plain mapping, but callers validating many articles
+    should pass a :class:`CompiledTaxonomy` so it is only indexed once.
+    Returns a list of issue strings. An empty list means the article passed validation.
+    """
+    return validate_metadata(meta, taxonomy, stale_days, reference) + validate_body(body)
+
+
+# Messages produced by validate_body; edits to metadata never change these
+BODY_ISSUES = frozenset(detector.message for detector in DEFAULT_SCANNER.detectors)
+# Prefixes of the messages produced by validate_metadata
+METADATA_ISSUE_PREFIXES = ("Missing required field: ", "Invalid ", "Article is stale ")
+
+
+def is_metadata_issue(issue: str) -> bool:
+    """Return True for issues produced by :func:`validate_metadata`, the only ones metadata edits change."""
+    return issue.startswith(METADATA_ISSUE_PREFIXES)
+
+
+def validate_metadata(
+    meta: dict,
+    taxonomy: dict | CompiledTaxonomy,
+    stale_days: int | None = DEFAULT_STALE_DAYS,
+    reference: date | None = None,
+) -> List[str]:
+    """Validate required fields, taxonomy values and freshness of an article's metadata.
+
+    Only the fields ``taxonomy`` defines are checked against it: a custom
+    taxonomy without, say, a ``status`` list accepts any status. This is how
+    the ingestion script always treated partial taxonomies.
+
+    ``stale_days=None`` skips the freshness check, for results that are kept
+    longer than a day (e.g. incremental ingestion manifests). Ages are counted
+    in days up to ``reference`` (today in UTC by default).
+    """
+    issues: List[str] = []
+    # Check required fields
+    for field in REQUIRED_FIELDS:
+        if not meta.get(field):
+            issues.append(f"Missing required field: {field}")
+    # Validate taxonomy values; fields the taxonomy does not define are unrestricted
+    taxonomy = compile_taxonomy(taxonomy)
+
+    def check(field: str) -> None:
+        value = meta.get(field)
+        if value and field in taxonomy.values and not taxonomy.allows(field, value):
+            issues.append(f"Invalid {field}: {value}{taxonomy.hint(field, value)}")
+
+    check("domain")
+    domain = meta.get("domain")
+    subdomain = meta.get("subdomain")
+    if domain and subdomain and not taxonomy.allows_subdomain(domain, subdomain):
+        issues.append(
+            f"Invalid subdomain '{subdomain}' for domain '{domain}'{taxonomy.hint('subdomain', subdomain, domain)}"
+        )
+    for field in ("audience", "format", "status"):
+        check(field)
+    # Staleness check
+    last_updated = meta.get("last_updated")
+    if last_updated:
+        # Only ISO dates are valid here; knowledge_core.freshness is lenient for reporting
+        date_val = parse_date(last_updated, lenient=False)
+        if date_val is None:
+            issues.append("Invalid last_updated date format (use YYYY-MM-DD)")
+        elif stale_days is not None and ((reference or utc_today()) - date_val).days > stale_days:
+            issues.append(f"Article is stale (> {stale_days} days since last_updated)")
+    return issues
+
+
+def validate_body(body: str) -> List[str]:
+    """Return body-derived issues; PII heuristics run with all detectors in a single pass."""
+    return DEFAULT_SCANNER.issues(DEFAULT_SCANNER.scan(body))
+
+
+def infer_metadata(name: str, meta: dict) -> dict:
+    """Fill in metadata that can be inferred when front matter omits it."""
+    # Infer missing title from file name if not provided
+    base_name = os.path.splitext(os.path.basename(name))[0]
+    if not meta.get("title") and base_name:
+        meta["title"] = base_name.replace("_", " ")
+    # Infer missing last_updated as today's date if not provided
+    if not meta.get("last_updated"):
+        meta["last_updated"] = utc_today().isoformat()
+    return meta
+
+
+def article_id(article: dict) -> str:
+    """Return the stable ID of a bundle entry: its source file, or its title if it has none.
+
+    :mod:`knowledge_core.pipeline` records the source under :data:`SOURCE_FIELD`;
+    only bundles exported before it did fall back to the (not necessarily unique) title.
+    """
+    meta = article.get("metadata") or {}
+    return str(meta.get(SOURCE_FIELD) or meta.get("title") or "")
+
+
+def finalize_article(meta: dict, body: str, issues: List[str]) -> dict:
+    """Mark missing required fields as "Unknown" and assemble the bundle entry."""
+    # Fill missing required fields with 'Unknown' and record issue
+    for field in REQUIRED_FIELDS:
+        if not meta.get(field):
+            meta[field] = "Unknown"
+            if f"Missing required field: {field}" not in issues:
+                issues.append(f"Missing required field: {field}")
+    return {
+        "metadata": meta,
+        "content": body,
+        "issues": issues,
+    }
+
+
+def validate_document(
+    name: str,
+    meta: dict,
+    body: "str | Iterable[str] | None",
+    taxonomy: dict | CompiledTaxonomy = DEFAULT_COMPILED_TAXONOMY,
+    stale_days: int | None = DEFAULT_STALE_DAYS,
+    keep_content: bool = True,
+    reference: date | None = None,
+) -> dict:
+    """Infer missing metadata, validate one document and build its bundle entry.
+
+    A string ``body`` is scanned whole. An iterable of chunks is scanned for
+    PII in overlapping windows and, with ``keep_content``, joined once for the
+    entry's ``content``; without it the chunks are discarded as they are
+    scanned, so memory stays bounded by the chunk size. ``None`` skips the body
+    checks. ``meta`` is copied, never modified.
+    """
+    meta = infer_metadata(name, dict(meta))
+    kind = file_type(name)
+    with timed("validate_metadata", kind):
+        issues = validate_metadata(meta, taxonomy, stale_days, reference)
+    content = ""
+    if isinstance(body, str):
+        with timed("validate_body", kind, bytes_in=len(body)):
+            issues += validate_body(body)
+        content = body
+    elif body is not None:
+        pieces: List[str] = []
+        chunks = tee_chunks(body, pieces) if keep_content else body
+        # Streamed bodies are read while they are scanned, so this includes the I/O
+        with timed("validate_body", kind):
+            issues += DEFAULT_SCANNER.issues(scan_stream(chunks, DEFAULT_SCANNER))
+        content = "".join(pieces).strip()
+    return finalize_article(meta, content if keep_content else "", issues)
+
+
+def _validate_batch(
+    documents: List[Document],
+    taxonomy: CompiledTaxonomy,
+    stale_days: int | None,
+    keep_content: bool,
+    reference: date | None = None,
+) -> List[dict]:
+    return [
+        validate_document(name, meta, body, taxonomy, stale_days, keep_content, reference)
+        for name, meta, body in documents
+    ]
+
+
+def _batched(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    batch: List[Document] = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_many(
+    documents: Iterable[Document],
+    taxonomy: dict | CompiledTaxonomy | None = None,
+    stale_days: int | None = DEFAULT_STALE_DAYS,
+    keep_content: bool = True,
+    workers: Optional[int] = None,
+    batch_size: int = VALIDATE_BATCH_SIZE,
+    reference: date | None = None,
+) -> Iterator[dict]:
+    """Validate ``(name, metadata, body)`` documents and yield their bundle entries in order.
+
+    ``documents`` is consumed lazily, so it may be a generator over a corpus
+    of any size. The taxonomy (the default one when None) is compiled once for
+    the whole batch. See :func:`validate_document` for the accepted bodies.
+
+    With ``workers`` above 1, documents are validated in batches of
+    ``batch_size`` across a process pool; bodies must then be strings or None,
+    since chunk iterators cannot be sent to another process. A batch that
+    fails in the pool yields an entry with a "Validation failed" issue for each
+    of its documents rather than aborting the run.
+
+    Staleness is measured against a single ``reference`` day for the whole
+    run, today in UTC unless given.
+    """
+    taxonomy = compile_taxonomy(taxonomy if taxonomy is not None else DEFAULT_COMPILED_TAXONOMY)
+    reference = reference or utc_today()
+    if workers is None or workers <= 1:
+        for name, meta, body in documents:
+            yield validate_document(name, meta, body, taxonomy, stale_days, keep_content, reference)
+        return
+    batches = _batched(documents, batch_size)
+    pending: Deque[List[Document]] = deque()
+
+    def tracked() -> Iterator[List[Document]]:
+        # Remember each batch until its result arrives, to report failures per document
+        for batch in batches:
+            pending.append(batch)
+            yield batch
+
+    worker = partial(
+        _validate_batch, taxonomy=taxonomy, stale_days=stale_days, keep_content=keep_content, reference=reference
+    )
+    for result in BatchExecutor(workers=workers).imap(worker, tracked()):
+        batch = pending.popleft()
+        if result.ok:
+            yield from result.value
+            continue
+        for name, meta, _ in batch:
+            yield finalize_article(infer_metadata(name, dict(meta)), "", [f"Validation failed: {result.error}"])
@@ -8,11 +8,37 @@ relevant for knowledge management.
 """
 
 import os
+import sys
 import json
-import yaml
-from typing import Dict, List, Optional
+import time
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 
+# Allow running as `python scripts/knowledge_ingestion.py` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_core.chunking import DEFAULT_MAX_TOKENS, DEFAULT_OVERLAP, Chunk, Chunker  # noqa: E402
+from knowledge_core.columnar import is_columnar, write_articles  # noqa: E402
+from knowledge_core.dedup import DedupIndex, Signature, Signer, link_duplicates  # noqa: E402
+from knowledge_core.executor import BatchExecutor  # noqa: E402
+from knowledge_core.frontmatter import read_front_matter  # noqa: E402
+from knowledge_core.manifest import IngestManifest, file_fingerprint  # noqa: E402
+from knowledge_core.metrics import PROFILERS, Metrics, collecting, file_type, profiled, timed  # noqa: E402
+from knowledge_core.pii import DEFAULT_SCANNER  # noqa: E402
+from knowledge_core.records import RecordWriter, is_jsonl  # noqa: E402
+from knowledge_core.search import DocTerms, SearchIndex, TermCounter  # noqa: E402
+from knowledge_core.taxonomy import CompiledTaxonomy, compile_taxonomy  # noqa: E402
+from knowledge_core.validation import validate_many  # noqa: E402
+
+# Small reads are enough to find the front matter of a typical article
+HEAD_CHUNK_SIZE = 64 * 1024
+# Bump whenever ingest_article output changes so manifests from older runs are ignored
+INGEST_VERSION = "2"
+# Files handed to a worker per task, to keep pool overhead low on large corpora
+INGEST_BATCH_SIZE = 256
+
 @dataclass
 class ArticleMetadata:
     """Represents metadata extracted from a knowledge article."""
@@ -25,40 +51,51 @@ class ArticleMetadata:
     author: Optional[str] = None
     last_updated: Optional[str] = None
     path: Optional[str] = None
+    pii: Optional[List[str]] = None
+    issues: Optional[List[str]] = None
+    duplicate_of: Optional[List[Dict[str, Any]]] = None
 
 
-def load_taxonomy(taxonomy_path: str) -> Dict:
-    """Load taxonomy definition from a YAML file."""
-    with open(taxonomy_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def load_taxonomy(taxonomy_path: str) -> CompiledTaxonomy:
+    """Load and compile a taxonomy definition from a YAML file."""
+    return CompiledTaxonomy.from_yaml_file(taxonomy_path)
 
 
-def parse_front_matter(content: str) -> Dict:
-    """Extract YAML front matter from a Markdown file content."""
-    if content.startswith("---"):
-        end = content.find("\n---", 3)
-        if end != -1:
-            front_matter = content[3:end]
-            try:
-                return yaml.safe_load(front_matter)
-            except yaml.YAMLError as e:
-                print(f"Error parsing YAML front matter: {e}")
-    return {}
+def ingest_article(
+    path: str,
+    taxonomy: Union[Dict, CompiledTaxonomy],
+    scan_pii: bool = False,
+    signer: Optional[Signer] = None,
+    chunker: Optional[Chunker] = None,
+    counter: Optional[TermCounter] = None,
+) -> ArticleMetadata:
+    """Ingest a single Markdown article and return validated metadata.
 
+    Pass a compiled taxonomy (see :func:`load_taxonomy`) when ingesting many
+    articles so it is indexed only once. The file is streamed: front matter is
+    read from its head only, and with ``scan_pii`` the body is scanned for PII
+    in overlapping chunks, so memory stays bounded for very large files. A
+    ``signer`` (duplicate detection), a ``chunker`` (embedding chunks) and a
+    ``counter`` (search terms, which also get the title) are fed the body as
+    it streams past; the caller finishes them.
 
-def ingest_article(path: str, taxonomy: Dict) -> ArticleMetadata:
-    """Ingest a single Markdown article and return validated metadata."""
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
-    meta = parse_front_matter(content)
+    Taxonomy violations in the required fields raise ``ValueError``; everything
+    else the shared validator reports (missing fields, invalid subdomains or
+    dates, PII) is recorded in ``issues``.
+    """
+    meta, body_chunks = read_front_matter(path, chunk_size=HEAD_CHUNK_SIZE, strict=True)
     if not meta:
         raise ValueError(f"No YAML front matter found in {path}")
 
     # Validate against taxonomy
+    taxonomy = compile_taxonomy(taxonomy)
+
     def validate(field: str, value: str) -> str:
-        allowed = taxonomy['taxonomy'].get(field)
-        if allowed and value not in allowed:
-            raise ValueError(f"Value '{value}' for {field} not in taxonomy options: {allowed}")
+        allowed = taxonomy.options.get(field)
+        if allowed and not taxonomy.allows(field, value):
+            raise ValueError(
+                f"Value '{value}' for {field} not in taxonomy options: {list(allowed)}{taxonomy.hint(field, value)}"
+            )
         return value
 
     title = meta.get('title', os.path.basename(path))
@@ -71,6 +108,24 @@ def ingest_article(path: str, taxonomy: Dict) -> ArticleMetadata:
     fmt = validate('format', meta.get('format'))
     status = validate('status', meta.get('status'))
 
+    if chunker is not None:
+        body_chunks = chunker.feed(body_chunks)
+    if signer is not None:
+        body_chunks = signer.feed(body_chunks)
+    if counter is not None:
+        counter.add_field(str(title))
+        body_chunks = counter.feed(body_chunks)
+    # Report the same issues as the app; staleness is left out because results are
+    # reused from the manifest across runs (knowledge_quality_checks covers freshness)
+    article = next(validate_many([(path, meta, body_chunks if scan_pii else None)], taxonomy,
+                                 stale_days=None, keep_content=False))
+    if (signer is not None or chunker is not None or counter is not None) and not scan_pii:
+        # Nothing else reads the body, so stream it through the signer, chunker and counter here
+        for _ in body_chunks:
+            pass
+    issues = article["issues"]
+    pii = [d.kind for d in DEFAULT_SCANNER.detectors if d.message in issues] if scan_pii else None
+
     return ArticleMetadata(
         title=title,
         domain=domain,
@@ -81,29 +136,330 @@ def ingest_article(path: str, taxonomy: Dict) -> ArticleMetadata:
         author=meta.get('author'),
         last_updated=meta.get('last_updated'),
         path=path,
+        pii=pii,
+        issues=issues,
     )
 
 
-def ingest_directory(input_dir: str, taxonomy_path: str) -> List[ArticleMetadata]:
-    """Walk a directory recursively and ingest all Markdown files."""
-    taxonomy = load_taxonomy(taxonomy_path)
-    articles: List[ArticleMetadata] = []
+# (path, manifest fingerprint, record, error, body signature, body chunks, search terms) for one ingested file
+IngestResult = Tuple[
+    str,
+    Optional[Tuple[int, int, str]],
+    Optional[Dict[str, Any]],
+    Optional[str],
+    Optional[Signature],
+    Optional[List[Chunk]],
+    Optional[DocTerms],
+]
+
+
+def _chunk_file(path: str, chunker: Chunker) -> List[Chunk]:
+    """Read the body of an already ingested file and return its chunks."""
+    _, body_chunks = read_front_matter(path, chunk_size=HEAD_CHUNK_SIZE, strict=True)
+    for text in body_chunks:
+        chunker.update(text)
+    chunker.close()
+    return chunker.take()
+
+
+def _ingest_batch(
+    tasks: List[Tuple[str, bool]],
+    taxonomy: CompiledTaxonomy,
+    scan_pii: bool,
+    slow_threshold: Optional[float] = None,
+    signature_shape: Optional[Tuple[int, int]] = None,
+    chunking: Optional[Tuple[int, int]] = None,
+    index_terms: bool = False,
+) -> Tuple[List[IngestResult], Optional[Dict[str, Any]]]:
+    """Ingest a batch of ``(path, fresh)`` tasks, returning one :data:`IngestResult` per task.
+
+    Fresh files are fingerprinted, parsed and validated. The others were
+    ingested before and are only read again to be chunked, so their results
+    hold nothing but the chunks (or an error).
+
+    With a ``slow_threshold`` the batch's stage timings are collected too and
+    returned as :meth:`Metrics.to_dict` counters; otherwise the second item is None.
+    Bodies are only signed when a ``(num_perm, shingle_words)`` ``signature_shape``
+    is given, only chunked with a ``(max_tokens, overlap)`` ``chunking`` and
+    only counted for search with ``index_terms``; the signature, chunks and
+    terms are None otherwise.
+    """
+    results = []
+    metrics = Metrics(slow_threshold) if slow_threshold is not None else None
+    for path, fresh in tasks:
+        file_metrics = Metrics() if metrics is not None else None
+        start = time.perf_counter()
+        chunker = Chunker(*chunking) if chunking is not None else None
+        if not fresh:
+            try:
+                with collecting(file_metrics), timed("chunk", "md"):
+                    results.append((path, None, None, None, None, _chunk_file(path, chunker), None))
+            except Exception as exc:
+                results.append((path, None, None, str(exc), None, None, None))
+            if metrics is not None:
+                metrics.merge(file_metrics.to_dict())
+            continue
+        with collecting(file_metrics), timed("hash", "md"):
+            fingerprint = file_fingerprint(path)
+        signer = Signer(*signature_shape) if signature_shape is not None else None
+        counter = TermCounter() if index_terms else None
+        try:
+            with collecting(file_metrics):
+                record = asdict(ingest_article(path, taxonomy, scan_pii=scan_pii, signer=signer, chunker=chunker,
+                                               counter=counter))
+            signature = signer.signature() if signer is not None else None
+            chunks = None
+            if chunker is not None:
+                chunker.close()
+                chunks = chunker.take()
+            terms = counter.terms() if counter is not None else None
+            results.append((path, fingerprint, record, None, signature, chunks, terms))
+        except Exception as exc:
+            results.append((path, fingerprint, None, str(exc), None, None, None))
+        if metrics is not None:
+            metrics.merge(file_metrics.to_dict())
+            size = fingerprint[1]
+            metrics.observe_file(path, time.perf_counter() - start, size, file_metrics.stage_seconds())
+    return results, metrics.to_dict() if metrics is not None else None
+
+
+def find_articles(input_dir: str) -> List[str]:
+    """Return the paths of all Markdown files below ``input_dir`` in walk order."""
+    paths = []
     for root, _, files in os.walk(input_dir):
         for name in files:
             if name.lower().endswith('.md'):
-                file_path = os.path.join(root, name)
-                try:
-                    article = ingest_article(file_path, taxonomy)
-                    articles.append(article)
-                except Exception as exc:
-                    print(f"Skipping {file_path}: {exc}")
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def iter_articles(
+    input_dir: str,
+    taxonomy_path: str,
+    scan_pii: bool = False,
+    workers: Optional[int] = None,
+    manifest_path: Optional[str] = None,
+    full: bool = False,
+    metrics: Optional[Metrics] = None,
+    dedup: Optional[DedupIndex] = None,
+    chunks_path: Optional[str] = None,
+    chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap: int = DEFAULT_OVERLAP,
+    search_index: Optional[SearchIndex] = None,
+) -> Iterator[ArticleMetadata]:
+    """Walk a directory recursively and yield ingested articles in walk order.
+
+    Files are parsed and validated in batches across ``workers`` processes
+    (``KNOWLEDGE_WORKERS`` or the CPU count by default) and yielded as their
+    batch completes. With ``manifest_path`` only files added or changed since
+    the previous run are ingested; results for unchanged files are taken from
+    the manifest, which is rewritten once the walk is exhausted. ``full``
+    ignores the previous manifest.
+
+    ``metrics`` collects per-stage timings and slow files from every worker;
+    when it names a profiler the walk runs in a single process.
+
+    With a :class:`~knowledge_core.dedup.DedupIndex` the workers also sign
+    every body and articles that repeat one indexed before them get a
+    duplicate issue and ``duplicate_of`` links. Links are recomputed on every
+    run and never stored in the manifest; unchanged files missing from the
+    index are ingested again so it can be built incrementally.
+
+    With ``chunks_path`` (``.jsonl`` or ``.jsonl.gz``) every body is also split
+    into chunks of at most ``chunk_tokens`` tokens overlapping by
+    ``chunk_overlap`` (see :mod:`knowledge_core.chunking`), and the chunk
+    records are streamed to that file in walk order. Unchanged files are read
+    again for their chunks but not re-validated; chunk IDs only change with
+    the chunk text, so embedding jobs can skip the IDs they already have. The
+    file replaces the previous one once the walk is exhausted.
+
+    With a :class:`~knowledge_core.search.SearchIndex` the workers also count
+    the terms of every title and body, and fresh articles are added to the
+    index under their paths. Removed files leave the index, unchanged files
+    missing from it are ingested again, and the index is flushed once the
+    walk is exhausted.
+    """
+    if metrics is not None and metrics.profiler is not None:
+        workers = 1
+    taxonomy = load_taxonomy(taxonomy_path)
+    paths = find_articles(input_dir)
+    manifest = None
+    pending = paths
+    if manifest_path:
+        context = {"ingest": INGEST_VERSION, "taxonomy": taxonomy.fingerprint, "scan_pii": scan_pii}
+        if full:
+            manifest = IngestManifest(manifest_path, context)
+        else:
+            manifest = IngestManifest.load(manifest_path, context)
+        diff = manifest.diff(paths)
+        manifest.forget(diff.removed)
+        pending = diff.changed
+        indexes = [index for index in (dedup, search_index) if index is not None]
+        for index in indexes:
+            for path in diff.removed:
+                index.remove(path)
+        # Unchanged files are only skipped if every index has them already
+        unindexed = {path for path in diff.unchanged if any(path not in index for index in indexes)}
+        if unindexed:
+            stale = unindexed.union(diff.changed)
+            pending = [path for path in paths if path in stale]
+        print(f"Reusing {len(paths) - len(pending)} unchanged articles, ingesting {len(pending)}, "
+              f"dropping {len(diff.removed)} removed")
+
+    pending_set = set(pending)
+    chunking = (chunk_tokens, chunk_overlap) if chunks_path else None
+    if chunking is not None:
+        Chunker(*chunking)  # Reject bad settings before any work is sent out
+        # Reused articles are read again for their chunks only, so the chunk file stays complete
+        tasks = [(path, path in pending_set) for path in paths
+                 if path in pending_set or manifest.entries[path].record is not None]
+    else:
+        tasks = [(path, True) for path in pending]
+    batches = [tasks[i:i + INGEST_BATCH_SIZE] for i in range(0, len(tasks), INGEST_BATCH_SIZE)]
+    executor = BatchExecutor(workers=workers)
+
+    slow_threshold = metrics.slow_threshold if metrics is not None else None
+
+    signature_shape = (dedup.num_perm, dedup.shingle_words) if dedup is not None else None
+
+    def fresh_results() -> Iterator[IngestResult]:
+        worker = partial(
+            _ingest_batch,
+            taxonomy=taxonomy,
+            scan_pii=scan_pii,
+            slow_threshold=slow_threshold,
+            signature_shape=signature_shape,
+            chunking=chunking,
+            index_terms=search_index is not None,
+        )
+        results = executor.imap(worker, batches)
+        for batch, result in zip(batches, results):
+            if result.ok:
+                batch_results, batch_metrics = result.value
+                if metrics is not None:
+                    metrics.merge(batch_metrics)
+                yield from batch_results
+            else:
+                # The whole batch failed (e.g. a crashed worker); report every file and retry it next run
+                for path, _ in batch:
+                    yield path, None, None, result.error, None, None, None
+
+    # Tasks are a subsequence of the walk, so their results merge in order
+    fresh = fresh_results()
+    scheduled = {path for path, _ in tasks}
+    with (RecordWriter(chunks_path) if chunks_path else nullcontext()) as chunk_writer:
+        for path in paths:
+            duplicates = []
+            chunks = None
+            if path in pending_set:
+                _, fingerprint, record, error, signature, chunks, terms = next(fresh)
+                if manifest is not None and fingerprint is not None:
+                    manifest.record(path, fingerprint, record, error)
+                if dedup is not None:
+                    with collecting(metrics), timed("dedup", "md"):
+                        duplicates = dedup.add(path, signature if record is not None else None)
+                if search_index is not None:
+                    with collecting(metrics), timed("index", "md"):
+                        if record is not None:
+                            search_index.add(path, record, terms)
+                        else:
+                            search_index.remove(path)
+            else:
+                entry = manifest.entries[path]
+                record, error = entry.record, entry.error
+                if path in scheduled:
+                    _, _, _, chunk_error, _, chunks, _ = next(fresh)
+                    if chunk_error is not None:
+                        print(f"Could not chunk {path}: {chunk_error}")
+                if dedup is not None and record is not None:
+                    with collecting(metrics), timed("dedup", "md"):
+                        duplicates = dedup.links(path)
+            if record is None:
+                print(f"Skipping {path}: {error}")
+                continue
+            if duplicates:
+                linked = link_duplicates({"metadata": record, "issues": record["issues"] or []}, duplicates)
+                record = {**linked["metadata"], "issues": linked["issues"]}
+            if chunk_writer is not None and chunks:
+                # Chunks carry the article's metadata, but not its validation issues
+                metadata = {key: value for key, value in record.items() if key != "issues"}
+                for chunk in chunks:
+                    chunk_writer.write(chunk.record(path, metadata))
+            yield ArticleMetadata(**record)
+    if manifest is not None:
+        manifest.save()
+    if dedup is not None:
+        dedup.flush()
+    if search_index is not None:
+        search_index.flush()
+
+
+def ingest_directory(
+    input_dir: str,
+    taxonomy_path: str,
+    scan_pii: bool = False,
+    workers: Optional[int] = None,
+    manifest_path: Optional[str] = None,
+    full: bool = False,
+    metrics: Optional[Metrics] = None,
+    dedup: Optional[DedupIndex] = None,
+    chunks_path: Optional[str] = None,
+    chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap: int = DEFAULT_OVERLAP,
+    search_index: Optional[SearchIndex] = None,
+) -> List[ArticleMetadata]:
+    """Walk a directory recursively and ingest all Markdown files.
+
+    See :func:`iter_articles` for the parallel, incremental, metrics, duplicate
+    detection, chunking and search indexing options.
+    """
+    with profiled(metrics):
+        articles = list(iter_articles(input_dir, taxonomy_path, scan_pii, workers, manifest_path, full, metrics,
+                                      dedup, chunks_path, chunk_tokens, chunk_overlap, search_index))
+    if metrics is not None:
+        metrics.finish()
     return articles
 
 
 def export_to_json(articles: List[ArticleMetadata], output_path: str) -> None:
     """Export ingested articles metadata to a JSON file."""
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump([asdict(a) for a in articles], f, indent=2)
+        json.dump([asdict(a) for a in articles], f, indent=2, default=str)
+
+
+def export_to_jsonl(articles: Iterable[ArticleMetadata], output_path: str) -> int:
+    """Stream articles metadata to a JSONL (or ``.jsonl.gz``) file with an offset index.
+
+    Articles are written as they arrive, so memory stays constant. Returns the
+    number of articles written.
+    """
+    with RecordWriter(output_path) as writer:
+        for article in articles:
+            writer.write(asdict(article))
+    return writer.count
+
+
+def export_to_columnar(articles: Iterable[ArticleMetadata], output_path: str) -> int:
+    """Stream articles metadata to a Parquet (``.parquet``) or Arrow (``.arrow``) file.
+
+    Taxonomy fields are dictionary-encoded and PII kinds stored as a list
+    column. Requires pyarrow. Returns the number of articles written.
+    """
+    return write_articles((asdict(article) for article in articles), output_path)
+
+
+def _time_consumer(articles: Iterable[ArticleMetadata], metrics: Metrics, kind: str) -> Iterator[ArticleMetadata]:
+    """Yield ``articles``, adding the time the consumer spends on each one to the ``export`` stage.
+
+    Streaming exporters pull articles while ingestion is still running, so only
+    the time between handing out an article and the next request is theirs.
+    """
+    seconds = 0.0
+    for article in articles:
+        start = time.perf_counter()
+        yield article
+        seconds += time.perf_counter() - start
+    metrics.add("export", kind, seconds)
 
 
 def main() -> None:
@@ -111,12 +467,80 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Ingest Markdown knowledge articles and export metadata to JSON.")
     parser.add_argument('--input-dir', required=True, help='Directory containing Markdown knowledge articles')
     parser.add_argument('--taxonomy', required=True, help='Path to taxonomy YAML file')
-    parser.add_argument('--output', default='knowledge_metadata.json', help='Output JSON file path')
+    parser.add_argument('--output', default='knowledge_metadata.json',
+                        help='Output file path; .jsonl/.jsonl.gz stream one record per line with an offset index, '
+                             '.parquet/.arrow write a columnar file')
+    parser.add_argument('--scan-pii', action='store_true',
+                        help='Stream each article body through the PII scanner and record detected kinds')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for parsing and validation (default: KNOWLEDGE_WORKERS or CPU count)')
+    parser.add_argument('--manifest', default=None,
+                        help='Manifest used for incremental runs (default: <output>.manifest.json)')
+    parser.add_argument('--full', action='store_true', help='Ignore the previous manifest and re-ingest every file')
+    parser.add_argument('--metrics', default=None,
+                        help='Write per-stage timings to this file: Prometheus text for .prom/.txt, JSON otherwise')
+    parser.add_argument('--slow-file-seconds', type=float, default=None,
+                        help='Log files slower than this (default: KNOWLEDGE_SLOW_FILE_SECONDS or 5)')
+    parser.add_argument('--profile', choices=PROFILERS, default=None,
+                        help='Profile the run in a single process and print the report')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Flag exact and near-duplicate articles and link them to the first copy')
+    parser.add_argument('--dedup-index', default=None,
+                        help='Duplicate index kept across runs (default: <output>.dedup.sqlite)')
+    parser.add_argument('--dedup-threshold', type=float, default=None,
+                        help='Estimated similarity reported as a near-duplicate (default: KNOWLEDGE_DEDUP_THRESHOLD '
+                             'or 0.8)')
+    parser.add_argument('--chunks', default=None,
+                        help='Also stream embedding-ready chunk records to this .jsonl/.jsonl.gz file')
+    parser.add_argument('--chunk-tokens', type=int, default=DEFAULT_MAX_TOKENS,
+                        help=f'Token budget per chunk (default: {DEFAULT_MAX_TOKENS})')
+    parser.add_argument('--chunk-overlap', type=int, default=DEFAULT_OVERLAP,
+                        help=f'Tokens shared by consecutive chunks of a section (default: {DEFAULT_OVERLAP})')
+    parser.add_argument('--search-index', default=None,
+                        help='Keep this search index directory up to date (query it with knowledge_search.py)')
     args = parser.parse_args()
 
-    articles = ingest_directory(args.input_dir, args.taxonomy)
-    export_to_json(articles, args.output)
-    print(f"Ingested {len(articles)} articles and wrote metadata to {args.output}")
+    metrics = None
+    if args.metrics or args.profile or args.slow_file_seconds is not None:
+        metrics = Metrics(slow_threshold=args.slow_file_seconds, profiler=args.profile)
+    manifest_path = args.manifest or f"{args.output}.manifest.json"
+    dedup = None
+    if args.dedup:
+        dedup = DedupIndex(args.dedup_index or f"{args.output}.dedup.sqlite", threshold=args.dedup_threshold)
+    search_index = SearchIndex(args.search_index) if args.search_index else None
+    with profiled(metrics):
+        articles = iter_articles(args.input_dir, args.taxonomy, scan_pii=args.scan_pii, workers=args.workers,
+                                 manifest_path=manifest_path, full=args.full, metrics=metrics, dedup=dedup,
+                                 chunks_path=args.chunks, chunk_tokens=args.chunk_tokens,
+                                 chunk_overlap=args.chunk_overlap, search_index=search_index)
+        kind = file_type(args.output)
+        if metrics is not None and (is_jsonl(args.output) or is_columnar(args.output)):
+            articles = _time_consumer(articles, metrics, kind)
+        if is_jsonl(args.output):
+            count = export_to_jsonl(articles, args.output)
+        elif is_columnar(args.output):
+            count = export_to_columnar(articles, args.output)
+        else:
+            articles = list(articles)
+            start = time.perf_counter()
+            export_to_json(articles, args.output)
+            if metrics is not None:
+                metrics.add("export", kind, time.perf_counter() - start)
+            count = len(articles)
+    print(f"Ingested {count} articles and wrote metadata to {args.output}")
+    if args.chunks:
+        print(f"Wrote chunks to {args.chunks}")
+    if search_index is not None:
+        print(f"Search index {args.search_index} holds {len(search_index)} articles")
+    if metrics is not None:
+        metrics.finish()
+        for entry in metrics.slow_files:
+            print(f"Slow file {entry['file']}: {entry['seconds']:.2f}s {entry.get('stages', {})}")
+        if metrics.profile:
+            print(metrics.profile)
+        if args.metrics:
+            metrics.write(args.metrics)
+            print(f"Wrote metrics to {args.metrics}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,99 @@
+"""
+knowledge_metadata_model.py
+
+Train the metadata model and fill in missing taxonomy fields of exported bundles.
+
+    python scripts/knowledge_metadata_model.py train docs/packs data/sample_knowledge
+    python scripts/knowledge_metadata_model.py suggest bundle.json --output suggested.json --taxonomy taxonomy.yaml
+
+``train`` reads tagged Markdown files (directories are walked) and app bundle
+exports, and writes the model where the app looks for it
+(``KNOWLEDGE_MODEL_PATH``) unless ``--model`` says otherwise. ``suggest``
+scores a bundle in batches and writes it back with the confident suggestions
+applied and flagged for review.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Allow running as `python scripts/knowledge_metadata_model.py` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_core.export import write_bundle_json  # noqa: E402
+from knowledge_core.inference import (  # noqa: E402
+    DEFAULT_MIN_CONFIDENCE,
+    MetadataModel,
+    default_model_path,
+    is_inference_issue,
+    suggest_metadata,
+    train_model,
+)
+from knowledge_core.records import RecordWriter, is_jsonl, iter_records  # noqa: E402
+from knowledge_core.taxonomy import CompiledTaxonomy  # noqa: E402
+
+
+def load_taxonomy_file(path: str) -> CompiledTaxonomy:
+    """Compile a taxonomy from a YAML or JSON file."""
+    if path.lower().endswith((".yaml", ".yml")):
+        return CompiledTaxonomy.from_yaml_file(path)
+    with open(path, "rb") as f:
+        return CompiledTaxonomy.from_json(f.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the metadata model and suggest missing taxonomy fields.")
+    parser.add_argument('--model', default=None,
+                        help='Model file (default: KNOWLEDGE_MODEL_PATH or ~/.cache/knowledge-ai/metadata_model.npz)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train_cmd = commands.add_parser('train', help='Train on tagged articles')
+    train_cmd.add_argument('sources', nargs='+', help='Markdown files, directories of them, or bundle JSON/JSONL')
+
+    suggest_cmd = commands.add_parser('suggest', help='Fill in missing fields of a bundle')
+    suggest_cmd.add_argument('bundle', help='Bundle file: JSON array, .jsonl or .jsonl.gz')
+    suggest_cmd.add_argument('--output', required=True, help='Output bundle (.json, .jsonl or .jsonl.gz)')
+    suggest_cmd.add_argument('--taxonomy', default=None, help='Only suggest values this YAML/JSON taxonomy allows')
+    suggest_cmd.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE,
+                             help=f'Drop suggestions below this confidence (default: {DEFAULT_MIN_CONFIDENCE})')
+    args = parser.parse_args()
+
+    path = args.model or default_model_path()
+    if not path:
+        parser.error("no model file: pass --model or set KNOWLEDGE_MODEL_PATH")
+
+    if args.command == 'train':
+        start = time.perf_counter()
+        model = train_model(args.sources)
+        model.save(path)
+        labels = ", ".join(f"{field}: {len(values)}" for field, values in model.labels.items())
+        print(f"Trained on {model.documents} articles in {time.perf_counter() - start:.2f}s ({labels}); "
+              f"wrote {path}")
+        return
+
+    model = MetadataModel.load(path)
+    taxonomy = load_taxonomy_file(args.taxonomy) if args.taxonomy else None
+    suggested = 0
+
+    def counted(bundle):
+        nonlocal suggested
+        for article in bundle:
+            suggested += sum(1 for issue in article["issues"] if is_inference_issue(issue))
+            yield article
+
+    start = time.perf_counter()
+    articles = counted(suggest_metadata(iter_records(args.bundle), model, taxonomy, args.min_confidence))
+    if is_jsonl(args.output):
+        with RecordWriter(args.output) as writer:
+            for article in articles:
+                writer.write(article)
+        count = writer.count
+    else:
+        count = write_bundle_json(articles, args.output)
+    print(f"{count} articles carry {suggested} suggested values ({time.perf_counter() - start:.2f}s); "
+          f"wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,49 @@
-import json, argparse, datetime as dt
-from pathlib import Path
+import argparse, json, os, sys
+
+import numpy as np
+
+# Allow running as `python scripts/knowledge_quality_checks.py` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_core.freshness import freshness_report, parse_dates, stale_mask, utc_today  # noqa: E402
+from knowledge_core.records import iter_records  # noqa: E402
 
 REQ = ["title","domain","subdomain","audience","format","status","author","last_updated"]
+# Records whose dates are parsed and aged together in one vectorized pass
+BATCH = 65536
+
+def check_batch(start, records, today, max_age, bad, dates):
+    # Undated or unparseable records count as stale
+    parsed = parse_dates([rec.get("last_updated") for rec in records])
+    stale = stale_mask(parsed, max_age, today)
+    for offset, rec in enumerate(records):
+        missing = [k for k in REQ if k not in rec]
+        if missing or stale[offset]:
+            bad.append({"index": start + offset, "missing": missing, "stale": bool(stale[offset])})
+    if dates is not None:
+        dates.append(parsed)
 
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--input", required=True)
+    p.add_argument("--input", required=True, help="JSON array, .jsonl or .jsonl.gz; JSONL is checked as a stream")
     p.add_argument("--min-freshness-days", type=int, default=90)
+    p.add_argument("--freshness-report", help="Write staleness buckets and an age histogram to this JSON file")
     args = p.parse_args()
 
-    data = json.loads(Path(args.input).read_text())
-    today = dt.date.today()
-    bad = []
-    for i, rec in enumerate(data):
-        missing = [k for k in REQ if k not in rec]
-        try:
-            d = dt.date.fromisoformat(rec.get("last_updated","1970-01-01"))
-        except Exception:
-            d = dt.date(1970,1,1)
-        stale = (today - d).days > args.min_freshness_days
-        if missing or stale:
-            bad.append({"index": i, "missing": missing, "stale": stale})
+    today = utc_today()
+    bad, batch, start = [], [], 0
+    dates = [] if args.freshness_report else None
+    for i, rec in enumerate(iter_records(args.input)):
+        batch.append(rec)
+        if len(batch) >= BATCH:
+            check_batch(start, batch, today, args.min_freshness_days, bad, dates)
+            start, batch = i + 1, []
+    if batch:
+        check_batch(start, batch, today, args.min_freshness_days, bad, dates)
+    if dates is not None:
+        report = freshness_report(np.concatenate(dates) if dates else [], today, args.min_freshness_days)
+        with open(args.freshness_report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
     if bad:
         print("quality_issues=", bad)
         raise SystemExit(1)
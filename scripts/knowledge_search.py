@@ -0,0 +1,75 @@
+"""
+knowledge_search.py
+
+Build and query the local BM25 search index over validated articles.
+
+    python scripts/knowledge_search.py --index search/ index bundle.json
+    python scripts/knowledge_search.py --index search/ query "reset password" --domain IT
+    python scripts/knowledge_search.py --index search/ stats
+
+``index`` adds app bundle exports (JSON, ``.jsonl`` or ``.jsonl.gz``) under
+their source files (``metadata["source_file"]``); ``knowledge_ingestion.py --search-index`` keeps an index of a
+Markdown directory up to date instead.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Allow running as `python scripts/knowledge_search.py` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_core.records import iter_records  # noqa: E402
+from knowledge_core.search import FILTER_FIELDS, SearchIndex, default_search_path  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the local search index of knowledge articles.")
+    parser.add_argument('--index', default=None,
+                        help='Index directory (default: KNOWLEDGE_SEARCH_PATH or ~/.cache/knowledge-ai/search)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index_cmd = commands.add_parser('index', help='Add app bundle exports to the index')
+    index_cmd.add_argument('bundles', nargs='+', help='Bundle files: JSON array, .jsonl or .jsonl.gz')
+
+    query_cmd = commands.add_parser('query', help='Search the index')
+    query_cmd.add_argument('text', help='Query text')
+    query_cmd.add_argument('-k', type=int, default=10, help='Number of results (default: 10)')
+    for name in FILTER_FIELDS:
+        query_cmd.add_argument(f'--{name}', action='append', default=None,
+                               help=f'Only return articles with this {name} (repeat to allow several)')
+    query_cmd.add_argument('--json', action='store_true', help='Print hits as JSON lines')
+
+    commands.add_parser('stats', help='Print index statistics')
+    args = parser.parse_args()
+
+    path = args.index or default_search_path()
+    if not path:
+        parser.error("no index directory: pass --index or set KNOWLEDGE_SEARCH_PATH")
+    index = SearchIndex(path)
+
+    if args.command == 'index':
+        for bundle in args.bundles:
+            count = index.add_bundle(iter_records(bundle))
+            print(f"Indexed {count} articles from {bundle}")
+        print(f"{path} holds {len(index)} articles")
+    elif args.command == 'query':
+        filters = {name: getattr(args, name) for name in FILTER_FIELDS if getattr(args, name)}
+        start = time.perf_counter()
+        hits = index.search(args.text, args.k, filters)
+        elapsed = (time.perf_counter() - start) * 1000
+        for rank, hit in enumerate(hits, 1):
+            if args.json:
+                print(json.dumps(hit.to_dict()))
+            else:
+                labels = ", ".join(f"{name}={hit.fields[name]}" for name in FILTER_FIELDS if hit.fields.get(name))
+                print(f"{rank:>3}. {hit.score:7.3f}  {hit.title}  [{labels}]\n     {hit.snippet}")
+        print(f"{len(hits)} results in {elapsed:.1f} ms", file=sys.stderr)
+    else:
+        print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
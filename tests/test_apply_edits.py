@@ -0,0 +1,50 @@
+from app import DEFAULT_COMPILED_TAXONOMY, EDITABLE_FIELDS, apply_table_edits, validate_article
+from knowledge_core.validation import finalize_article, infer_metadata
+
+META = {
+    "title": "Doc",
+    "domain": "product",
+    "subdomain": "features",
+    "audience": "internal",
+    "format": "article",
+    "status": "draft",
+    "last_updated": "2999-01-01",
+}
+
+
+def _article(body):
+    meta = dict(META)
+    return {"metadata": meta, "content": body, "issues": validate_article(meta, body, DEFAULT_COMPILED_TAXONOMY)}
+
+
+def _row(article):
+    return [article["metadata"][field] for field in EDITABLE_FIELDS] + ["; ".join(article["issues"]) or "None"]
+
+
+def test_only_edited_rows_are_revalidated_and_body_findings_are_kept():
+    bundle = [_article("Contact jane@example.com"), _article("Clean body")]
+    rows = [_row(article) for article in bundle]
+    assert apply_table_edits(bundle, rows, DEFAULT_COMPILED_TAXONOMY) == []
+
+    rows[0][1] = "not-a-domain"
+    rows[1][1] = ""  # cleared cells keep the previous value
+    original_issues = list(bundle[0]["issues"])
+    dirty = apply_table_edits(bundle, rows, DEFAULT_COMPILED_TAXONOMY)
+
+    assert dirty == [(0, original_issues)]
+    assert bundle[0]["metadata"]["domain"] == "not-a-domain"
+    expected = validate_article(bundle[0]["metadata"], bundle[0]["content"], DEFAULT_COMPILED_TAXONOMY)
+    assert bundle[0]["issues"] == expected
+    assert any("Email" in issue for issue in bundle[0]["issues"])
+    assert bundle[1]["metadata"]["domain"] == "product"
+
+
+def test_editing_a_failed_row_keeps_its_extraction_issue():
+    failure = "Extraction failed: DocxError: not a DOCX (zip) archive: File is not a zip file"
+    failed = finalize_article(infer_metadata("broken.docx", {}), "", [failure])
+    bundle = [failed]
+    rows = [_row(failed)]
+    rows[0][1] = "product"
+    assert apply_table_edits(bundle, rows, DEFAULT_COMPILED_TAXONOMY) != []
+    assert bundle[0]["issues"][-1] == failure
+    assert "Missing required field: domain" not in bundle[0]["issues"]
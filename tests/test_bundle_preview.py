@@ -0,0 +1,59 @@
+import csv
+import datetime as dt
+import json
+import zipfile
+
+import pytest
+
+from app import discard_export, export_bundle, preview_page_count, render_json_preview
+
+BUNDLE = [
+    {"metadata": {"title": f"Doc {i}", "last_updated": dt.date(2024, 1, 1)}, "content": "x" * 1000, "issues": []}
+    for i in range(45)
+]
+
+
+def test_preview_is_paginated_and_truncated():
+    assert preview_page_count(BUNDLE, page_size=20) == 3
+    page = json.loads(render_json_preview(BUNDLE, page=3, page_size=20, max_content_chars=10))
+    assert [a["metadata"]["title"] for a in page] == [f"Doc {i}" for i in range(40, 45)]
+    assert page[0]["content"].startswith("x" * 10) and "990 more characters" in page[0]["content"]
+    # Out-of-range pages clamp instead of failing
+    assert render_json_preview(BUNDLE, page=99, page_size=20) == render_json_preview(BUNDLE, page=3, page_size=20)
+    assert BUNDLE[0]["content"] == "x" * 1000
+
+
+def test_export_writes_the_full_bundle(tmp_path):
+    path = export_bundle(BUNDLE, "JSON", directory=str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        exported = json.load(f)
+    assert exported == json.loads(json.dumps(BUNDLE, default=str))
+
+    path = export_bundle(BUNDLE, "JSONL", directory=str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == exported
+
+
+def test_zip_and_csv_exports_stream_one_entry_per_article(tmp_path):
+    bundle = BUNDLE[:3] + [
+        {"metadata": {"title": "Doc 0"}, "content": "copy", "issues": ["Stale"]},
+        {"metadata": {"title": "=HYPERLINK(\"x\")", "domain": "IT"}, "content": "", "issues": ["A", "B"]},
+    ]
+    path = export_bundle(bundle, "ZIP (JSON per article)", directory=str(tmp_path))
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == ["Doc_0.json", "Doc_1.json", "Doc_2.json", "Doc_0-2.json", "HYPERLINK_x.json"]
+        assert json.loads(archive.read("Doc_0-2.json")) == bundle[3]
+
+    path = export_bundle(bundle, "CSV (validation table)", directory=str(tmp_path))
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["title", "domain", "subdomain", "audience", "format", "status", "last_updated", "issues"]
+    assert rows[1][0] == "Doc 0" and rows[1][6] == "2024-01-01" and rows[1][7] == "None"
+    assert rows[5][:2] == ["'=HYPERLINK(\"x\")", "IT"] and rows[5][7] == "A; B"
+
+    # A failed export leaves nothing behind, and served exports are discarded
+    with pytest.raises(AttributeError):
+        export_bundle([{"metadata": None, "issues": []}], "CSV (validation table)", directory=str(tmp_path))
+    discard_export(path)
+    discard_export(path)
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".zip"]
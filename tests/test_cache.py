@@ -0,0 +1,51 @@
+from knowledge_core.cache import ContentCache, hash_source
+from knowledge_core.pipeline import process_files
+from knowledge_core.taxonomy import CompiledTaxonomy
+
+
+def test_lru_eviction_and_counters(tmp_path):
+    cache = ContentCache(str(tmp_path / "cache.sqlite"), max_bytes=200)
+    for i in range(3):
+        cache.put_extraction(f"k{i}", "x" * 60)
+    # Touch k0 so k1 becomes the least recently used entry
+    assert cache.get_extraction("k0") == "x" * 60
+    cache.put_extraction("k3", "x" * 60)
+    assert cache.get_extraction("k1") is None
+    assert cache.get_extraction("k3") == "x" * 60
+    stats = cache.stats()
+    assert stats["extraction_hits"] == 2
+    assert stats["extraction_misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 200
+
+
+def test_hashes_are_stable(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_bytes(b"hello")
+    assert hash_source(str(path)) == hash_source(b"hello")
+
+
+def test_process_files_reuses_cached_results_until_the_taxonomy_or_options_change(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text("---\ntitle: Doc\ndomain: energy\n---\n\nBody text.\n")
+    cache = ContentCache(str(tmp_path / "cache.sqlite"))
+
+    def run(taxonomy=None, max_pdf_pages=None):
+        before = cache.stats()
+        bundle, _ = process_files([str(path)], taxonomy, workers=1, cache=cache, max_pdf_pages=max_pdf_pages)
+        after = cache.stats()
+        return bundle[0]["issues"], {key: after[key] - before[key] for key in after if key.endswith(("hits", "misses"))}
+
+    issues, _ = run()
+    assert "Invalid domain: energy" in issues
+    cached, counts = run()
+    assert cached == issues and counts["validation_hits"] == 1 and counts["extraction_misses"] == 0
+
+    # A new taxonomy reuses the extraction but validates again
+    revalidated, counts = run(CompiledTaxonomy({"domain": ["energy"]}))
+    assert "Invalid domain: energy" not in revalidated
+    assert (counts["extraction_hits"], counts["validation_hits"], counts["validation_misses"]) == (1, 0, 1)
+
+    # Extraction options change the body, so neither result is reused
+    _, counts = run(max_pdf_pages=1)
+    assert (counts["extraction_hits"], counts["validation_hits"]) == (0, 0)
@@ -0,0 +1,124 @@
+import importlib.util
+import json
+import os
+
+from knowledge_core.chunking import Chunker, bundle_chunks, count_tokens, iter_chunks
+from knowledge_core.export import export_bundle
+from knowledge_core.pipeline import process_files
+from knowledge_core.records import iter_records
+
+spec = importlib.util.spec_from_file_location("knowledge_ingestion", "scripts/knowledge_ingestion.py")
+ingestion = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ingestion)
+
+TAXONOMY = "taxonomy:\n  domain: [energy]\n  audience: [internal]\n"
+
+
+def _sentences(label, count):
+    return " ".join(f"{label} sentence {i} explains one step." for i in range(count))
+
+
+BODY = (
+    "# Guide\n\nShort intro.\n\n"
+    f"## Setup\n\n{_sentences('Setup', 40)}\n\n"
+    "```\nrun --all\n\n# not a heading\n```\n\n"
+    f"## Usage\n\n{_sentences('Usage', 3)}\n"
+)
+
+
+def test_chunks_follow_headings_paragraphs_and_the_token_budget():
+    chunks = list(iter_chunks(BODY, max_tokens=60, overlap=16))
+    assert [c.headings for c in chunks][:2] == [("Guide",), ("Guide", "Setup")]
+    assert chunks[0].text == "# Guide\n\nShort intro."
+    assert chunks[-1].headings == ("Guide", "Usage") and chunks[-1].text.startswith("## Usage")
+    assert all(c.tokens == count_tokens(c.text) <= 60 for c in chunks)
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert any("# not a heading" in c.text and c.headings == ("Guide", "Setup") for c in chunks)
+
+    setup = [c for c in chunks if c.headings == ("Guide", "Setup")]
+    for previous, current in zip(setup, setup[1:]):
+        # Consecutive chunks of a section share their boundary sentence
+        assert previous.text.split(". ")[-1].rstrip(".") in current.text
+
+    assert [c.text for c in iter_chunks("one two three", max_tokens=2, overlap=0)] == ["one two", "three"]
+    assert list(iter_chunks("\n\n  \n")) == []
+
+
+def test_chunk_ids_are_stable_across_streaming_and_edits():
+    chunker = Chunker(60, 16)
+    for start in range(0, len(BODY), 11):
+        chunker.update(BODY[start:start + 11])
+    chunker.close()
+    streamed = [c.content_hash for c in chunker.take()]
+    whole = list(iter_chunks(BODY, 60, 16))
+    assert streamed == [c.content_hash for c in whole]
+
+    edited = list(iter_chunks(BODY.replace("Usage sentence 1", "Usage step 1"), 60, 16))
+    ids = [c.record("doc.md")["id"] for c in whole]
+    edited_ids = [c.record("doc.md")["id"] for c in edited]
+    assert edited_ids[:-1] == ids[:-1] and edited_ids[-1] != ids[-1]
+    assert whole[0].record("other.md")["id"] != ids[0]
+
+    repeated = list(iter_chunks("# A\n\nSame text.\n\n# A\n\nSame text.\n"))
+    assert repeated[0].text == repeated[1].text and repeated[0].content_hash != repeated[1].content_hash
+
+
+def test_process_files_streams_chunk_records(tmp_path):
+    (tmp_path / "guide.md").write_text(f"---\ntitle: Guide\ndomain: energy\n---\n\n{BODY}")
+    chunks_path = str(tmp_path / "chunks.jsonl")
+    bundle, _ = process_files([str(tmp_path / "guide.md")], None, workers=1, chunks_path=chunks_path)
+    records = list(iter_records(chunks_path))
+    assert len(records) > 2 and {r["doc_id"] for r in records} == {os.path.realpath(tmp_path / "guide.md")}
+    assert records[0]["metadata"]["domain"] == "energy" and "issues" not in records[0]["metadata"]
+    assert len({r["id"] for r in records}) == len(records)
+
+    exported = export_bundle(bundle, "Chunks (JSONL)", directory=str(tmp_path))
+    with open(exported, encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == [r["id"] for r in records]
+
+    # Articles sharing a title keep their chunks apart
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "guide.md").write_text(f"---\ntitle: Guide\n---\n\n{BODY}")
+    twin, _ = process_files([str(tmp_path / "other" / "guide.md")], None, workers=1)
+    assert len({r["doc_id"] for r in bundle_chunks(bundle + twin)}) == 2
+
+    # Editing one section keeps the IDs of the chunks in the others
+    edited_body = BODY.replace("Short intro.", "Longer introduction.")
+    (tmp_path / "guide.md").write_text(f"---\ntitle: Guide\ndomain: energy\n---\n\n{edited_body}")
+    edited, _ = process_files([str(tmp_path / "guide.md")], None, workers=1)
+    kept = {r["id"] for r in bundle_chunks(edited)} & {r["id"] for r in records}
+    assert kept and len(kept) == len(records) - 1
+
+
+def test_incremental_ingest_rechunks_without_revalidating(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    front = "---\ntitle: {}\ndomain: energy\naudience: internal\n---\n\n"
+    (docs / "a.md").write_text(front.format("a") + BODY)
+    (docs / "b.md").write_text(front.format("b") + "Plain body of b.\n")
+    taxonomy = tmp_path / "taxonomy.yaml"
+    taxonomy.write_text(TAXONOMY)
+    chunks_path = str(tmp_path / "chunks.jsonl.gz")
+
+    def run():
+        ingestion.ingest_directory(str(docs), str(taxonomy), workers=1, manifest_path=str(tmp_path / "m.json"),
+                                   chunks_path=chunks_path, chunk_tokens=60, chunk_overlap=16)
+        return {r["id"]: r for r in iter_records(chunks_path)}
+
+    first = run()
+    assert {r["metadata"]["title"] for r in first.values()} == {"a", "b"}
+    assert all(r["doc_id"] == r["metadata"]["path"] for r in first.values())
+
+    ingested = []
+    original = ingestion.ingest_article
+
+    def counting_ingest(path, *args, **kwargs):
+        ingested.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(ingestion, "ingest_article", counting_ingest)
+    (docs / "b.md").write_text(front.format("b") + "Edited body of b.\n")
+    second = run()
+    assert ingested == [str(docs / "b.md")]
+    assert {i for i, r in first.items() if r["metadata"]["title"] == "a"} <= set(second)
+    assert len(set(first) ^ set(second)) == 2
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from knowledge_core.importtime import format_import_report, parse_importtime
+
+# Generous enough for slow CI machines; the UI stack alone takes seconds to import
+BUDGET_SECONDS = float(os.environ.get("KNOWLEDGE_IMPORT_BUDGET_S", "1.5"))
+HEAVY_MODULES = ["gradio", "pandas", "pyarrow", "pdfplumber", "docx", "matplotlib", "yaml", "multiprocessing"]
+
+
+def _probe(module):
+    return f"""
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+@pytest.mark.parametrize("module", ["app", "knowledge_core"])
+def test_validation_core_cold_import_stays_light(module):
+    out = subprocess.run([sys.executable, "-c", _probe(module)], capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    assert result["loaded"] == []
+    assert result["elapsed"] < BUDGET_SECONDS
+
+
+def test_import_report_lists_direct_imports():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     json.decoder",
+        "import time:       200 |        300 |   json",
+        "import time:        50 |         50 |   re",
+        "import time:        10 |        360 | app",
+    ])
+    timings = parse_importtime(output)
+    assert [(t.name, t.depth) for t in timings] == [("json.decoder", 2), ("json", 1), ("re", 1), ("app", 0)]
+    report = format_import_report(timings, "app", top=1)
+    assert "Cold import of app: 0.4 ms" in report
+    assert report.splitlines()[-1].endswith("json")
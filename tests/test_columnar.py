@@ -0,0 +1,46 @@
+import datetime as dt
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from knowledge_core.columnar import ColumnarWriter, bundle_row, bundle_schema, read_table, write_bundle  # noqa: E402
+
+BUNDLE = [
+    {
+        "metadata": {"title": f"Doc {i}", "domain": ["product", "marketing"][i % 2], "subdomain": None,
+                     "last_updated": dt.date(2024, 5, 1), "tags": ["a", i]},
+        "content": f"Body {i}",
+        "issues": [] if i % 3 else ["Stale content"],
+    }
+    for i in range(50)
+]
+
+
+@pytest.mark.parametrize("name", ["bundle.parquet", "bundle.arrow"])
+def test_bundle_round_trip_with_typed_columns(tmp_path, name):
+    path = str(tmp_path / name)
+    assert write_bundle(BUNDLE, path) == 50
+
+    table = read_table(path)
+    assert table.schema.equals(bundle_schema())
+    assert pa.types.is_dictionary(table.schema.field("domain").type)
+    rows = table.to_pylist()
+    assert rows == [bundle_row(article) for article in BUNDLE]
+    assert rows[0]["last_updated"] == "2024-05-01"
+    assert rows[0]["issues"] == ["Stale content"]
+    assert json.loads(rows[1]["extra"]) == {"tags": ["a", 1]}
+
+    metadata_only = read_table(path, columns=["title", "domain"])
+    assert metadata_only.column_names == ["title", "domain"]
+
+
+def test_dictionaries_grow_across_batches(tmp_path):
+    path = str(tmp_path / "bundle.arrow")
+    with ColumnarWriter(path, bundle_schema(), batch_rows=7) as writer:
+        for article in BUNDLE:
+            writer.write(bundle_row(article))
+    assert read_table(path, columns=["domain"]).column("domain").to_pylist() == [
+        article["metadata"]["domain"] for article in BUNDLE
+    ]
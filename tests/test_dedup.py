@@ -0,0 +1,144 @@
+import importlib.util
+import random
+
+from knowledge_core.dedup import DedupIndex, Signer, lsh_bands, sign
+from knowledge_core.pipeline import process_files
+
+spec = importlib.util.spec_from_file_location("knowledge_ingestion", "scripts/knowledge_ingestion.py")
+ingestion = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ingestion)
+
+TAXONOMY = "taxonomy:\n  domain: [energy]\n  audience: [internal]\n"
+
+
+def _body(seed, words=400):
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randrange(3000)}" for _ in range(words))
+
+
+def _edit(body, every):
+    words = body.split()
+    return " ".join("changed" if i % every == 0 else word for i, word in enumerate(words))
+
+
+def test_signatures_ignore_layout_and_chunking():
+    body = _body(1)
+    signer = Signer()
+    for start in range(0, len(body), 7):
+        signer.update(body[start:start + 7])
+    chunked = signer.signature()
+    reformatted = sign("# " + body.upper().replace(" ", "\n\n", 50) + " !")
+    assert chunked.content_hash == sign(body).content_hash == reformatted.content_hash
+    assert (chunked.minhash == sign(body).minhash).all()
+    assert sign("  ...  ") is None
+
+    assert abs(sign(body).similarity(sign(_edit(body, 40))) - 0.78) < 0.1
+    assert sign(body).similarity(sign(_body(2))) < 0.1
+
+
+def test_index_links_later_copies_to_earlier_ones(tmp_path):
+    base, other = _body(1), _body(2)
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"), threshold=0.7)
+    assert index.add_text("a.md", base) == []
+    assert index.add_text("b.md", other) == []
+    exact = index.add_text("a.pdf", base.upper())
+    assert [(d.id, d.kind, d.similarity) for d in exact] == [("a.md", "exact", 1.0)]
+    near = index.add_text("a-v2.md", _edit(base, 40))
+    assert [(d.id, d.kind) for d in near] == [("a.md", "near"), ("a.pdf", "near")]
+    assert index.add_text("far.md", _edit(base, 3)) == []
+    index.close()
+
+    # Reopening keeps the documents; links only point to documents indexed earlier
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"), threshold=0.7)
+    assert len(index) == 5 and "a.pdf" in index
+    assert index.links("a.md") == []
+    assert [d.id for d in index.links("a.pdf")] == ["a.md"]
+    index.remove("a.md")
+    assert [d.id for d in index.links("a.pdf")] == []
+    index.close()
+
+    # A stricter threshold re-bands the stored signatures instead of dropping them
+    strict = DedupIndex(str(tmp_path / "dedup.sqlite"), threshold=0.95)
+    assert len(strict) == 4 and strict.query(sign(_edit(base, 41))) == []
+    assert [d.id for d in strict.query(sign(base))] == ["a.pdf"]
+    assert (strict.bands, strict.rows) == lsh_bands(0.95) != lsh_bands(0.7)
+
+
+def test_process_files_flags_duplicates_across_batches(tmp_path):
+    body = _body(3)
+    (tmp_path / "guide.md").write_text(f"---\ntitle: Guide\n---\n\n{body}\n")
+    (tmp_path / "guide-copy.txt").write_text(body.replace(" ", "\n"))
+    (tmp_path / "unrelated.md").write_text(_body(4))
+    index = DedupIndex()
+    bundle, _ = process_files([str(tmp_path / "guide.md"), str(tmp_path / "unrelated.md")], None, workers=1,
+                              dedup=index)
+    assert [article["metadata"].get("duplicate_of") for article in bundle] == [None, None]
+
+    bundle, _ = process_files([str(tmp_path / "guide-copy.txt")], None, workers=1, dedup=index)
+    article = bundle[0]
+    guide = str(tmp_path / "guide.md")
+    assert article["metadata"]["duplicate_of"] == [{"id": guide, "kind": "exact", "similarity": 1.0}]
+    assert f"Duplicate of {guide}" in article["issues"]
+
+    # Equally named files from different folders keep their own entries
+    for folder in ("team-a", "team-b"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "README.md").write_text(_body(7 if folder == "team-a" else 8))
+    process_files([str(tmp_path / "team-a" / "README.md"), str(tmp_path / "team-b" / "README.md")], None, workers=1,
+                  dedup=index)
+    assert str(tmp_path / "team-a" / "README.md") in index and str(tmp_path / "team-b" / "README.md") in index
+
+
+def test_incremental_ingest_keeps_links_out_of_the_manifest(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "packs").mkdir(parents=True)
+    body = _body(5)
+    front = "---\ntitle: {}\ndomain: energy\naudience: internal\n---\n\n"
+    (docs / "a.md").write_text(front.format("a") + body)
+    (docs / "packs" / "b.md").write_text(front.format("b") + _edit(body, 50))
+    taxonomy = tmp_path / "taxonomy.yaml"
+    taxonomy.write_text(TAXONOMY)
+    manifest = str(tmp_path / "out.manifest.json")
+
+    def run(index):
+        articles = ingestion.ingest_directory(str(docs), str(taxonomy), workers=1, manifest_path=manifest,
+                                              dedup=index)
+        return {a.title: a for a in articles}
+
+    first = run(DedupIndex(str(tmp_path / "dedup.sqlite"), threshold=0.7))
+    assert first["a"].duplicate_of is None
+    assert [link["id"] for link in first["b"].duplicate_of] == [str(docs / "a.md")]
+    assert any(issue.startswith("Near-duplicate of ") for issue in first["b"].issues)
+
+    # Unchanged files are linked from the index; a fresh index makes them re-ingest to sign them again
+    second = run(DedupIndex(str(tmp_path / "dedup.sqlite"), threshold=0.7))
+    assert [link["id"] for link in second["b"].duplicate_of] == [str(docs / "a.md")]
+    assert [link["id"] for link in run(DedupIndex(threshold=0.7))["b"].duplicate_of] == [str(docs / "a.md")]
+    assert run(None)["b"].duplicate_of is None
+
+
+def test_re_adding_a_batch_keeps_the_first_copy_canonical(tmp_path):
+    body = _body(6)
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    for _ in range(3):
+        assert index.add_text("a.md", body) == []
+        assert [d.id for d in index.add_text("b.md", body)] == ["a.md"]
+    # An edited original keeps its place too
+    assert index.add_text("a.md", body + " appendix") == []
+    assert [d.id for d in index.links("b.md")] == ["a.md"]
+
+
+def test_re_uploading_an_edited_file_replaces_its_earlier_version(tmp_path, monkeypatch):
+    monkeypatch.setenv("GRADIO_TEMP_DIR", str(tmp_path / "gradio"))
+    body = _body(9)
+    index = DedupIndex()
+    for digest, text in (("0a1b", body), ("2c3d", body + " corrected"), ("4e5f", body)):
+        (tmp_path / "gradio" / digest).mkdir(parents=True)
+        (tmp_path / "gradio" / digest / "guide.md").write_text(text)
+        bundle, _ = process_files([str(tmp_path / "gradio" / digest / "guide.md")], None, workers=1, dedup=index)
+        assert "duplicate_of" not in bundle[0]["metadata"] and len(index) == 1
+
+    (tmp_path / "gradio" / "6a7b").mkdir()
+    (tmp_path / "gradio" / "6a7b" / "copy.md").write_text(body)
+    bundle, _ = process_files([str(tmp_path / "gradio" / "6a7b" / "copy.md")], None, workers=1, dedup=index)
+    assert "Duplicate of guide.md" in bundle[0]["issues"]
@@ -0,0 +1,137 @@
+import io
+import zipfile
+
+import pytest
+
+from knowledge_core import docxtext
+from knowledge_core.docxtext import DocxError, read_docx
+from knowledge_core.extract import extract_document
+from knowledge_core.pipeline import process_files
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+RELS = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+
+
+def _p(text, style=None, extra=""):
+    ppr = f'<w:pPr><w:pStyle w:val="{style}"/>{extra}</w:pPr>' if style else ""
+    return f"<w:p>{ppr}<w:r><w:t xml:space=\"preserve\">{text}</w:t></w:r></w:p>"
+
+
+DOCUMENT = (
+    f'<w:document {W} {MC}><w:body>'
+    '<w:p><w:r><w:t>---</w:t><w:br/><w:t>title: From front matter</w:t><w:br/><w:t>---</w:t></w:r></w:p>'
+    + _p("Release Notes", "Title")
+    + _p("Overview", "MyHeading")
+    + '<w:p><w:r><w:t>Prices</w:t><w:tab/><w:t>rose</w:t></w:r>'
+    '<w:r><w:footnoteReference w:id="2"/></w:r></w:p>'
+    + _p("first item", "Normal", '<w:numPr><w:numId w:val="1"/></w:numPr>')
+    + _p("second item", "Normal", '<w:numPr><w:numId w:val="1"/></w:numPr>')
+    + '<w:tbl><w:tr><w:tc>' + _p("Region") + '</w:tc><w:tc>' + _p("Price") + '</w:tc></w:tr>'
+    '<w:tr><w:tc>' + _p("North") + _p("(est.)") + '</w:tc><w:tc>' + _p("$3.10") + '</w:tc></w:tr></w:tbl>'
+    '<w:p><w:r><mc:AlternateContent><mc:Choice Requires="wps"><w:txbxContent>' + _p("Boxed")
+    + '</w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent>' + _p("Boxed")
+    + '</w:txbxContent></mc:Fallback></mc:AlternateContent></w:r></w:p>'
+    + _p("Deep", "Normal", '<w:outlineLvl w:val="2"/>')
+    + '</w:body></w:document>'
+)
+STYLES = (
+    f'<w:styles {W}>'
+    '<w:style w:type="paragraph" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/>'
+    '<w:pPr><w:outlineLvl w:val="1"/></w:pPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="MyHeading"><w:name w:val="Report heading"/>'
+    '<w:basedOn w:val="Heading2"/></w:style>'
+    '</w:styles>'
+)
+CORE = (
+    '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/">'
+    '<dc:title>Core Title</dc:title><dc:creator>Pricing Team</dc:creator><dc:description></dc:description>'
+    '<dcterms:modified>2024-03-05T09:00:00Z</dcterms:modified></cp:coreProperties>'
+)
+FOOTNOTES = (
+    f'<w:footnotes {W}><w:footnote w:type="separator" w:id="0">' + _p("____") + '</w:footnote>'
+    '<w:footnote w:id="2">' + _p("Rack prices only.") + '</w:footnote></w:footnotes>'
+)
+
+
+def _rels(*relationships):
+    items = "".join(f'<Relationship Id="rId{i}" Type="{REL}{kind}" Target="{target}"/>'
+                    for i, (kind, target) in enumerate(relationships))
+    return f"<Relationships {RELS}>{items}</Relationships>"
+
+
+def _docx(document=DOCUMENT):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("_rels/.rels", _rels(("officeDocument", "word/document.xml"),
+                                              ("metadata/core-properties", "docProps/core.xml")))
+        archive.writestr("docProps/core.xml", CORE)
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/_rels/document.xml.rels", _rels(
+            ("styles", "styles.xml"), ("header", "header1.xml"), ("header", "header2.xml"),
+            ("footer", "footer1.xml"), ("footnotes", "footnotes.xml"), ("image", "media/image1.png")))
+        archive.writestr("word/styles.xml", STYLES)
+        archive.writestr("word/header1.xml", f'<w:hdr {W}>{_p("ACME Confidential")}</w:hdr>')
+        archive.writestr("word/header2.xml", f'<w:hdr {W}>{_p("ACME Confidential")}</w:hdr>')
+        archive.writestr("word/footer1.xml", f'<w:ftr {W}>{_p("Page footer")}</w:ftr>')
+        archive.writestr("word/footnotes.xml", FOOTNOTES)
+        archive.writestr("word/media/image1.png", b"\x89PNG" + bytes(range(256)) * 64)
+    data = bytearray(out.getvalue())
+    # Corrupt the image: extraction only succeeds if media is never decompressed
+    start = data.index(b"word/media/image1.png") + len("word/media/image1.png")
+    data[start + 10:start + 40] = bytes(30)
+    return bytes(data)
+
+
+EXPECTED = (
+    "---\ntitle: From front matter\n---\n\n# Release Notes\n\n## Overview\n\nPrices\trose[^2]\n\n"
+    "- first item\n- second item\n\nRegion | Price\nNorth (est.) | $3.10\n\nBoxed\n\n### Deep\n\n"
+    "ACME Confidential\n\nPage footer\n\n[^2]: Rack prices only."
+)
+
+
+def test_reads_tables_headings_headers_and_notes_without_touching_media():
+    meta, chunks = read_docx(_docx(), chunk_size=8)
+    chunks = list(chunks)
+    assert len(chunks) > 1 and "".join(chunks) == EXPECTED
+    assert meta == {"title": "Core Title", "author": "Pricing Team", "last_updated": "2024-03-05"}
+
+    meta, body = extract_document("notes.docx", _docx())
+    assert meta["title"] == "From front matter" and meta["author"] == "Pricing Team"
+    assert body.startswith("# Release Notes") and "$3.10" in body
+
+
+def test_archive_is_closed_when_the_body_is_not_fully_read(tmp_path, monkeypatch):
+    opened, open_archive = [], docxtext._open_archive
+    monkeypatch.setattr(docxtext, "_open_archive", lambda source: opened.append(open_archive(source)) or opened[-1])
+    (tmp_path / "notes.docx").write_bytes(_docx())
+    meta, chunks = read_docx(str(tmp_path / "notes.docx"), chunk_size=8)
+    assert meta["title"] == "Core Title" and all(archive.fp is None for archive in opened)
+
+    assert next(chunks).startswith("---") and opened[-1].fp is not None
+    chunks.close()
+    assert all(archive.fp is None for archive in opened)
+
+
+def test_broken_archives_are_reported_instead_of_emptied(tmp_path):
+    with pytest.raises(DocxError, match="zip"):
+        read_docx(b"not a zip file")
+    meta, chunks = read_docx(_docx(DOCUMENT[:400]))
+    with pytest.raises(DocxError, match="word/document.xml"):
+        "".join(chunks)
+
+    (tmp_path / "good.docx").write_bytes(_docx())
+    (tmp_path / "truncated.docx").write_bytes(_docx()[:300])
+    files = [str(tmp_path / "good.docx"), str(tmp_path / "truncated.docx")]
+    bundle, rows = process_files(files, None, workers=1)
+    assert bundle[0]["content"].startswith("# Release Notes")
+    assert rows[1]["issues"].startswith("Extraction failed: DocxError: not a DOCX")
+
+    # Large DOCX files are validated as a stream with the same result
+    streamed, _ = process_files(files[:1], None, workers=1, stream_threshold=0)
+    assert streamed[0]["content"] == bundle[0]["content"]
+    assert streamed[0]["metadata"]["title"] == "From front matter"
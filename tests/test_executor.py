@@ -0,0 +1,40 @@
+import threading
+import time
+
+from knowledge_core.executor import BatchExecutor
+
+
+def _square(x):
+    return x * x
+
+
+def _slow_or_fail(x):
+    if x == "slow":
+        time.sleep(5)
+    if x == "boom":
+        raise ValueError("bad input")
+    return x
+
+
+def test_results_keep_input_order():
+    results = BatchExecutor(workers=3).map(_square, range(20))
+    assert [r.index for r in results] == list(range(20))
+    assert [r.value for r in results] == [x * x for x in range(20)]
+
+
+def test_timeout_and_errors_are_isolated():
+    results = BatchExecutor(workers=2, timeout=0.5).map(_slow_or_fail, ["a", "slow", "boom", "b"])
+    assert [r.value for r in results if r.ok] == ["a", "b"]
+    assert results[1].timed_out
+    assert "ValueError" in results[2].error
+
+
+def test_single_items_still_time_out_off_the_main_thread():
+    # A web server runs batches on worker threads, where no alarm can be installed
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(BatchExecutor(workers=1, timeout=0.5).map(
+        _slow_or_fail, ["slow"])))
+    start = time.perf_counter()
+    thread.start()
+    thread.join(30)
+    assert results[0].timed_out and time.perf_counter() - start < 4
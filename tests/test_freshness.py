@@ -0,0 +1,74 @@
+import datetime as dt
+
+import numpy as np
+
+from knowledge_core.freshness import freshness_report, parse_date, parse_dates, stale_mask
+from knowledge_core.validation import validate_metadata
+
+MAY_1 = dt.date(2024, 5, 1)
+FORMATS = [
+    "2024-05-01", "2024/05/01", "2024.05.01", "20240501", "2024-05-01T10:00:00Z", "2024-05-01 23:59:59+05:00",
+    "05/01/2024", "May 1, 2024", "1 May 2024", "01-May-2024", "Wed, 01 May 2024 10:00:00 GMT", "  2024-05-01 ",
+    MAY_1, dt.datetime(2024, 5, 1, 12),
+]
+
+
+def test_common_formats_parse_in_bulk_and_one_by_one():
+    assert parse_dates(FORMATS).tolist() == [MAY_1] * len(FORMATS)
+    assert [parse_date(value) for value in FORMATS] == [MAY_1] * len(FORMATS)
+    assert parse_date("01/05/2024", day_first=True) == MAY_1
+
+    invalid = ["2024-02-30", "2024-13-01", "garbage", "", None, "0000-01-01"]
+    assert parse_dates(invalid).tolist() == [None] * len(invalid)
+    assert parse_dates([]).size == 0
+
+
+def test_strict_parsing_only_accepts_iso_dates():
+    strict = [parse_date(value, lenient=False) for value in ("2024-05-01", "2024-05-01T10:00:00", "05/01/2024")]
+    assert strict == [MAY_1, MAY_1, None]
+    assert parse_dates(["2024-05-01", "2024/05/01", "May 1, 2024"], lenient=False).tolist() == [MAY_1, None, None]
+
+
+def test_report_buckets_ages_against_one_reference_day():
+    reference = dt.date(2025, 1, 1)
+    values = ["2024-12-31", "2024-12-01", "2024-06-01", "2023-06-01", "2030-01-01", "not a date"]
+    report = freshness_report(values, reference=reference, stale_days=90, groups=["a", "a", "b", "b", "b", None])
+    assert report.buckets == {
+        "0-30": 1, "31-90": 1, "91-180": 0, "181-365": 1, "366-730": 1, ">730": 0, "future": 1, "invalid": 1,
+    }
+    assert (report.total, report.stale, report.invalid, report.future) == (6, 3, 1, 1)
+    assert report.groups["a"]["0-30"] == 1 and report.groups[""]["invalid"] == 1
+    assert sum(report.histogram) == 4 and report.histogram[0] == 1
+    assert report.to_dict()["fresh_pct"] == 50.0
+
+    dates = parse_dates(values)
+    assert stale_mask(dates, 90, reference).tolist() == [False, False, True, True, False, True]
+    assert stale_mask(dates, 90, reference, invalid_is_stale=False).tolist()[-1] is False
+
+
+def test_large_columns_match_scalar_parsing():
+    rng = np.random.default_rng(0)
+    values = [f"{y}-{m:02d}-{d:02d}" for y, m, d in zip(rng.integers(1990, 2030, 5000), rng.integers(1, 13, 5000),
+                                                       rng.integers(1, 32, 5000))]
+    values += ["10/10/2025", "May 1, 2024", "x"] * 100
+    assert parse_dates(values).tolist() == [parse_date(value) for value in values]
+
+
+def test_validation_measures_staleness_from_the_reference_day():
+    meta = {"last_updated": "2024-05-01"}
+    stale = "Article is stale (> 365 days since last_updated)"
+    assert stale not in validate_metadata(meta, {}, reference=dt.date(2025, 5, 1))
+    assert stale in validate_metadata(meta, {}, reference=dt.date(2025, 5, 2))
+    assert "Invalid last_updated date format (use YYYY-MM-DD)" in validate_metadata({"last_updated": "May 1"}, {})
+    assert validate_metadata({"last_updated": dt.date(2024, 5, 1)}, {}, stale_days=None) == [
+        f"Missing required field: {field}" for field in ("title", "domain", "subdomain", "audience", "format", "status")
+    ]
+
+
+def test_malformed_strings_parse_the_same_in_bulk_and_one_by_one():
+    malformed = [
+        "2024-05-01 x", "2024-05-01T", "2024-05-01 ", "2024-05-01Tjunk", "2024-05-01 25:00", "2024/05/01 x",
+        "2024.05.01T10:00", "2024-05-01x", "2024-05-01 10:30", "2024/05/01 10:30", "2024-05-01\t", "2024-05-1",
+    ]
+    for lenient in (True, False):
+        assert parse_dates(malformed, lenient=lenient).tolist() == [parse_date(v, lenient) for v in malformed]
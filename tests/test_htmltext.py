@@ -0,0 +1,93 @@
+import random
+
+from knowledge_core.extract import extract_document
+from knowledge_core.htmltext import HTMLTextExtractor, html_to_text, read_html
+from knowledge_core.pipeline import process_files
+
+PAGE = """<!DOCTYPE html>
+<html><head>
+<title>Fallback &amp; Title</title>
+<meta name="author" content="Ops Team">
+<meta property="article:modified_time" content="2024-05-01T10:00:00Z">
+<meta name="domain" content="product">
+<style>p { color: red; }</style>
+<script>if (a < b) { document.write("<p>hidden</p>"); }</script>
+</head>
+<body>
+<nav><a href="/">Home</a> <a href="/docs">Docs</a></nav>
+<!-- <p>commented out</p> -->
+<h1>Release  notes</h1>
+<p>First <b>bold</b> paragraph &mdash; caf&eacute; &lt;tag&gt; 3 &lt; 4.</p>
+<p>Second<br>line two</p>
+<ul><li>one</li><li>two</li></ul>
+<pre>code
+  indented</pre>
+</body></html>
+"""
+
+EXPECTED = (
+    "Release notes\n\nFirst bold paragraph — café <tag> 3 < 4.\n\n"
+    "Second\nline two\n\none\ntwo\n\ncode\n  indented"
+)
+
+
+def test_skips_scripts_styles_and_navigation_and_keeps_paragraphs():
+    assert html_to_text(PAGE) == EXPECTED
+
+
+def test_text_does_not_depend_on_chunk_boundaries():
+    rng = random.Random(3)
+    for _ in range(200):
+        parser = HTMLTextExtractor()
+        parts = []
+        pos = 0
+        while pos < len(PAGE):
+            size = rng.randint(1, 40)
+            parser.feed(PAGE[pos:pos + size])
+            parts.append(parser.pop_text())
+            pos += size
+        parser.close()
+        parts.append(parser.pop_text())
+        assert "".join(parts) == EXPECTED
+        assert parser.meta["last_updated"] == "2024-05-01"
+
+
+def test_meta_tags_fill_in_missing_front_matter(tmp_path):
+    meta, chunks = read_html(PAGE.encode("utf-8"), chunk_size=16)
+    assert meta == {
+        "title": "Fallback & Title",
+        "author": "Ops Team",
+        "last_updated": "2024-05-01",
+        "domain": "product",
+    }
+    assert "".join(chunks) == EXPECTED
+
+    page = "---\ntitle: From front matter\n---\n" + PAGE
+    meta, body = extract_document("page.html", page.encode("utf-8"))
+    assert meta["title"] == "From front matter"
+    assert meta["author"] == "Ops Team"
+    assert body.startswith("Release notes")
+
+
+def test_malformed_markup_is_linear_and_never_swallows_text():
+    assert html_to_text("<p>kept</p><script>var x = 1;") == "kept"
+    assert html_to_text("<p>kept</p><!-- never closed <p>gone</p>") == "kept"
+    assert html_to_text("<p>1 < 2 and a<b>c</b></p>") == "1 < 2 and ac"
+    # The scanner never rescans the input, so these stay fast on large inputs
+    assert html_to_text("a < " * 50000).startswith("a < a < ")
+    assert html_to_text("<p><a href='x" * 20000).count("<a href='x") == 20000
+
+
+def test_large_html_uploads_are_streamed(tmp_path):
+    path = tmp_path / "big.html"
+    path.write_text(
+        "<html><head><meta name='title' content='Big page'></head><body>"
+        + "<p>Lorem ipsum <i>dolor</i> sit amet.</p><script>x()</script>\n" * 5000
+        + "</body></html>",
+        encoding="utf-8",
+    )
+    streamed, _ = process_files([str(path)], None, workers=1, stream_threshold=1024)
+    whole, _ = process_files([str(path)], None, workers=1)
+    assert streamed[0]["metadata"]["title"] == whole[0]["metadata"]["title"] == "Big page"
+    assert streamed[0]["content"] == whole[0]["content"]
+    assert streamed[0]["content"].count("Lorem ipsum dolor sit amet.") == 5000
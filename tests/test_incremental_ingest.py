@@ -0,0 +1,44 @@
+import importlib.util
+import os
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location("knowledge_ingestion", "scripts/knowledge_ingestion.py")
+ingestion = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ingestion)
+
+TAXONOMY = "taxonomy:\n  domain: [energy]\n  audience: [internal]\n"
+
+
+def _article(title):
+    return f"---\ntitle: {title}\ndomain: energy\naudience: internal\n---\n\nBody of {title}.\n"
+
+
+def test_rerun_only_ingests_changed_files(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.md").write_text(_article(name))
+    taxonomy = tmp_path / "taxonomy.yaml"
+    taxonomy.write_text(TAXONOMY)
+    manifest = str(tmp_path / "out.manifest.json")
+
+    def run():
+        return ingestion.ingest_directory(str(docs), str(taxonomy), workers=1, manifest_path=manifest)
+
+    assert sorted(a.title for a in run()) == ["a", "b", "c"]
+
+    ingested = []
+    original = ingestion.ingest_article
+
+    def counting_ingest(path, *args, **kwargs):
+        ingested.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(ingestion, "ingest_article", counting_ingest)
+    (docs / "b.md").write_text(_article("b2"))
+    (docs / "c.md").unlink()
+    (docs / "d.md").write_text(_article("d"))
+    os.utime(docs / "a.md")  # touched but unchanged content
+
+    assert sorted(a.title for a in run()) == ["a", "b2", "d"]
+    assert sorted(Path(p).name for p in ingested) == ["b.md", "d.md"]
@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+from app import EDITABLE_FIELDS, apply_table_edits
+from knowledge_core import inference
+from knowledge_core.inference import MetadataModel, is_inference_issue, suggest_metadata, train_model
+from knowledge_core.pipeline import process_files
+from knowledge_core.taxonomy import CompiledTaxonomy
+
+TOPICS = {
+    ("energy", "pricing"): "rack price margin terminal gallon supplier benchmark discount",
+    ("energy", "risk"): "hedge exposure volatility futures position limit counterparty",
+    ("farming", "irrigation"): "soil moisture water sensor drip schedule drought field",
+    ("farming", "pests"): "insect fungicide spray scouting threshold leaf damage",
+}
+TAXONOMY = CompiledTaxonomy({
+    "domain": ["energy", "farming"],
+    "subdomain": {"energy": ["pricing", "risk"], "farming": ["irrigation", "pests"]},
+    "audience": ["internal", "external"],
+    "format": ["article", "faq"],
+    "status": ["draft", "published"],
+})
+
+
+def _body(rng, words, length=60):
+    vocabulary = words.split() + [f"filler{i}" for i in range(40)]
+    return " ".join(rng.choice(vocabulary) for _ in range(length))
+
+
+def _training(seed=0, per_topic=12):
+    rng = random.Random(seed)
+    for (domain, subdomain), words in TOPICS.items():
+        for i in range(per_topic):
+            meta = {"title": f"{subdomain} note {i}", "domain": domain, "subdomain": subdomain,
+                    "audience": "internal" if domain == "energy" else "external", "format": "article"}
+            yield meta, _body(rng, words)
+
+
+def _untagged(body, title="scan_0001"):
+    return {"metadata": {"title": title, "domain": "Unknown", "subdomain": "Unknown", "audience": "Unknown",
+                         "format": "Unknown"},
+            "content": body,
+            "issues": [f"Missing required field: {field}" for field in ("domain", "subdomain", "audience", "format")]}
+
+
+def test_model_suggests_confident_values_within_the_taxonomy():
+    model = MetadataModel.train(_training())
+    rng = random.Random(1)
+    articles = [_untagged(_body(rng, words)) for words in TOPICS.values()]
+    suggestions = model.suggest(articles, TAXONOMY)
+    assert [(s["domain"].value, s["subdomain"].value) for s in suggestions] == list(TOPICS)
+    assert all(s["domain"].confidence >= 0.8 for s in suggestions)
+    assert [s["audience"].value for s in suggestions] == ["internal", "internal", "external", "external"]
+
+    # Scoring a batch gives the same result as scoring its documents one at a time
+    assert [model.suggest([article], TAXONOMY)[0] for article in articles] == suggestions
+
+    # Given fields are kept and steer the subdomain; unrelated text and disallowed values get nothing
+    tagged = _untagged(_body(rng, TOPICS[("farming", "pests")]))
+    tagged["metadata"]["domain"] = "energy"
+    assert set(model.suggest([tagged], TAXONOMY)[0]) == {"subdomain", "audience", "format"}
+    assert model.suggest([_untagged("completely different words here")], TAXONOMY) == [{}]
+    narrow = CompiledTaxonomy({"domain": ["farming"]})
+    assert "domain" not in model.suggest([articles[0]], narrow)[0]
+
+
+def test_suggestions_replace_missing_field_issues_and_survive_unrelated_edits(tmp_path):
+    model = MetadataModel.train(_training())
+    model.save(str(tmp_path / "model.npz"))
+    model = MetadataModel.load(str(tmp_path / "model.npz"))
+    article = _untagged(_body(random.Random(2), TOPICS[("energy", "risk")]))
+    entry = next(suggest_metadata([article], model, TAXONOMY))
+    meta = entry["metadata"]
+    assert (meta["domain"], meta["subdomain"]) == ("energy", "risk") and set(meta["inferred"]) == set(
+        inference.INFER_FIELDS)
+    assert not any(issue.startswith("Missing required field") for issue in entry["issues"])
+    assert sum(is_inference_issue(issue) for issue in entry["issues"]) == 4
+    assert article["metadata"]["domain"] == "Unknown"
+
+    # Editing one cell confirms that value only
+    meta.update(status="draft", last_updated="2999-01-01")
+    row = [meta[field] for field in EDITABLE_FIELDS]
+    row[EDITABLE_FIELDS.index("audience")] = "external"
+    apply_table_edits([entry], [row], TAXONOMY)
+    assert set(entry["metadata"]["inferred"]) == {"domain", "subdomain", "format"}
+    assert [issue.split(" ")[1] for issue in entry["issues"] if is_inference_issue(issue)] == [
+        "domain", "subdomain", "format"]
+
+    with open(tmp_path / "old.npz", "wb") as f:
+        f.write((tmp_path / "model.npz").read_bytes())
+    inference.INFERENCE_VERSION, version = "0", inference.INFERENCE_VERSION
+    try:
+        with pytest.raises(ValueError):
+            MetadataModel.load(str(tmp_path / "old.npz"))
+    finally:
+        inference.INFERENCE_VERSION = version
+
+
+def test_process_files_fills_untagged_uploads(tmp_path):
+    train = tmp_path / "train"
+    train.mkdir()
+    for idx, (meta, body) in enumerate(_training(per_topic=4)):
+        front = "".join(f"{key}: {value}\n" for key, value in meta.items())
+        (train / f"{idx}.md").write_text(f"---\n{front}---\n\n{body}\n")
+    model = train_model([str(train)])
+    assert model.documents == 16
+
+    rng = random.Random(3)
+    (tmp_path / "legacy.txt").write_text(_body(rng, TOPICS[("farming", "irrigation")]))
+    (tmp_path / "tagged.md").write_text(f"---\ndomain: energy\n---\n\n{_body(rng, TOPICS[('farming', 'pests')])}")
+    bundle, rows = process_files([str(tmp_path / "legacy.txt"), str(tmp_path / "tagged.md")], TAXONOMY, workers=1,
+                                 inference=model)
+    assert (rows[0]["domain"], rows[0]["subdomain"]) == ("farming", "irrigation")
+    assert "Missing required field: domain" not in bundle[0]["issues"]
+    assert rows[1]["domain"] == "energy" and "domain" not in bundle[1]["metadata"]["inferred"]
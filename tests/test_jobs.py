@@ -0,0 +1,50 @@
+from knowledge_core import jobs
+from knowledge_core.jobs import JobQueue
+from knowledge_core.pipeline import process_files
+
+
+def _upload(tmp_path, name, domain="product"):
+    path = tmp_path / name
+    path.write_text(f"---\ntitle: {name}\ndomain: {domain}\n---\nBody of {name}.\n")
+    return str(path)
+
+
+def test_job_streams_the_same_bundle_as_process_files(tmp_path):
+    files = [_upload(tmp_path, f"doc{i}.md", "product" if i % 2 else "nope") for i in range(5)]
+    job = JobQueue(bulk_threshold=2).submit(files, workers=2)
+    assert job.lane == "bulk"
+    assert job.wait(30)
+    assert job.state == "done" and job.progress() == (5, 5)
+    assert job.bundle() == process_files(files, None, workers=1)[0]
+
+
+def test_full_bulk_lane_does_not_block_interactive_jobs(tmp_path):
+    queue = JobQueue(max_bulk_jobs=1, bulk_threshold=1)
+    # Occupy the only bulk slot, as a long-running batch would
+    queue._slots["bulk"].acquire()
+    bulk = queue.submit([_upload(tmp_path, "a.md"), _upload(tmp_path, "b.md")])
+    small = queue.submit([_upload(tmp_path, "c.md")])
+    assert small.wait(30) and small.state == "done"
+    assert not bulk.wait(0.2) and bulk.state == "queued"
+
+    assert queue.cancel(bulk.id)
+    assert bulk.wait(5) and bulk.state == "cancelled" and bulk.bundle() == []
+    assert queue.get(small.id) is small
+
+
+def test_lanes_split_the_worker_budget_between_their_jobs(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_WORKERS", "8")
+    queue = JobQueue(max_bulk_jobs=2, bulk_threshold=1)
+    assert (queue.interactive_workers, queue.bulk_workers) == (2, 3)
+
+    pools = []
+
+    def iter_process_files(files, taxonomy, **options):
+        pools.append(options["workers"])
+        return iter(())
+
+    monkeypatch.setattr(jobs, "iter_process_files", iter_process_files)
+    for job in (queue.submit([_upload(tmp_path, "a.md")]), queue.submit([_upload(tmp_path, "b.md")] * 2),
+                queue.submit([_upload(tmp_path, "c.md")], workers=1)):
+        assert job.wait(30)
+    assert sorted(pools) == [1, 2, 3]
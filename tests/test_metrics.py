@@ -0,0 +1,75 @@
+import json
+
+from knowledge_core.metrics import Metrics, collecting, timed
+from knowledge_core.pipeline import process_files
+
+
+def _upload(tmp_path, name, body="Body text."):
+    path = tmp_path / name
+    path.write_text(f"---\ntitle: {name}\ndomain: product\n---\n{body}\n")
+    return str(path)
+
+
+def test_timed_is_a_no_op_without_metrics():
+    with timed("extract", "md") as timer:
+        pass
+    assert not timer.active
+
+    metrics = Metrics()
+    with collecting(metrics):
+        with timed("extract", "md", bytes_in=10) as timer:
+            timer.bytes_out = 4
+    assert timer.active
+    stats = metrics.stages[("extract", "md")]
+    assert (stats.calls, stats.bytes_in, stats.bytes_out) == (1, 10, 4)
+
+
+def test_merge_adds_worker_counters_and_keeps_slow_files():
+    worker = Metrics(slow_threshold=0.5)
+    worker.add("extract", "pdf", 2.0, bytes_in=100)
+    worker.observe_file("big.pdf", 2.0, 100, {"extract": 2.0})
+    worker.observe_file("small.pdf", 0.1, 10)
+
+    metrics = Metrics()
+    metrics.add("extract", "pdf", 1.0, bytes_in=50)
+    metrics.merge(worker.to_dict())
+    stats = metrics.stages[("extract", "pdf")]
+    assert (stats.calls, stats.seconds, stats.max_seconds, stats.bytes_in) == (2, 3.0, 2.0, 150)
+    assert metrics.files["pdf"].calls == 2
+    assert [entry["file"] for entry in metrics.slow_files] == ["big.pdf"]
+    assert metrics.slow_files[0]["stages"] == {"extract": 2.0}
+
+
+def test_prometheus_and_json_exports(tmp_path):
+    metrics = Metrics()
+    metrics.add("validate_body", "md", 0.25, bytes_in=1024)
+    metrics.observe_file('odd"name.md', 0.25, 1024)
+    text = metrics.finish().to_prometheus()
+    assert "# TYPE knowledge_stage_seconds_total counter" in text
+    assert 'knowledge_stage_seconds_total{stage="validate_body",file_type="md"} 0.25' in text
+    assert 'knowledge_files_total{file_type="md"} 1' in text
+
+    metrics.write(str(tmp_path / "metrics.prom"))
+    assert (tmp_path / "metrics.prom").read_text() == text
+    metrics.write(str(tmp_path / "metrics.json"))
+    summary = json.loads((tmp_path / "metrics.json").read_text())
+    assert summary["stages"][0]["stage"] == "validate_body"
+    assert summary["files"]["md"]["count"] == 1
+
+
+def test_process_files_records_stages_from_workers(tmp_path):
+    files = [_upload(tmp_path, f"doc{i}.md") for i in range(3)]
+    for workers in (1, 2):
+        metrics = Metrics(slow_threshold=0)
+        bundle, _ = process_files(files, None, workers=workers, metrics=metrics)
+        assert bundle == process_files(files, None, workers=1)[0]
+        stages = set(metrics.stage_seconds())
+        assert {"extract", "clean", "front_matter", "validate_metadata", "validate_body"} <= stages
+        assert metrics.files["md"].calls == 3
+        assert len(metrics.slow_files) == 3 and metrics.wall_seconds > 0
+
+
+def test_profiler_report_is_attached(tmp_path):
+    metrics = Metrics(profiler="cprofile")
+    process_files([_upload(tmp_path, "doc.md")], None, workers=4, metrics=metrics)
+    assert "function calls" in metrics.profile
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from knowledge_core.extract import extract_pdf, iter_pdf_pages
+
+pdfplumber = pytest.importorskip("pdfplumber")
+
+
+def _pdf(pages):
+    # Minimal PDF: a catalog, a page tree and one Helvetica text page per entry of ``pages``
+    count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(count))}] /Count {count} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R"
+                       " /Resources << /Font << /F1 3 0 R >> >> >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    out.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+PAGES = [f"Page {n} text" for n in range(1, 6)]
+
+
+def _counting_pages(monkeypatch):
+    created = set()
+
+    class Page(pdfplumber.pdf.Page):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.add(self.page_number)
+
+    monkeypatch.setattr(pdfplumber.pdf, "Page", Page)
+    return created
+
+
+def test_pages_are_streamed_within_the_range_and_cap(tmp_path, monkeypatch):
+    (tmp_path / "doc.pdf").write_bytes(_pdf(PAGES))
+    path = str(tmp_path / "doc.pdf")
+    assert list(iter_pdf_pages(path)) == PAGES
+    assert extract_pdf(io.BytesIO(_pdf(PAGES))) == "".join(f"{text}\n" for text in PAGES)
+
+    created = _counting_pages(monkeypatch)
+    assert list(iter_pdf_pages(path, max_pages=2)) == PAGES[:2] and created == {1, 2}
+    created.clear()
+    assert list(iter_pdf_pages(path, max_pages=2, page_range=(2, 5))) == PAGES[1:3] and created == {2, 3}
+    created.clear()
+    assert list(iter_pdf_pages(path, max_pages=9, page_range=(0, 2))) == PAGES[:2] and created == {1, 2}
+    assert list(iter_pdf_pages(path, page_range=(4, 9))) == PAGES[3:]
+    assert list(iter_pdf_pages(path, max_pages=0)) == []
+
+
+def test_stopping_early_reads_no_further_pages(tmp_path, monkeypatch):
+    (tmp_path / "doc.pdf").write_bytes(_pdf(PAGES))
+    extracted = []
+    extract_text = pdfplumber.pdf.Page.extract_text
+    monkeypatch.setattr(pdfplumber.pdf.Page, "extract_text",
+                        lambda self, *args, **kwargs: extracted.append(self.page_number) or extract_text(self))
+    pages = iter_pdf_pages(str(tmp_path / "doc.pdf"))
+    assert next(pages) == PAGES[0]
+    pages.close()
+    assert extracted == [1]
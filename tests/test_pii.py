@@ -0,0 +1,31 @@
+from knowledge_core.pii import PIIScanner, iban_valid, luhn_valid
+
+BODY = (
+    "Call (555) 123-4567 or mail jane.doe@example.com. "
+    "SSN 123-45-6789, card 4111 1111 1111 1111, not a card 4111 1111 1111 1112, "
+    "IBAN GB82 WEST 1234 5698 7654 32. Backup: ops@example.com"
+)
+
+
+def test_single_pass_findings_have_offsets_and_counts():
+    result = PIIScanner().scan(BODY)
+    assert result.counts == {"ssn": 1, "email": 2, "credit_card": 1, "iban": 1, "phone": 1}
+    for finding in result.findings:
+        assert finding.end > finding.start
+    emails = [BODY[f.start:f.end] for f in result.findings if f.kind == "email"]
+    assert emails == ["jane.doe@example.com", "ops@example.com"]
+
+
+def test_per_type_limit_stops_early():
+    scanner = PIIScanner(max_per_type=1)
+    result = scanner.scan(BODY)
+    assert result.counts["email"] == 1
+    assert "email" in result.truncated
+    assert scanner.issues(result)[0] == "Possible SSN-like pattern detected in body"
+
+
+def test_checksums():
+    assert luhn_valid("4111-1111-1111-1111")
+    assert not luhn_valid("4111 1111 1111 1112")
+    assert iban_valid("GB82 WEST 1234 5698 7654 32")
+    assert not iban_valid("GB00 WEST 1234 5698 7654 32")
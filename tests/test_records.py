@@ -0,0 +1,40 @@
+import datetime as dt
+import gzip
+
+import pytest
+
+from knowledge_core.records import RecordWriter, count_records, iter_records, read_record
+
+
+@pytest.mark.parametrize("name", ["out.jsonl", "out.jsonl.gz"])
+def test_stream_round_trip_and_seek(tmp_path, name):
+    path = str(tmp_path / name)
+    records = [{"title": f"Article {i}", "last_updated": dt.date(2024, 1, 1 + i % 28)} for i in range(500)]
+    # Small gzip blocks force many independently seekable members
+    with RecordWriter(path, block_bytes=2048) as writer:
+        for record in records:
+            writer.write(record)
+
+    expected = [{**r, "last_updated": r["last_updated"].isoformat()} for r in records]
+    assert list(iter_records(path)) == expected
+    assert count_records(path) == 500
+    for n in (0, 1, 250, 499):
+        assert read_record(path, n) == expected[n]
+    with pytest.raises(IndexError):
+        read_record(path, 500)
+    with pytest.raises(IndexError):
+        read_record(path, -1)
+    if name.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert sum(1 for _ in f) == 500
+
+
+def test_failed_write_leaves_previous_output(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with RecordWriter(path) as writer:
+        writer.write({"title": "kept"})
+    with pytest.raises(RuntimeError):
+        with RecordWriter(path) as writer:
+            writer.write({"title": "lost"})
+            raise RuntimeError("interrupted")
+    assert list(iter_records(path)) == [{"title": "kept"}]
@@ -0,0 +1,161 @@
+import importlib.util
+
+import pytest
+
+from knowledge_core import search
+from knowledge_core.pipeline import process_files
+from knowledge_core.search import SearchIndex, TermCounter, count_terms
+
+spec = importlib.util.spec_from_file_location("knowledge_ingestion", "scripts/knowledge_ingestion.py")
+ingestion = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ingestion)
+
+TAXONOMY = "taxonomy:\n  domain: [energy, finance]\n  audience: [internal]\n"
+
+
+def _article(title, body, domain="energy", status="Published"):
+    return {"metadata": {"title": title, "domain": domain, "audience": "internal", "status": status},
+            "content": body, "issues": []}
+
+
+def test_search_ranks_with_bm25_and_filters_by_taxonomy(tmp_path):
+    index = SearchIndex(str(tmp_path / "search"))
+    index.add_bundle([
+        _article("Solar panels", "Solar panels convert sunlight. Solar farms need land."),
+        _article("Wind turbines", "Turbines turn wind into power; solar is mentioned once."),
+        _article("Budget", "Quarterly budget for the solar programme.", domain="finance", status="Draft"),
+        _article("Unrelated", "Nothing to see here."),
+    ])
+    assert [hit.title for hit in index.search("solar")][:1] == ["Solar panels"]
+    assert {hit.title for hit in index.search("SOLAR panels!")} == {"Solar panels", "Wind turbines", "Budget"}
+    assert index.search("missing-term") == [] and index.search("   ") == []
+
+    hits = index.search("solar", filters={"domain": "finance"})
+    assert [(hit.title, hit.fields["status"]) for hit in hits] == [("Budget", "Draft")]
+    assert [hit.title for hit in index.search("solar", k=1, filters={"status": ["Published", "Draft"]})] == [
+        "Solar panels"]
+    assert index.search("solar", filters={"domain": "health"}) == []
+    assert index.values("domain") == ["energy", "finance"]
+    with pytest.raises(ValueError):
+        index.search("solar", filters={"author": "me"})
+
+    # Streamed bodies count the same terms as whole ones, words split across chunks included
+    counter = TermCounter()
+    text = "Solar panels convert sunlight into power " * 20
+    for start in range(0, len(text), 7):
+        counter.update(text[start:start + 7])
+    streamed, whole = counter.terms(), count_terms(text)
+    assert streamed.length == whole.length == 120
+    assert (streamed.hashes == whole.hashes).all() and (streamed.counts == whole.counts).all()
+
+
+def test_index_persists_replaces_and_merges_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "MAX_SMALL_SEGMENTS", 2)
+    path = str(tmp_path / "search")
+    index = SearchIndex(path)
+    for batch in range(4):
+        index.add_bundle([_article(f"doc {batch}-{i}", f"common batch{batch} item{i}") for i in range(3)])
+    assert index.stats()["segments"] <= 3 and len(index) == 12
+
+    index.add_article(_article("doc 0-0", "rewritten body"))
+    index.remove("doc 1-1")
+    index.add_article(_article("pending", "common"))
+    # Unflushed documents are not searchable yet
+    assert "pending" not in {hit.title for hit in index.search("common", k=20)}
+    index.close()
+
+    reopened = SearchIndex(path)
+    titles = {hit.title for hit in reopened.search("common", k=20)}
+    assert len(reopened) == 12 and "pending" in titles
+    assert "doc 0-0" not in titles and "doc 1-1" not in titles and "doc 1-1" not in reopened
+    assert [hit.title for hit in reopened.search("rewritten")] == ["doc 0-0"]
+    assert [hit.id for hit in reopened.search("batch3 item2")][:1] == ["doc 3-2"]
+
+
+def test_process_files_indexes_each_batch(tmp_path):
+    (tmp_path / "grid.md").write_text("---\ntitle: Grid\ndomain: Energy\n---\n\nThe grid balances load.\n")
+    (tmp_path / "notes.txt").write_text("Meeting notes about load shedding.\n")
+    index = SearchIndex(str(tmp_path / "search"))
+    process_files([str(tmp_path / "grid.md")], None, workers=1, search_index=index)
+    process_files([str(tmp_path / "notes.txt")], None, workers=1, search_index=index)
+    hits = index.search("load")
+    assert sorted(hit.title for hit in hits) == ["Grid", "notes"]
+    assert [hit.title for hit in index.search("load", filters={"domain": "Energy"})] == ["Grid"]
+    assert hits[0].snippet and "---" not in hits[0].snippet
+
+
+def test_incremental_ingest_keeps_the_index_in_sync(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    front = "---\ntitle: {}\ndomain: {}\naudience: internal\n---\n\n"
+    (docs / "a.md").write_text(front.format("Alpha", "energy") + "Turbine maintenance schedule.\n")
+    (docs / "b.md").write_text(front.format("Beta", "finance") + "Turbine purchase budget.\n")
+    taxonomy = tmp_path / "taxonomy.yaml"
+    taxonomy.write_text(TAXONOMY)
+    path = str(tmp_path / "search")
+
+    def run():
+        ingestion.ingest_directory(str(docs), str(taxonomy), workers=1, manifest_path=str(tmp_path / "m.json"),
+                                   search_index=SearchIndex(path))
+        return SearchIndex(path)
+
+    index = run()
+    assert {hit.id for hit in index.search("turbine")} == {str(docs / "a.md"), str(docs / "b.md")}
+    assert [hit.title for hit in index.search("alpha")] == ["Alpha"]
+    assert [hit.title for hit in index.search("turbine", filters={"domain": "finance"})] == ["Beta"]
+
+    ingested = []
+    original = ingestion.ingest_article
+
+    def counting_ingest(article_path, *args, **kwargs):
+        ingested.append(article_path)
+        return original(article_path, *args, **kwargs)
+
+    monkeypatch.setattr(ingestion, "ingest_article", counting_ingest)
+    (docs / "a.md").unlink()
+    (docs / "b.md").write_text(front.format("Beta", "finance") + "Revised budget.\n")
+    index = run()
+    assert ingested == [str(docs / "b.md")]
+    assert index.search("turbine") == [] and len(index) == 1
+
+    # A fresh index makes unchanged files re-ingest so it is complete
+    ingested.clear()
+    (tmp_path / "search2").mkdir()
+    ingestion.ingest_directory(str(docs), str(taxonomy), workers=1, manifest_path=str(tmp_path / "m.json"),
+                               search_index=SearchIndex(str(tmp_path / "search2")))
+    assert ingested == [str(docs / "b.md")]
+    assert [hit.title for hit in SearchIndex(str(tmp_path / "search2")).search("revised")] == ["Beta"]
+
+
+def test_reindexing_the_same_batch_keeps_scores_and_order(tmp_path):
+    index = SearchIndex(str(tmp_path / "search"))
+    batch = [
+        _article("often", "grid grid grid storage"),
+        _article("once", "grid storage battery"),
+        _article("other1", "wind farm"),
+        _article("other2", "solar farm"),
+        _article("other3", "hydro dam"),
+    ]
+    index.add_bundle(batch)
+    expected = [(hit.title, hit.score) for hit in index.search("grid")]
+    assert [title for title, _ in expected] == ["often", "once"] and expected[1][1] > 0
+    for _ in range(5):
+        index.add_bundle(batch)
+        hits = index.search("grid")
+        assert [hit.title for hit in hits] == ["often", "once"]
+        assert [hit.score for hit in hits] == pytest.approx([score for _, score in expected])
+
+
+def test_articles_sharing_a_title_stay_searchable(tmp_path):
+    for folder, body in (("team-a", "solar inverter sizing"), ("team-b", "wind turbine maintenance")):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "faq.md").write_text(f"---\ntitle: FAQ\n---\n\n{body}\n")
+    index = SearchIndex(str(tmp_path / "search"))
+    bundle, _ = process_files([str(tmp_path / "team-a" / "faq.md"), str(tmp_path / "team-b" / "faq.md")], None,
+                              workers=1, search_index=index)
+    assert len(index) == 2
+    assert [hit.title for hit in index.search("inverter")] == [hit.title for hit in index.search("turbine")] == ["FAQ"]
+
+    # Exported bundles carry the source, so the CLI's add_bundle keeps them apart too
+    exported = SearchIndex(str(tmp_path / "exported"))
+    assert exported.add_bundle(bundle) == 2 and len(exported) == 2
@@ -0,0 +1,33 @@
+import random
+
+from knowledge_core.pii import PIIScanner
+from knowledge_core.streaming import iter_text_chunks, scan_stream, split_front_matter_stream
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_chunked_scan_matches_full_scan_across_boundaries():
+    rng = random.Random(7)
+    samples = ["call 555-123-4567", "mail jane.doe@example.com", "ssn 123-45-6789", "card 4111 1111 1111 1111"]
+    text = " ".join(rng.choice(samples) + " filler" * rng.randint(0, 5) for _ in range(300))
+    for limit in (None, 1, 3):
+        scanner = PIIScanner(max_per_type=limit)
+        full = scanner.scan(text)
+        for size in (7, 64, 1000):
+            streamed = scan_stream(_chunks(text, size), scanner, overlap=128)
+            assert streamed.findings == full.findings
+            assert streamed.counts == full.counts
+            assert streamed.truncated == full.truncated
+
+
+def test_front_matter_is_split_from_the_stream_head():
+    data = ("---\ntitle: Big\ndomain: energy\n---\n\n" + "body text " * 1000).encode("utf-8")
+    front_matter, body = split_front_matter_stream(iter_text_chunks(data, chunk_size=5))
+    assert front_matter == "\ntitle: Big\ndomain: energy\n"
+    assert "".join(body) == ("body text " * 1000)
+
+    front_matter, body = split_front_matter_stream(["no front ", "matter here"])
+    assert front_matter is None
+    assert "".join(body) == "no front matter here"
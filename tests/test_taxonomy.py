@@ -0,0 +1,37 @@
+from knowledge_core import taxonomy
+from knowledge_core.taxonomy import CompiledTaxonomy, taxonomy_fingerprint
+
+TAXONOMY = {
+    "domain": ["product", "customer-support"],
+    "subdomain": {"product": ["features", "release-notes"]},
+    "audience": ["customer"],
+}
+
+
+def test_membership_and_suggestions():
+    tax = CompiledTaxonomy({"taxonomy": TAXONOMY})
+    assert tax.allows("domain", "product")
+    assert not tax.allows("domain", ["product"])
+    assert tax.suggest("domain", "Customer_Support") == "customer-support"
+    assert tax.suggest("subdomain", "release note", domain="product") == "release-notes"
+    assert tax.suggest("audience", "zzz") is None
+    assert tax.allowed_subdomains("customer-support") is None
+
+
+def test_fingerprint_ignores_order():
+    reordered = {
+        "audience": ["customer"],
+        "subdomain": {"product": ["release-notes", "features"]},
+        "domain": ["customer-support", "product"],
+    }
+    assert taxonomy_fingerprint(TAXONOMY) == taxonomy_fingerprint(reordered)
+    assert taxonomy_fingerprint(TAXONOMY) != taxonomy_fingerprint({**TAXONOMY, "audience": ["partner"]})
+
+
+def test_suggestion_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(taxonomy, "MAX_SUGGESTIONS", 8)
+    tax = CompiledTaxonomy(TAXONOMY)
+    for i in range(100):
+        tax.suggest("domain", f"unknown value {i}")
+    assert len(tax._suggestions) == 8
+    assert tax.suggest("domain", "PRODUCT") == "product"
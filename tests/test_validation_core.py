@@ -0,0 +1,46 @@
+from knowledge_core.frontmatter import parse_front_matter, read_front_matter
+from knowledge_core.validation import validate_many, validate_metadata
+
+ARTICLE = (
+    "---\ntitle: Setup --- part 1\ndomain: product\nsubdomain: features\naudience: customer\n"
+    "format: article\nstatus: published\nlast_updated: 2099-01-01\n---\n\nWrite to ops@example.com for help.\n"
+)
+
+
+def test_delimiter_inside_a_value_does_not_close_front_matter():
+    meta, body = parse_front_matter(ARTICLE)
+    assert meta["title"] == "Setup --- part 1"
+    assert body == "Write to ops@example.com for help."
+
+
+def test_streamed_front_matter_matches_whole_document():
+    meta, chunks = read_front_matter(ARTICLE.encode(), chunk_size=7)
+    assert (meta, "".join(chunks).rstrip()) == parse_front_matter(ARTICLE)
+
+
+def test_validate_many_accepts_strings_chunks_and_pools():
+    meta, body = parse_front_matter(ARTICLE)
+    docs = [("a.md", meta, body), ("b.md", {"domain": "nope"}, "plain"), ("c.md", meta, None)]
+    serial = list(validate_many(iter(docs)))
+    assert serial[0]["issues"] == ["Email addresses detected in body (verify necessity)"]
+    assert any(issue.startswith("Invalid domain: nope") for issue in serial[1]["issues"])
+    assert serial[1]["metadata"]["title"] == "b"
+    assert serial[2]["issues"] == [] and serial[2]["content"] == ""
+
+    chunked = list(validate_many([("a.md", meta, iter([body[:10], body[10:]]))]))
+    assert chunked[0] == serial[0]
+    assert list(validate_many(docs, workers=2, batch_size=1)) == serial
+
+
+def test_fields_a_custom_taxonomy_leaves_out_accept_any_value():
+    # Partial taxonomies (as used by the ingestion script) only restrict the fields they define
+    meta = {"domain": "product", "audience": "partner", "format": "anything", "status": "whatever"}
+    issues = validate_metadata(meta, {"domain": ["product"], "audience": ["customer"]}, stale_days=None)
+    assert [issue for issue in issues if issue.startswith("Invalid")] == ["Invalid audience: partner"]
+
+
+def test_list_or_dict_subdomains_are_reported_as_invalid():
+    taxonomy = {"domain": ["product"], "subdomain": {"product": ["features"]}}
+    for subdomain in (["features"], {"name": "features"}):
+        issues = validate_metadata({"domain": "product", "subdomain": subdomain}, taxonomy, stale_days=None)
+        assert any(issue.startswith("Invalid subdomain") for issue in issues)